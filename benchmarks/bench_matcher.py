@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+"""
+Micro-benchmarks of the name matcher against the previous implementation that normalized
+names and built a ``difflib.SequenceMatcher`` for every comparison.
+
+    python benchmarks/bench_matcher.py --candidates 1000
+
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import argparse
+import random
+import re
+import string
+import sys
+import timeit
+from difflib import SequenceMatcher
+
+from thank_you_stars._matcher import NameMatcher, normalize_person_name, normalize_pkg_name
+
+
+_THRESHOLD = 0.6
+_PAIR_COUNT = 1000
+
+
+def parse_option():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--candidates",
+        type=int,
+        default=1000,
+        help="number of candidates of each one-to-many comparison.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+
+    return parser.parse_args()
+
+
+def legacy_normalize_pkg_name(name):
+    return re.sub(sys.executable, "", name, flags=re.IGNORECASE).lower()
+
+
+def legacy_ratio(a, b):
+    if not a or not b:
+        return 0
+
+    return SequenceMatcher(a=legacy_normalize_pkg_name(a), b=legacy_normalize_pkg_name(b)).ratio()
+
+
+def legacy_best_match(name, candidates):
+    best_candidate = None
+    best_ratio = 0
+
+    for candidate in candidates:
+        ratio = legacy_ratio(name, candidate)
+        if ratio >= _THRESHOLD and ratio > best_ratio:
+            best_candidate, best_ratio = candidate, ratio
+
+    return best_candidate
+
+
+def make_word(rand, min_len=3, max_len=10):
+    return "".join(
+        rand.choice(string.ascii_lowercase) for _ in range(rand.randint(min_len, max_len))
+    )
+
+
+def make_pkg_names(count, rand):
+    prefixes = ("", "", "py", "python-")
+    suffixes = ("", "", "-py", "-python")
+    separators = ("-", "_", ".")
+
+    return [
+        "{}{}{}{}{}".format(
+            rand.choice(prefixes),
+            make_word(rand),
+            rand.choice(separators),
+            make_word(rand),
+            rand.choice(suffixes),
+        )
+        for _ in range(count)
+    ]
+
+
+def make_person_names(count, rand):
+    return [
+        "{} {}".format(make_word(rand).capitalize(), make_word(rand).capitalize())
+        for _ in range(count)
+    ]
+
+
+def measure(func, repeat):
+    """
+    :return: The best time of ``repeat`` runs.
+    """
+
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def print_result(label, legacy_time, new_time, op_count):
+    print(
+        "  {:<28s} legacy={:10.3f} us  matcher={:10.3f} us  speedup={:6.1f}x".format(
+            label,
+            legacy_time * 1000000 / op_count,
+            new_time * 1000000 / op_count,
+            legacy_time / new_time if new_time else float("inf"),
+        )
+    )
+
+
+def bench_pairs(pkg_names, repeat):
+    matcher = NameMatcher(_THRESHOLD)
+    pairs = list(zip(pkg_names, reversed(pkg_names)))[:_PAIR_COUNT]
+
+    def run_legacy():
+        for a, b in pairs:
+            legacy_ratio(a, b) >= _THRESHOLD
+
+    def run_matcher():
+        for a, b in pairs:
+            matcher.is_match(a, b)
+
+    print_result(
+        "is_match (per pair)", measure(run_legacy, repeat), measure(run_matcher, repeat), len(pairs)
+    )
+
+
+def bench_best_match(names, candidates, label, normalizer, repeat):
+    matcher = NameMatcher(_THRESHOLD, normalizer=normalizer)
+
+    def run_legacy():
+        for name in names:
+            legacy_best_match(name, candidates)
+
+    def run_matcher():
+        for name in names:
+            matcher.best_match(name, candidates)
+
+    op_count = len(names) * len(candidates)
+    print_result(label, measure(run_legacy, repeat), measure(run_matcher, repeat), op_count)
+
+
+def bench_normalize(pkg_names, repeat):
+    def run_legacy():
+        for name in pkg_names:
+            legacy_normalize_pkg_name(name)
+
+    def run_matcher():
+        for name in pkg_names:
+            normalize_pkg_name(name)
+
+    print_result(
+        "normalize (per name)",
+        measure(run_legacy, repeat),
+        measure(run_matcher, repeat),
+        len(pkg_names),
+    )
+
+
+def main():
+    options = parse_option()
+    rand = random.Random(options.seed)
+
+    pkg_names = make_pkg_names(options.candidates, rand)
+    # queries are similar to some of the candidates: the matcher can not reject all of them
+    # by the pre-filters
+    queries = [name.replace("-", "_") for name in rand.sample(pkg_names, 10)]
+    person_names = make_person_names(options.candidates, rand)
+    person_queries = [name.lower() for name in rand.sample(person_names, 10)]
+
+    print("candidates: {:d}, threshold: {}".format(options.candidates, _THRESHOLD))
+    bench_normalize(pkg_names, options.repeat)
+    bench_pairs(pkg_names, options.repeat)
+    bench_best_match(
+        queries, pkg_names, "best_match pkg (per cand)", normalize_pkg_name, options.repeat
+    )
+    bench_best_match(
+        person_queries,
+        person_names,
+        "best_match person (per cand)",
+        normalize_person_name,
+        options.repeat,
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+"""
+Compare the ``pip show`` backends over the distributions installed in the current
+environment: reading metadata in-process, executing ``pip show`` per package, and reading
+all of the distributions in one pass.
+
+Run in a virtual environment with a few hundred packages and this package installed
+(``pip install -e .``):
+
+    python benchmarks/bench_pip_show.py --limit 300
+
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import argparse
+import sys
+import time
+
+from thank_you_stars._pip_show import (
+    PipShow,
+    PipShowBackend,
+    PipShowError,
+    importlib_metadata,
+    load_installed_packages,
+)
+
+
+def parse_option():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="maximum number of packages to fetch. defaults to all of the installed packages.",
+    )
+    parser.add_argument(
+        "--skip-subprocess",
+        action="store_true",
+        default=False,
+        help="skip the subprocess backend that takes about a second per package.",
+    )
+
+    return parser.parse_args()
+
+
+def list_installed_pkg_names():
+    pkg_names = set()
+
+    for dist in importlib_metadata.distributions():
+        name = dist.metadata.get("Name")
+        if name:
+            pkg_names.add(name)
+
+    return sorted(pkg_names, key=str.lower)
+
+
+def measure_fetch(pkg_names, backend):
+    failed_count = 0
+    begin = time.perf_counter()
+
+    for pkg_name in pkg_names:
+        try:
+            PipShow.fetch(pkg_name, backend=backend)
+        except PipShowError:
+            failed_count += 1
+
+    return (time.perf_counter() - begin, failed_count)
+
+
+def print_result(label, elapsed, pkg_count):
+    print(
+        "{:<24s} total={:9.3f} s  per package={:9.3f} ms".format(
+            label, elapsed, elapsed * 1000 / max(pkg_count, 1)
+        )
+    )
+
+
+def main():
+    options = parse_option()
+
+    if importlib_metadata is None:
+        print("importlib.metadata or importlib_metadata package is required", file=sys.stderr)
+        return 1
+
+    pkg_names = list_installed_pkg_names()[: options.limit]
+    pkg_count = len(pkg_names)
+    print("packages: {}".format(pkg_count))
+
+    backends = [PipShowBackend.METADATA]
+    if not options.skip_subprocess:
+        backends.append(PipShowBackend.SUBPROCESS)
+
+    for backend in backends:
+        elapsed, failed_count = measure_fetch(pkg_names, backend)
+        print_result("fetch ({})".format(backend.value), elapsed, pkg_count)
+        if failed_count:
+            print("  failed: {}".format(failed_count))
+
+    begin = time.perf_counter()
+    installed = load_installed_packages()
+    elapsed = time.perf_counter() - begin
+    print_result("load_installed_packages", elapsed, len(installed.pip_show_map))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
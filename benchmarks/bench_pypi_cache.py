@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+
+"""
+Compare the PyPI info cache of the whole ``info`` object of the PyPI JSON API against
+the compact projected record: total size of cache files and time to load them.
+
+Synthetic ``info`` objects are used by default. Responses of the PyPI JSON API that saved
+to files (e.g. ``curl -o requests.json https://pypi.org/pypi/requests/json``) can be used
+instead:
+
+    python benchmarks/bench_pypi_cache.py --info-json requests.json numpy.json
+
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from thank_you_stars._pypi import project_pypi_info
+
+
+_DESCRIPTION_LINE = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor "
+    "incididunt ut labore et dolore magna aliqua.\n"
+)
+
+
+def parse_option():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--packages", type=int, default=1000, help="number of cache files of each format."
+    )
+    parser.add_argument(
+        "--description-kb",
+        type=int,
+        default=20,
+        help="size of descriptions of synthetic info objects in KB.",
+    )
+    parser.add_argument(
+        "--info-json",
+        nargs="+",
+        default=None,
+        help="files of PyPI JSON API responses to use instead of synthetic info objects.",
+    )
+
+    return parser.parse_args()
+
+
+def make_synthetic_info(index, description_kb):
+    name = "package{:d}".format(index)
+    description = "# {}\n\nhttps://github.com/owner{:d}/{}\n\n".format(name, index, name)
+    description += _DESCRIPTION_LINE * (description_kb * 1024 // len(_DESCRIPTION_LINE))
+
+    return {
+        "author": "Author {:d}".format(index),
+        "author_email": "author{:d}@example.com".format(index),
+        "bugtrack_url": None,
+        "classifiers": [
+            "Development Status :: 5 - Production/Stable",
+            "Intended Audience :: Developers",
+            "License :: OSI Approved :: MIT License",
+            "Operating System :: OS Independent",
+            "Programming Language :: Python :: 3",
+        ],
+        "description": description,
+        "description_content_type": "text/markdown",
+        "docs_url": None,
+        "download_url": "",
+        "home_page": "https://github.com/owner{:d}/{}".format(index, name),
+        "keywords": "",
+        "license": "MIT",
+        "maintainer": "",
+        "maintainer_email": "",
+        "name": name,
+        "package_url": "https://pypi.org/project/{}/".format(name),
+        "platform": "",
+        "project_url": "https://pypi.org/project/{}/".format(name),
+        "project_urls": {
+            "Homepage": "https://github.com/owner{:d}/{}".format(index, name),
+            "Source": "https://github.com/owner{:d}/{}".format(index, name),
+        },
+        "release_url": "https://pypi.org/project/{}/1.0.0/".format(name),
+        "requires_dist": ["requests (>=2.0)"],
+        "requires_python": ">=3.5",
+        "summary": "synthetic package {:d}".format(index),
+        "version": "1.0.0",
+    }
+
+
+def load_info_list(options):
+    if not options.info_json:
+        return [make_synthetic_info(i, options.description_kb) for i in range(options.packages)]
+
+    info_list = []
+    for filepath in options.info_json:
+        with open(filepath, encoding="utf8") as f:
+            response = json.load(f)
+
+        info_list.append(response.get("info", response))
+
+    # repeat the given info objects to the number of packages
+    return [info_list[i % len(info_list)] for i in range(options.packages)]
+
+
+def write_cache_files(cache_dir, records):
+    total_size = 0
+    begin = time.perf_counter()
+
+    for i, record in enumerate(records):
+        filepath = os.path.join(cache_dir, "{:d}.json".format(i))
+        with open(filepath, "w", encoding="utf8") as f:
+            f.write(json.dumps(record))
+
+        total_size += os.path.getsize(filepath)
+
+    return (total_size, time.perf_counter() - begin)
+
+
+def load_cache_files(cache_dir, count):
+    begin = time.perf_counter()
+
+    for i in range(count):
+        with open(os.path.join(cache_dir, "{:d}.json".format(i)), encoding="utf8") as f:
+            json.loads(f.read())
+
+    return time.perf_counter() - begin
+
+
+def print_result(label, total_size, write_time, load_time, count):
+    print(
+        "{:<10s} size={:10.1f} KB  write={:8.3f} ms  load={:8.3f} ms  "
+        "load per package={:8.3f} ms".format(
+            label,
+            total_size / 1024,
+            write_time * 1000,
+            load_time * 1000,
+            load_time * 1000 / max(count, 1),
+        )
+    )
+
+
+def main():
+    options = parse_option()
+    info_list = load_info_list(options)
+    count = len(info_list)
+
+    begin = time.perf_counter()
+    projected_list = [project_pypi_info(info) for info in info_list]
+    project_time = time.perf_counter() - begin
+
+    print("packages: {:d}".format(count))
+    print("projection: {:.3f} ms per package".format(project_time * 1000 / max(count, 1)))
+
+    for label, records in (("blob", info_list), ("projected", projected_list)):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            total_size, write_time = write_cache_files(cache_dir, records)
+            load_time = load_cache_files(cache_dir, count)
+
+        print_result(label, total_size, write_time, load_time, count)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+"""
+Measure starred repository lookups and the dependency traversal on synthetic data
+of 10k and 100k items: membership tests of the starred repositories index (in-memory and
+memory-mapped) against scans of a list, and list_pypi_packages over dependency graphs.
+
+    python benchmarks/bench_starred.py --sizes 10000 100000
+
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import argparse
+import functools
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+from tqdm import tqdm
+
+from thank_you_stars import _extractor
+from thank_you_stars._cache import CacheType
+from thank_you_stars._const import Default
+from thank_you_stars._extractor import GithubStarredInfoExtractor
+from thank_you_stars._pip_show import PipShow
+from thank_you_stars._starred import MappedStarredRepoIndex, StarredRepoIndex
+
+
+_User = namedtuple("_User", "login")
+
+_LOOKUP_COUNT = 10000
+_LIST_SCAN_LOOKUP_COUNT = 100
+_GRAPH_FANOUT = 3
+
+
+class _GithubClient:
+    def get_user(self):
+        return _User(login="bench")
+
+
+def parse_option():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10000, 100000],
+        help="numbers of starred repositories and packages of dependency graphs.",
+    )
+    parser.add_argument("--max-workers", type=int, default=Default.MAX_WORKERS)
+    parser.add_argument(
+        "--progress",
+        action="store_true",
+        default=False,
+        help="show progress bars of the dependency traversal.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+    return parser.parse_args()
+
+
+def make_repo_ids(size, rand):
+    return ["Owner{:d}/Repo-{:d}".format(rand.randrange(size), i) for i in range(size)]
+
+
+def make_lookup_keys(repo_ids, count, rand):
+    """
+    Half of the keys are starred repositories in a different case,
+    and the others are not starred.
+    """
+
+    keys = []
+    for i in range(count):
+        if i % 2 == 0:
+            keys.append(rand.choice(repo_ids).upper())
+        else:
+            keys.append("missing/repo-{:d}".format(i))
+
+    return keys
+
+
+def measure_per_op(func, keys):
+    begin = time.perf_counter()
+    for key in keys:
+        func(key)
+
+    return (time.perf_counter() - begin) / len(keys)
+
+
+def print_result(label, elapsed, unit="us"):
+    scale = {"us": 1000000, "ms": 1000, "s": 1}[unit]
+    print("  {:<40s} {:12.3f} {}".format(label, elapsed * scale, unit))
+
+
+def bench_starred_index(size, rand):
+    repo_ids = make_repo_ids(size, rand)
+    keys = make_lookup_keys(repo_ids, _LOOKUP_COUNT, rand)
+
+    print("starred repositories: {:d}".format(size))
+
+    begin = time.perf_counter()
+    index = StarredRepoIndex(repo_ids)
+    print_result("build StarredRepoIndex", time.perf_counter() - begin, "ms")
+
+    # the list scan baseline compares case-insensitively as the index does
+    def scan_list(key):
+        key = key.casefold()
+        return any(repo_id.casefold() == key for repo_id in repo_ids)
+
+    print_result(
+        "lookup: list scan (per op)",
+        measure_per_op(scan_list, keys[:_LIST_SCAN_LOOKUP_COUNT]),
+    )
+    print_result("lookup: StarredRepoIndex (per op)", measure_per_op(index.__contains__, keys))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filepath = os.path.join(tmp_dir, "starred_index")
+
+        begin = time.perf_counter()
+        with open(filepath, "w", encoding="utf8") as f:
+            f.write(index.dumps())
+        print_result("dump compact form", time.perf_counter() - begin, "ms")
+        print("  {:<40s} {:12d} bytes".format("compact form size", os.path.getsize(filepath)))
+
+        begin = time.perf_counter()
+        with open(filepath, encoding="utf8") as f:
+            StarredRepoIndex.loads(f.read())
+        print_result("load StarredRepoIndex", time.perf_counter() - begin, "ms")
+
+        begin = time.perf_counter()
+        MappedStarredRepoIndex(filepath).close()
+        print_result("load MappedStarredRepoIndex", time.perf_counter() - begin, "ms")
+        with MappedStarredRepoIndex(filepath) as mapped_index:
+            print_result(
+                "lookup: MappedStarredRepoIndex (per op)",
+                measure_per_op(mapped_index.__contains__, keys),
+            )
+
+
+def make_pip_show_map(size, rand):
+    """
+    Dependency graph of ``size`` packages: a package requires packages that have greater
+    numbers, so that the graph is a DAG that shares dependencies between packages.
+    """
+
+    pip_show_map = {}
+
+    for i in range(size):
+        requires = {
+            "pkg{:d}".format(rand.randrange(i + 1, size))
+            for _ in range(_GRAPH_FANOUT)
+            if i + 1 < size
+        }
+        pip_show_map["pkg{:d}".format(i)] = "Name: pkg{:d}\nRequires: {}\n".format(
+            i, ", ".join(sorted(requires))
+        )
+
+    return pip_show_map
+
+
+def bench_list_pypi_packages(size, max_workers, rand):
+    print("dependency graph: {:d} packages".format(size))
+
+    pip_show_map = make_pip_show_map(size, rand)
+    required = {
+        require_name
+        for pip_show in pip_show_map.values()
+        for require_name in PipShow(pip_show).extract_requires()
+    }
+    root_pkg_names = sorted(set(pip_show_map) - required)
+
+    PipShow.preload(pip_show_map, exclusive=True)
+    extractor = GithubStarredInfoExtractor(
+        github_client=_GithubClient(),
+        max_depth=size,
+        cache_mgr_map={CacheType.GITHUB: None, CacheType.PYPI: None, CacheType.PIP: None},
+        starred_repo_index=StarredRepoIndex(),
+        max_workers=max_workers,
+    )
+
+    begin = time.perf_counter()
+    extractor.list_pypi_packages([(pkg_name, 0) for pkg_name in root_pkg_names])
+    elapsed = time.perf_counter() - begin
+
+    print_result("list_pypi_packages", elapsed, "s")
+    print("  {:<40s} {:12d}".format("root packages", len(root_pkg_names)))
+    print("  {:<40s} {:12d}".format("reached packages", len(extractor.repo_depth_map)))
+    print("  {:<40s} {:12d}".format("max depth", max(extractor.repo_depth_map.values())))
+
+    PipShow.preload({})
+
+
+def main():
+    options = parse_option()
+
+    if not options.progress:
+        # progress bars are refreshed for each package, which buries the results
+        _extractor.tqdm = functools.partial(tqdm, disable=True)
+
+    for size in options.sizes:
+        bench_starred_index(size, random.Random(options.seed))
+
+    for size in options.sizes:
+        bench_list_pypi_packages(size, options.max_workers, random.Random(options.seed))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -50,7 +50,7 @@ setuptools.setup(
     python_requires=">=3.5",
     install_requires=INSTALL_REQUIRES,
     tests_require=TESTS_REQUIRES,
-    extras_require={"test": TESTS_REQUIRES},
+    extras_require={"async": ["aiohttp>=3.6,<4"], "test": TESTS_REQUIRES},
     classifiers=[
         "Development Status :: 4 - Beta",
         "Environment :: Console",
@@ -0,0 +1,218 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import time
+
+import pytest
+
+from thank_you_stars._cache import (
+    CacheBackend,
+    CacheManager,
+    CacheState,
+    CacheTime,
+    CacheType,
+    make_cache_policy,
+)
+from thank_you_stars._config import load_cache_configs
+
+
+@pytest.fixture
+def home_dir(tmpdir, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmpdir))
+
+    return tmpdir
+
+
+class Test_CacheManager:
+    @pytest.mark.parametrize(["backend"], [[backend] for backend in CacheBackend])
+    def test_normal(self, home_dir, backend):
+        cache_mgr = CacheManager("tester", "PyPI", CacheTime(days=14), backend)
+        cache_filepath = cache_mgr.get_pkg_cache_filepath("Pkg_Name", "starred_info")
+
+        assert not cache_mgr.is_cache_available(cache_filepath)
+
+        cache_mgr.dump_json(cache_filepath, {"a": 1})
+        assert cache_mgr.is_cache_available(cache_filepath)
+        assert cache_mgr.load_json(cache_filepath) == {"a": 1}
+
+        cache_mgr.remove_pkg_cache("Pkg_Name", "starred_info")
+        assert not cache_mgr.is_cache_available(cache_filepath)
+
+        cache_filepath = cache_mgr.get_misc_cache_filepath("owner/repo", "negative")
+        cache_mgr.touch(cache_filepath)
+        assert cache_mgr.is_cache_available(cache_filepath)
+        assert cache_mgr.read_text(cache_filepath) == ""
+
+    @pytest.mark.parametrize(["backend"], [[backend] for backend in CacheBackend])
+    def test_normal_expired(self, home_dir, backend):
+        cache_mgr = CacheManager("tester", "PyPI", CacheTime(seconds=0), backend)
+        cache_filepath = cache_mgr.get_pkg_cache_filepath("pkg", "pypi_desc")
+        cache_mgr.write_text(cache_filepath, "{}")
+
+        assert not cache_mgr.is_cache_available(cache_filepath)
+
+    @pytest.mark.parametrize(["backend"], [[backend] for backend in CacheBackend])
+    def test_normal_expires_at(self, home_dir, backend):
+        cache_mgr = CacheManager("tester", "PyPI", CacheTime(seconds=100), backend)
+        cache_filepath = cache_mgr.get_pkg_cache_filepath("pkg", "pypi_desc")
+
+        assert cache_mgr.get_expires_at(cache_filepath) is None
+
+        before = time.time()
+        cache_mgr.write_text(cache_filepath, "{}")
+        assert before + 99 <= cache_mgr.get_expires_at(cache_filepath) <= time.time() + 101
+
+    @pytest.mark.parametrize(["backend"], [[backend] for backend in CacheBackend])
+    def test_normal_stale(self, home_dir, backend):
+        cache_mgr = CacheManager(
+            "tester",
+            "PyPI",
+            CacheTime(seconds=0),
+            backend,
+            stale_lifetime=CacheTime(days=1),
+        )
+        cache_filepath = cache_mgr.get_pkg_cache_filepath("pkg", "pypi_desc")
+        cache_mgr.write_text(cache_filepath, "{}")
+        revalidated = []
+
+        assert cache_mgr.get_cache_state(cache_filepath) == CacheState.STALE
+        assert not cache_mgr.is_cache_available(cache_filepath)
+        assert cache_mgr.is_cache_available(cache_filepath, allow_stale=True)
+        assert cache_mgr.read_text(cache_filepath) == "{}"
+
+        assert cache_mgr.revalidate(cache_filepath, lambda: revalidated.append(cache_filepath))
+        cache_mgr.wait_revalidation()
+        assert revalidated == [cache_filepath]
+
+        fresh_cache_filepath = cache_mgr.get_pkg_cache_filepath("pkg", "starred_info")
+        assert not cache_mgr.revalidate(fresh_cache_filepath, lambda: None)
+
+    def test_normal_jitter(self, home_dir):
+        cache_mgr = CacheManager("tester", "PyPI", CacheTime(seconds=1000), jitter=0.5)
+
+        for package_name in ["a", "b", "c"]:
+            cache_filepath = cache_mgr.get_pkg_cache_filepath(package_name, "pypi_desc")
+            before = time.time()
+            cache_mgr.write_text(cache_filepath, "{}")
+            expires_at = cache_mgr.get_expires_at(cache_filepath)
+
+            assert before + 499 <= expires_at <= time.time() + 1001
+            assert cache_mgr.get_expires_at(cache_filepath) == expires_at
+
+    def test_normal_migration(self, home_dir):
+        file_cache_mgr = CacheManager("tester", "GitHub", CacheTime(days=14), CacheBackend.FILE)
+        file_cache_mgr.write_text(
+            file_cache_mgr.get_misc_cache_filepath("owner/repo/author_name", "tester"), "1"
+        )
+
+        sqlite_cache_mgr = CacheManager("tester", "GitHub", CacheTime(days=14), CacheBackend.SQLITE)
+        cache_filepath = sqlite_cache_mgr.get_misc_cache_filepath(
+            "owner/repo/author_name", "tester"
+        )
+
+        assert sqlite_cache_mgr.is_cache_available(cache_filepath)
+        assert sqlite_cache_mgr.read_text(cache_filepath) == "1"
+
+    def test_normal_storage_lifetime(self, home_dir, monkeypatch):
+        def create_cache_mgr(cache_type, no_cache):
+            if no_cache:
+                return CacheManager(
+                    "tester",
+                    cache_type,
+                    CacheTime(seconds=10),
+                    CacheBackend.SQLITE,
+                    storage_lifetime=CacheTime(days=14),
+                )
+
+            return CacheManager("tester", cache_type, CacheTime(days=14), CacheBackend.SQLITE)
+
+        file_cache_mgr = CacheManager("tester", "PyPI", CacheTime(days=14), CacheBackend.FILE)
+        file_cache_mgr.write_text(file_cache_mgr.get_pkg_cache_filepath("pkg", "pypi_desc"), "{}")
+
+        # an entry that written by a run without caches an hour ago
+        now = time.time()
+        with monkeypatch.context() as m:
+            m.setattr(time, "time", lambda: now - 3600)
+            cache_mgr = create_cache_mgr("GitHub", no_cache=True)
+            cache_mgr.write_text(cache_mgr.get_misc_cache_filepath("owner/repo", "old"), "old")
+
+        # runs without caches: existing entries are neither read nor deleted
+        cache_mgr = create_cache_mgr("PyPI", no_cache=True)
+        assert not cache_mgr.is_cache_available(
+            cache_mgr.get_pkg_cache_filepath("pkg", "pypi_desc")
+        )
+        cache_mgr = create_cache_mgr("GitHub", no_cache=True)
+        assert not cache_mgr.is_cache_available(
+            cache_mgr.get_misc_cache_filepath("owner/repo", "old")
+        )
+        cache_mgr.write_text(cache_mgr.get_misc_cache_filepath("owner/repo", "new"), "new")
+
+        cache_mgr = create_cache_mgr("PyPI", no_cache=False)
+        assert cache_mgr.is_cache_available(cache_mgr.get_pkg_cache_filepath("pkg", "pypi_desc"))
+        cache_mgr = create_cache_mgr("GitHub", no_cache=False)
+        for name in ("old", "new"):
+            cache_filepath = cache_mgr.get_misc_cache_filepath("owner/repo", name)
+            assert cache_mgr.is_cache_available(cache_filepath)
+            assert cache_mgr.read_text(cache_filepath) == name
+
+    @pytest.mark.parametrize(["backend"], [[backend] for backend in CacheBackend])
+    def test_normal_memo(self, home_dir, backend):
+        cache_mgr = CacheManager("tester", "pip", CacheTime(days=14), backend)
+        cache_filepath = cache_mgr.get_pkg_cache_filepath("pkg", "pip_show")
+
+        assert not cache_mgr.is_cache_available(cache_filepath)
+        assert cache_mgr.memo_stats.misses == 1
+
+        cache_mgr.write_text(cache_filepath, "Name: pkg")
+        assert cache_mgr.is_cache_available(cache_filepath)
+        assert cache_mgr.read_text(cache_filepath) == "Name: pkg"
+        assert cache_mgr.memo_stats.hits == 2
+
+        cache_mgr.remove_pkg_cache("pkg", "pip_show")
+        assert not cache_mgr.is_cache_available(cache_filepath)
+        assert cache_mgr.memo_stats.misses == 2
+
+    def test_normal_memo_eviction(self, home_dir):
+        cache_mgr = CacheManager("tester", "pip", CacheTime(days=14), memo_size=2)
+
+        for package_name in ("a", "b", "c"):
+            cache_mgr.is_cache_available(cache_mgr.get_pkg_cache_filepath(package_name, "pip_show"))
+
+        assert cache_mgr.memo_stats.size == 2
+
+
+class Test_make_cache_policy:
+    def test_normal(self):
+        policy = make_cache_policy(CacheType.PYPI)
+        assert policy.lifetime == CacheTime(days=14)
+        assert policy.stale_lifetime == CacheTime(days=7)
+
+        policy = make_cache_policy(
+            CacheType.PYPI,
+            {"default": {"lifetime_days": 3, "jitter": 0}, "pypi": {"stale_days": 1}},
+        )
+        assert policy.lifetime == CacheTime(days=3)
+        assert policy.stale_lifetime == CacheTime(days=1)
+        assert policy.jitter == 0
+
+    @pytest.mark.parametrize(
+        ["cache_configs"],
+        [
+            [{"default": {"lifetime_days": "a"}}],
+            [{"PyPI": {"stale_days": -1}}],
+            [{"PyPI": {"jitter": 1}}],
+        ],
+    )
+    def test_exception(self, cache_configs):
+        with pytest.raises(ValueError):
+            make_cache_policy(CacheType.PYPI, cache_configs)
+
+
+class Test_load_cache_configs:
+    def test_normal(self, tmpdir):
+        p = tmpdir.join("config.json")
+        p.write('{"token": "xxx", "cache": {"GitHub": {"lifetime_days": 7}}}')
+
+        assert load_cache_configs(str(p)) == {"GitHub": {"lifetime_days": 7}}
+        assert load_cache_configs(str(tmpdir.join("not_exist.json"))) == {}
@@ -0,0 +1,47 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import pytest
+
+from thank_you_stars._candidate import CandidateRank, extract_repo_candidates
+
+
+PIP_SHOW_CONTENT = """\
+Name: pytablewriter
+Version: 0.47.0
+Summary: see https://github.com/summary/ignored
+Home-page: https://github.com/thombashi/pytablewriter.git
+Author: Tsuyoshi Hombashi
+Project-URL: Source, https://github.com/thombashi/pytablewriter
+Project-URL: Tracker, https://github.com/thombashi/pytablewriter-issues/issues
+"""
+
+
+class Test_extract_repo_candidates:
+    def test_normal(self):
+        pypi_info = {
+            "home_page": None,
+            "project_urls": {"Docs": "https://github.com/thombashi/DataProperty"},
+            "github_repo_urls": [
+                "https://github.com/thombashi/msgfy",
+                "https://github.com/Thombashi/PyTableWriter",
+                "https://github.com/fork/pytablewriter",
+            ],
+        }
+
+        candidates = extract_repo_candidates("pytablewriter", PIP_SHOW_CONTENT, pypi_info)
+
+        assert [(candidate.repo_id, candidate.rank) for candidate in candidates] == [
+            ("thombashi/pytablewriter", CandidateRank.METADATA_NAME_MATCH),
+            ("thombashi/pytablewriter-issues", CandidateRank.METADATA),
+            ("thombashi/DataProperty", CandidateRank.METADATA),
+            ("fork/pytablewriter", CandidateRank.DESCRIPTION_NAME_MATCH),
+        ]
+
+    @pytest.mark.parametrize(
+        ["pip_show_content", "pypi_info"],
+        [["", None], ["Home-page: https://example.com/", {}], [None, {"github_repo_urls": []}]],
+    )
+    def test_normal_empty(self, pip_show_content, pypi_info):
+        assert extract_repo_candidates("pkg", pip_show_content, pypi_info) == []
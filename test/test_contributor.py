@@ -0,0 +1,151 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+from thank_you_stars._contributor import (
+    _PER_PAGE,
+    Contributor,
+    ContributorIndex,
+    fetch_contributor_full_names,
+    fetch_contributor_index,
+)
+from thank_you_stars._matcher import NameMatcher, normalize_person_name
+from thank_you_stars._verifier import ApiRequestType, VerificationCounter
+
+
+class _NamedUser:
+    """
+    Imitate lazy completion of PyGithub: attributes other than the login of the list
+    responses require a request per user.
+    """
+
+    def __init__(self, login, name):
+        self.login = login
+        self.__name = name
+        self.completion_count = 0
+
+    @property
+    def name(self):
+        self.completion_count += 1
+
+        return self.__name
+
+
+class _PaginatedList:
+    def __init__(self, users):
+        self.__users = users
+        self.requested_pages = []
+
+    def get_page(self, page):
+        self.requested_pages.append(page)
+
+        return self.__users[page * _PER_PAGE : (page + 1) * _PER_PAGE]
+
+
+class _Owner:
+    login = "owner"
+
+
+class _Repository:
+    name = "repo"
+    owner = _Owner()
+
+    def __init__(self, users):
+        self.contributors = _PaginatedList(users)
+
+    def get_contributors(self):
+        return self.contributors
+
+
+class _GithubClient:
+    def __init__(self, full_name_map=None):
+        self.__full_name_map = full_name_map or {}
+        self.requested_logins = []
+        self.call_count = 0
+
+    def call(self, bucket, func, *args):
+        self.call_count += 1
+
+        return func(*args)
+
+    def get_user(self, login):
+        self.requested_logins.append(login)
+
+        return _NamedUser(login, self.__full_name_map.get(login))
+
+
+class Test_ContributorIndex:
+    def test_normal(self):
+        matcher = NameMatcher(0.6, normalizer=normalize_person_name)
+        index = ContributorIndex(
+            [
+                Contributor(login_name="thombashi", full_name="Tsuyoshi Hombashi"),
+                Contributor(login_name="someone", full_name=None),
+            ]
+        )
+
+        assert index.find(["tsuyoshi  HOMBASHI"], matcher).ratio == 1
+        assert index.find(["", "Someone"], matcher).name == "someone"
+        assert index.find(["Tsuyoshi Hombash"], matcher).name == "Tsuyoshi Hombashi"
+        assert index.find(["unknown"], matcher) is None
+
+        restored = ContributorIndex.loads(index.dumps())
+        assert restored.contributors == index.contributors
+        assert restored.is_complete
+        assert restored.resolved_count == index.resolved_count
+        assert ContributorIndex.loads({"schema_version": 0}) is None
+
+
+class Test_fetch_contributor_index:
+    def test_normal(self):
+        users = [_NamedUser("user{}".format(i), "User {}".format(i)) for i in range(_PER_PAGE + 1)]
+        repo = _Repository(users)
+
+        client = _GithubClient()
+        counter = VerificationCounter()
+
+        index = fetch_contributor_index(repo, max_pages=5, github_client=client, counter=counter)
+
+        assert len(index) == _PER_PAGE + 1
+        assert index.is_complete
+        assert index.resolved_count == 0
+        assert repo.contributors.requested_pages == [0, 1]
+        assert sum(user.completion_count for user in users) == 0
+        assert client.call_count == 2
+        assert counter.stats.api_request_counts == {ApiRequestType.CONTRIBUTORS: 2}
+
+    def test_normal_page_limit(self):
+        repo = _Repository([_NamedUser("user{}".format(i), None) for i in range(_PER_PAGE * 3)])
+
+        index = fetch_contributor_index(repo, max_pages=2)
+
+        assert len(index) == _PER_PAGE * 2
+        assert not index.is_complete
+        assert repo.contributors.requested_pages == [0, 1]
+
+
+class Test_fetch_contributor_full_names:
+    def test_normal(self):
+        matcher = NameMatcher(0.9, normalizer=normalize_person_name)
+        client = _GithubClient({"user0": "Tsuyoshi Hombashi", "user3": "Someone Else"})
+        counter = VerificationCounter()
+        index = ContributorIndex(
+            [Contributor(login_name="user{}".format(i), full_name=None) for i in range(5)]
+        )
+        assert index.find(["Someone Else"], matcher) is None
+
+        resolved = fetch_contributor_full_names(index, client, max_users=2, counter=counter)
+
+        assert client.requested_logins == ["user0", "user1"]
+        assert resolved.resolved_count == 2
+        assert resolved.find(["Tsuyoshi Hombashi"], matcher).ratio == 1
+        assert resolved.find(["Someone Else"], matcher) is None
+        assert index.contributors[0].full_name is None
+
+        resolved = fetch_contributor_full_names(resolved, client, max_users=10, counter=counter)
+
+        assert client.requested_logins == ["user0", "user1", "user2", "user3", "user4"]
+        assert resolved.resolved_count == 5
+        assert resolved.find(["Someone Else"], matcher).name == "Someone Else"
+        assert client.call_count == 5
+        assert counter.stats.api_request_counts == {ApiRequestType.USERS: 5}
@@ -0,0 +1,513 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import threading
+from collections import namedtuple
+
+import pytest
+
+from thank_you_stars._async import AsyncDiscoveryEngine
+from thank_you_stars._cache import CacheType
+from thank_you_stars._const import StarStatus
+from thank_you_stars._extractor import GitHubStarredInfo, GithubStarredInfoExtractor
+from thank_you_stars._graphql import RepoResolution
+from thank_you_stars._mapping import MappingSource, RepoMappingDB, make_repo_mapping
+from thank_you_stars._negative import NegativeIndex, NegativeKind, NegativeReason
+from thank_you_stars._pip_show import PipShow
+from thank_you_stars._starred import StarredRepoIndex
+
+
+_User = namedtuple("_User", "login")
+_ContentFile = namedtuple("_ContentFile", "path decoded_content")
+
+DEPENDENCY_GRAPH = {
+    "root": ["a", "B", "c"],
+    "a": ["d", "c"],
+    "b": ["d"],
+    "c": ["e"],
+    "d": ["e", "root"],
+    "e": [],
+}
+
+
+class _GithubClient:
+    def get_user(self):
+        return _User(login="tester")
+
+
+class _EmptyCacheManager:
+    def is_cache_available(self, cache_filepath, allow_stale=False):
+        return False
+
+    def get_pkg_cache_filepath(self, package_name, filename):
+        return "{}/{}".format(package_name, filename)
+
+    def get_misc_cache_filepath(self, dir_name, filename):
+        return "{}/{}".format(dir_name, filename)
+
+    def dump_json(self, cache_filepath, data, indent=None):
+        pass
+
+    def write_text(self, cache_filepath, text):
+        pass
+
+
+class _Page:
+    def __init__(self, items):
+        self.__items = items
+
+    def get_page(self, page):
+        return self.__items if page == 0 else []
+
+
+class _Repository:
+    def __init__(self, owner_name, name):
+        self.owner = _User(login=owner_name)
+        self.name = name
+
+    @property
+    def organization(self):
+        # a repository of a user
+        return None
+
+    def get_contributors(self):
+        return _Page([])
+
+
+class _SearchGithubClient(_GithubClient):
+    """
+    Find a repository by the repository search, with files found by the code search.
+    """
+
+    def __init__(self, repos, content_files):
+        self.__repos = repos
+        self.__content_files = content_files
+        self.code_search_queries = []
+
+    def call(self, bucket, func, *args):
+        return func(*args)
+
+    def search_repositories(self, query, sort, order):
+        return _Page(self.__repos)
+
+    def search_code(self, query):
+        self.code_search_queries.append(query)
+
+        return _Page(self.__content_files)
+
+
+class _PyPIClient:
+    def __init__(self, pypi_info):
+        self.__pypi_info = pypi_info
+
+    def fetch_info(self, pypi_pkg_name):
+        return self.__pypi_info
+
+
+class _MetadataVerifier:
+    def __init__(self, result):
+        self.__result = result
+
+    def verify(self, repo_id, search_values):
+        return self.__result
+
+
+@pytest.fixture
+def fake_pip_show(monkeypatch):
+    def execute(package_name):
+        return PipShow("Requires: {}\n".format(", ".join(DEPENDENCY_GRAPH[package_name])))
+
+    monkeypatch.setattr(PipShow, "execute", execute)
+
+
+def create_extractor(max_depth, max_workers):
+    return GithubStarredInfoExtractor(
+        github_client=_GithubClient(),
+        max_depth=max_depth,
+        cache_mgr_map={CacheType.GITHUB: None, CacheType.PYPI: None, CacheType.PIP: None},
+        starred_repo_index=StarredRepoIndex(),
+        max_workers=max_workers,
+    )
+
+
+class Test_GithubStarredInfoExtractor_list_pypi_packages:
+    @pytest.mark.parametrize(
+        ["max_depth", "expected"],
+        [
+            [0, {"root": 0}],
+            [1, {"root": 0, "a": 1, "b": 1, "c": 1}],
+            [2, {"root": 0, "a": 1, "b": 1, "c": 1, "d": 2, "e": 2}],
+            [5, {"root": 0, "a": 1, "b": 1, "c": 1, "d": 2, "e": 2}],
+        ],
+    )
+    @pytest.mark.parametrize(["max_workers"], [[1], [4]])
+    def test_normal(self, fake_pip_show, max_depth, max_workers, expected):
+        extractor = create_extractor(max_depth, max_workers)
+        extractor.list_pypi_packages([("root", 0)])
+
+        assert extractor.repo_depth_map == expected
+
+    @pytest.mark.parametrize(["max_workers"], [[1], [4]])
+    def test_normal_deeper_queue(self, fake_pip_show, max_workers):
+        # a package queued deeper than its shortest path, e.g. a package of a lock file
+        extractor = create_extractor(max_depth=5, max_workers=max_workers)
+        extractor.list_pypi_packages([("e", 3), ("root", 0)])
+
+        assert extractor.repo_depth_map == {"root": 0, "a": 1, "b": 1, "c": 1, "d": 2, "e": 2}
+
+    def test_exception(self):
+        with pytest.raises(ValueError):
+            create_extractor(max_depth=1, max_workers=0)
+
+
+class Test_GithubStarredInfoExtractor_extract_starred_info:
+    def test_normal_repo_mapping(self, tmpdir):
+        repo_mapping_db = RepoMappingDB(str(tmpdir.join("mapping.sqlite3")))
+        repo_mapping_db.put(make_repo_mapping("msgfy", "thombashi/msgfy", MappingSource.METADATA))
+        extractor = GithubStarredInfoExtractor(
+            github_client=_GithubClient(),
+            max_depth=0,
+            cache_mgr_map={
+                CacheType.GITHUB: _EmptyCacheManager(),
+                CacheType.PYPI: _EmptyCacheManager(),
+                CacheType.PIP: None,
+            },
+            starred_repo_index=StarredRepoIndex(["thombashi/msgfy"]),
+            repo_mapping_db=repo_mapping_db,
+        )
+
+        # resolved without pip show, PyPI and GitHub API requests
+        starred_info = extractor.extract_starred_info("msgfy")
+        assert starred_info.github_repo_id == "thombashi/msgfy"
+        assert starred_info.star_status == StarStatus.STARRED
+        assert extractor.is_starred_info_cached("msgfy")
+
+    @pytest.mark.parametrize(
+        ["is_verified", "expected_queries"], [[True, 0], [False, 2], [None, 2]]
+    )
+    def test_normal_code_search_fallback(self, monkeypatch, is_verified, expected_queries):
+        # setup.py of the repository reads the author from __version__.py: the metadata
+        # files exist but do not include the author literally
+        monkeypatch.setattr(
+            PipShow,
+            "execute",
+            lambda package_name: PipShow(
+                "Name: sample-pkg\nAuthor: Tsuyoshi Hombashi\nRequires: \n"
+            ),
+        )
+        github_client = _SearchGithubClient(
+            repos=[_Repository("thombashi", "sample-pkg")],
+            content_files=[
+                _ContentFile(
+                    path="sample_pkg/__version__.py",
+                    decoded_content=(
+                        b'__author__ = "Tsuyoshi Hombashi"\n'
+                        b'__email__ = "tsuyoshi.hombashi@gmail.com"\n'
+                    ),
+                )
+            ],
+        )
+        extractor = GithubStarredInfoExtractor(
+            github_client=github_client,
+            max_depth=0,
+            cache_mgr_map={
+                CacheType.GITHUB: _EmptyCacheManager(),
+                CacheType.PYPI: _EmptyCacheManager(),
+                CacheType.PIP: None,
+            },
+            starred_repo_index=StarredRepoIndex(),
+            pypi_client=_PyPIClient({"author_email": "tsuyoshi.hombashi@gmail.com"}),
+            metadata_verifier=_MetadataVerifier(is_verified),
+        )
+
+        starred_info = extractor.extract_starred_info("sample-pkg")
+        assert starred_info.github_repo_id == "thombashi/sample-pkg"
+        assert starred_info.star_status == StarStatus.NOT_STARRED
+        assert len(github_client.code_search_queries) == expected_queries
+
+    def test_normal_negative_index(self):
+        negative_index = NegativeIndex()
+        negative_index.add(NegativeKind.PACKAGE, "unknown-pkg", NegativeReason.NO_MATCH)
+        negative_index.add(NegativeKind.PACKAGE, "limited-pkg", NegativeReason.RATE_LIMITED)
+        extractor = GithubStarredInfoExtractor(
+            github_client=_GithubClient(),
+            max_depth=0,
+            cache_mgr_map={CacheType.GITHUB: None, CacheType.PYPI: None, CacheType.PIP: None},
+            starred_repo_index=StarredRepoIndex(),
+            negative_index=negative_index,
+        )
+
+        # resolved without any cache access
+        assert extractor.extract_starred_info("unknown-pkg").star_status == StarStatus.NOT_FOUND
+        assert extractor.extract_starred_info("limited-pkg").star_status == StarStatus.NOT_AVAILABLE
+        assert extractor.is_starred_info_cached("unknown-pkg")
+        assert extractor.negative_stats.hits == 2
+
+
+class Test_GithubStarredInfoExtractor_iter_starred_info:
+    def test_normal_stream(self):
+        extractor = GithubStarredInfoExtractor(
+            github_client=_GithubClient(),
+            max_depth=0,
+            cache_mgr_map={CacheType.GITHUB: None, CacheType.PYPI: None, CacheType.PIP: None},
+            starred_repo_index=StarredRepoIndex(),
+            max_workers=2,
+            prefetch_chunk_size=2,
+        )
+        extractor.add_pypi_packages({"cached": 0, "a": 0, "b": 0, "c": 0})
+        prefetched_chunks = []
+        release_event = threading.Event()
+
+        def prefetch_repo_resolutions(pypi_pkg_names):
+            if "c" in pypi_pkg_names:
+                assert release_event.wait(timeout=10)
+            prefetched_chunks.append(pypi_pkg_names)
+
+        extractor.is_starred_info_cached = lambda pypi_pkg_name: pypi_pkg_name == "cached"
+        extractor.prefetch_repo_resolutions = prefetch_repo_resolutions
+        extractor.extract_starred_info = lambda pypi_pkg_name: GitHubStarredInfo(
+            pypi_pkg_name=pypi_pkg_name,
+            github_repo_id="owner/{}".format(pypi_pkg_name),
+            star_status=StarStatus.NOT_STARRED,
+            is_owned=False,
+            url=None,
+        )
+
+        starred_info_iter = extractor.iter_starred_info()
+
+        # results arrive before the last chunk is resolved
+        first_results = {next(starred_info_iter).pypi_pkg_name for _ in range(3)}
+        assert first_results == {"cached", "a", "b"}
+        assert prefetched_chunks == [["a", "b"]]
+
+        release_event.set()
+        assert [info.pypi_pkg_name for info in starred_info_iter] == ["c"]
+        assert prefetched_chunks == [["a", "b"], ["c"]]
+
+    def test_exception(self):
+        with pytest.raises(ValueError):
+            GithubStarredInfoExtractor(
+                github_client=_GithubClient(),
+                max_depth=0,
+                cache_mgr_map={CacheType.GITHUB: None, CacheType.PYPI: None, CacheType.PIP: None},
+                starred_repo_index=StarredRepoIndex(),
+                prefetch_chunk_size=0,
+            )
+
+
+class _GithubRepoClient(_SearchGithubClient):
+    """
+    Find repositories of packages by the project URLs of PyPI.
+    """
+
+    def __init__(self):
+        super().__init__(repos=[], content_files=[])
+        self.__lock = threading.Lock()
+        self.requested_repo_ids = []
+
+    def get_repo(self, repo_id):
+        with self.__lock:
+            self.requested_repo_ids.append(repo_id)
+
+        return _Repository(*repo_id.split("/"))
+
+
+class _ProjectUrlPyPIClient:
+    def fetch_info(self, pypi_pkg_name):
+        if pypi_pkg_name == "e":
+            # not found on PyPI
+            return None
+
+        return {"project_urls": {"Source": "https://github.com/owner/{}".format(pypi_pkg_name)}}
+
+
+class _RepoResolver:
+    """
+    Resolve repositories as the batched GraphQL queries do: the viewer starred ``owner/a``.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__resolution_map = {}
+        self.resolved_batches = []
+
+    def resolve(self, repo_ids):
+        with self.__lock:
+            self.resolved_batches.append(sorted(repo_ids))
+            for repo_id in repo_ids:
+                self.__resolution_map[repo_id] = RepoResolution(
+                    repo_id=repo_id,
+                    exists=True,
+                    name_with_owner=repo_id,
+                    owner_login=repo_id.split("/")[0],
+                    viewer_has_starred=repo_id == "owner/a",
+                )
+
+            return {repo_id: self.__resolution_map[repo_id] for repo_id in repo_ids}
+
+    def get(self, repo_id):
+        with self.__lock:
+            return self.__resolution_map.get(repo_id)
+
+
+def create_stub_extractor(tmpdir, name, max_depth, max_workers):
+    # a package with a mapping is extracted from the mapping without GitHub requests
+    repo_mapping_db = RepoMappingDB(str(tmpdir.join("{}.sqlite3".format(name))))
+    repo_mapping_db.put(make_repo_mapping("b", "mapped/b", MappingSource.METADATA))
+    github_client = _GithubRepoClient()
+    repo_resolver = _RepoResolver()
+    extractor = GithubStarredInfoExtractor(
+        github_client=github_client,
+        max_depth=max_depth,
+        cache_mgr_map={
+            CacheType.GITHUB: _EmptyCacheManager(),
+            CacheType.PYPI: _EmptyCacheManager(),
+            CacheType.PIP: None,
+        },
+        starred_repo_index=StarredRepoIndex(["owner/c"]),
+        max_workers=max_workers,
+        repo_resolver=repo_resolver,
+        pypi_client=_ProjectUrlPyPIClient(),
+        repo_mapping_db=repo_mapping_db,
+    )
+
+    return (extractor, github_client, repo_resolver)
+
+
+class Test_AsyncDiscoveryEngine:
+    @pytest.mark.parametrize(["max_depth"], [[0], [1], [2], [5]])
+    @pytest.mark.parametrize(["max_workers"], [[1], [4]])
+    @pytest.mark.parametrize(["prefetch_chunk_size"], [[1], [50]])
+    def test_normal(self, tmpdir, fake_pip_show, max_depth, max_workers, prefetch_chunk_size):
+        sync_extractor, sync_github_client, _resolver = create_stub_extractor(
+            tmpdir, "sync", max_depth, max_workers
+        )
+        sync_extractor.list_pypi_packages([("root", 0)])
+        sync_starred_infos = sync_extractor.collect_starred_info()
+
+        extractor, github_client, repo_resolver = create_stub_extractor(
+            tmpdir, "async", max_depth, max_workers
+        )
+        starred_infos = AsyncDiscoveryEngine(
+            extractor, max_workers=max_workers, prefetch_chunk_size=prefetch_chunk_size
+        ).run([("root", 0)])
+
+        # both of the engines extract the same results with the same clients
+        assert extractor.repo_depth_map == sync_extractor.repo_depth_map
+        assert starred_infos == sync_starred_infos
+        assert sorted(github_client.requested_repo_ids) == sorted(
+            sync_github_client.requested_repo_ids
+        )
+        assert github_client.code_search_queries == sync_github_client.code_search_queries
+
+        info_map = {info.pypi_pkg_name: info for info in starred_infos}
+        assert info_map["root"].github_repo_id == "owner/root"
+        if max_depth >= 1:
+            assert info_map["a"].star_status == StarStatus.STARRED
+            assert info_map["b"].github_repo_id == "mapped/b"
+            assert info_map["c"].star_status == StarStatus.STARRED
+        if max_depth >= 2:
+            assert info_map["e"].star_status == StarStatus.NOT_FOUND
+
+        # the package with the mapping is not resolved
+        assert all("owner/b" not in batch for batch in repo_resolver.resolved_batches)
+
+    def test_normal_stream(self, tmpdir, fake_pip_show):
+        sync_extractor, _client, _resolver = create_stub_extractor(
+            tmpdir, "sync", max_depth=5, max_workers=4
+        )
+        sync_extractor.list_pypi_packages([("root", 0)])
+
+        extractor, _client, _resolver = create_stub_extractor(
+            tmpdir, "async", max_depth=5, max_workers=4
+        )
+        starred_infos = list(
+            AsyncDiscoveryEngine(extractor, max_workers=4, prefetch_chunk_size=2).iter_run(
+                [("root", 0)]
+            )
+        )
+
+        assert len(starred_infos) == len(sync_extractor.repo_depth_map)
+        assert set(starred_infos) == sync_extractor.collect_starred_info()
+
+    def test_normal_stream_exception(self, fake_pip_show, monkeypatch):
+        extractor = create_extractor(max_depth=5, max_workers=2)
+        monkeypatch.setattr(extractor, "is_starred_info_cached", lambda pypi_pkg_name: True)
+
+        def extract_starred_info(pypi_pkg_name):
+            raise RuntimeError(pypi_pkg_name)
+
+        monkeypatch.setattr(extractor, "extract_starred_info", extract_starred_info)
+
+        with pytest.raises(RuntimeError):
+            list(AsyncDiscoveryEngine(extractor, max_workers=2).iter_run([("root", 0)]))
+
+    def test_normal_batch_resolution(self, fake_pip_show, monkeypatch):
+        extractor = create_extractor(max_depth=5, max_workers=4)
+        events = []
+        monkeypatch.setattr(
+            extractor, "is_starred_info_cached", lambda pypi_pkg_name: pypi_pkg_name in ("a", "b")
+        )
+        monkeypatch.setattr(
+            extractor.pypi_client, "fetch_info", lambda pypi_pkg_name: events.append("pypi")
+        )
+        monkeypatch.setattr(
+            extractor,
+            "prefetch_repo_resolutions",
+            lambda pypi_pkg_names: events.append(("prefetch", list(pypi_pkg_names))),
+        )
+
+        def extract_starred_info(pypi_pkg_name):
+            events.append(("extract", pypi_pkg_name))
+            return pypi_pkg_name
+
+        monkeypatch.setattr(extractor, "extract_starred_info", extract_starred_info)
+
+        starred_info_set = AsyncDiscoveryEngine(extractor, max_workers=4).run([("root", 0)])
+
+        assert starred_info_set == {"root", "a", "b", "c", "d", "e"}
+        assert events.count("pypi") == 4
+
+        # repositories of packages without caches are resolved at once before extraction
+        prefetch_index = events.index(("prefetch", ["c", "d", "e", "root"]))
+        assert [event for event in events[:prefetch_index] if event != "pypi"] == [
+            ("extract", "a"),
+            ("extract", "b"),
+        ]
+        assert sorted(events[prefetch_index + 1 :]) == [
+            ("extract", "c"),
+            ("extract", "d"),
+            ("extract", "e"),
+            ("extract", "root"),
+        ]
+
+    def test_normal_chunk_resolution(self, fake_pip_show, monkeypatch):
+        extractor = create_extractor(max_depth=5, max_workers=4)
+        prefetched_chunks = []
+        monkeypatch.setattr(extractor, "is_starred_info_cached", lambda pypi_pkg_name: False)
+        monkeypatch.setattr(extractor.pypi_client, "fetch_info", lambda pypi_pkg_name: None)
+        monkeypatch.setattr(extractor, "prefetch_repo_resolutions", prefetched_chunks.append)
+        monkeypatch.setattr(extractor, "extract_starred_info", lambda pypi_pkg_name: pypi_pkg_name)
+
+        starred_info_set = AsyncDiscoveryEngine(
+            extractor, max_workers=4, prefetch_chunk_size=4
+        ).run([("root", 0)])
+
+        # a chunk is resolved as soon as filled, and the rest after the discovery
+        assert starred_info_set == {"root", "a", "b", "c", "d", "e"}
+        assert [len(chunk) for chunk in prefetched_chunks] == [4, 2]
+        assert sorted(sum(prefetched_chunks, [])) == sorted(starred_info_set)
+
+    @pytest.mark.parametrize(
+        ["max_workers", "max_concurrency_per_host", "prefetch_chunk_size"],
+        [[0, 1, 1], [1, 0, 1], [1, 1, 0]],
+    )
+    def test_exception(self, max_workers, max_concurrency_per_host, prefetch_chunk_size):
+        with pytest.raises(ValueError):
+            AsyncDiscoveryEngine(
+                create_extractor(max_depth=1, max_workers=1),
+                max_workers=max_workers,
+                max_concurrency_per_host=max_concurrency_per_host,
+                prefetch_chunk_size=prefetch_chunk_size,
+            )
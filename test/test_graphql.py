@@ -0,0 +1,110 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from thank_you_stars._github import GitHubRestClient
+from thank_you_stars._graphql import GitHubRepoResolver, GraphQLError
+
+
+REPOSITORIES = {
+    "thombashi/thank-you-stars": {"starred": False},
+    "pygithub/pygithub": {"starred": True},
+}
+
+
+class _GraphQLStubHandler(BaseHTTPRequestHandler):
+    queries = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])).decode("utf8"))
+        variables = body["variables"]
+        self.queries.append(body["query"])
+
+        if variables.get("o0") == "error":
+            self.__write_json({"errors": [{"type": "RATE_LIMITED", "message": "exceeded"}]})
+            return
+
+        data = {}
+        errors = []
+        for alias in re.findall(r"(r\d+): repository", body["query"]):
+            i = alias[1:]
+            owner, name = variables["o" + i], variables["n" + i]
+            repo_id = "{}/{}".format(owner, name).lower()
+
+            if repo_id not in REPOSITORIES:
+                data[alias] = None
+                errors.append({"type": "NOT_FOUND", "path": [alias]})
+                continue
+
+            canonical_owner = repo_id.split("/")[0]
+            data[alias] = {
+                "nameWithOwner": repo_id,
+                "owner": {"login": canonical_owner},
+                "viewerHasStarred": REPOSITORIES[repo_id]["starred"],
+            }
+
+        self.__write_json({"data": data, "errors": errors})
+
+    def log_message(self, format, *args):
+        pass
+
+    def __write_json(self, result):
+        content = json.dumps(result).encode("utf8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+@pytest.fixture
+def stub_rest_client():
+    server = HTTPServer(("127.0.0.1", 0), _GraphQLStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _GraphQLStubHandler.queries = []
+
+    yield GitHubRestClient(token=None, base_url="http://127.0.0.1:{}".format(server.server_port))
+
+    server.shutdown()
+    server.server_close()
+
+
+class Test_GitHubRepoResolver:
+    def test_normal(self, stub_rest_client):
+        resolver = GitHubRepoResolver(stub_rest_client, batch_size=2)
+        repo_ids = [
+            "Thombashi/thank-you-stars",
+            "PyGithub/PyGithub",
+            "not/exist",
+            "pygithub/pygithub",
+        ]
+
+        result = resolver.resolve(repo_ids)
+
+        assert len(_GraphQLStubHandler.queries) == 2
+        assert result["Thombashi/thank-you-stars"].exists
+        assert result["Thombashi/thank-you-stars"].name_with_owner == "thombashi/thank-you-stars"
+        assert result["Thombashi/thank-you-stars"].owner_login == "thombashi"
+        assert not result["Thombashi/thank-you-stars"].viewer_has_starred
+        assert result["PyGithub/PyGithub"].viewer_has_starred
+        assert not result["not/exist"].exists
+        assert result["pygithub/pygithub"] == result["PyGithub/PyGithub"]
+
+        # resolved repositories are not queried again
+        resolver.resolve(repo_ids)
+        assert len(_GraphQLStubHandler.queries) == 2
+        assert resolver.get("PYGITHUB/pygithub").exists
+
+    def test_exception(self, stub_rest_client):
+        resolver = GitHubRepoResolver(stub_rest_client)
+
+        with pytest.raises(GraphQLError):
+            resolver.resolve(["error/repo"])
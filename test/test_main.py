@@ -0,0 +1,97 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import argparse
+import sys
+
+import pytest
+
+from thank_you_stars.__main__ import Command, iter_star_targets, parse_option
+from thank_you_stars._const import StarStatus
+from thank_you_stars._extractor import GitHubStarredInfo
+from thank_you_stars._starred import StarredRepoIndex
+
+
+def make_starred_info(pypi_pkg_name, repo_id, star_status=StarStatus.NOT_STARRED, is_owned=False):
+    return GitHubStarredInfo(
+        pypi_pkg_name=pypi_pkg_name,
+        github_repo_id=repo_id,
+        star_status=star_status,
+        is_owned=is_owned,
+        url=None,
+    )
+
+
+STARRED_INFOS = [
+    make_starred_info("six", "benjaminp/six"),
+    make_starred_info("msgfy", "thombashi/msgfy", is_owned=True),
+    make_starred_info("idna", "kjd/idna", StarStatus.STARRED),
+    make_starred_info("urllib3", "urllib3/urllib3"),
+    make_starred_info("missing", "[Repository not found]", StarStatus.NOT_FOUND),
+    make_starred_info("limited", "Exceed API rate limit", StarStatus.NOT_AVAILABLE),
+    make_starred_info("pytest-six", "benjaminp/six"),
+]
+
+
+class Test_iter_star_targets:
+    @pytest.mark.parametrize(
+        ["include_owner_repo", "expected"],
+        [
+            [False, ["benjaminp/six"]],
+            [True, ["benjaminp/six", "thombashi/msgfy"]],
+        ],
+    )
+    def test_normal(self, include_owner_repo, expected):
+        pkg_names_map = {}
+        repo_ids = list(
+            iter_star_targets(
+                iter(STARRED_INFOS),
+                StarredRepoIndex(["URLLIB3/urllib3"]),
+                pkg_names_map,
+                argparse.Namespace(include_owner_repo=include_owner_repo),
+            )
+        )
+
+        # a repository is yielded once even if multiple packages share it
+        assert repo_ids == expected
+        assert pkg_names_map["benjaminp/six"] == ["six", "pytest-six"]
+        assert set(pkg_names_map) == set(expected)
+
+    def test_normal_stream(self):
+        consumed = []
+
+        def iter_starred_info():
+            for starred_info in STARRED_INFOS:
+                consumed.append(starred_info.pypi_pkg_name)
+                yield starred_info
+
+        star_target_iter = iter_star_targets(
+            iter_starred_info(),
+            StarredRepoIndex(),
+            {},
+            argparse.Namespace(include_owner_repo=False),
+        )
+
+        # a target is yielded before the rest of the results are produced
+        assert next(star_target_iter) == "benjaminp/six"
+        assert consumed == ["six"]
+        assert list(star_target_iter) == ["urllib3/urllib3"]
+
+
+class Test_parse_option:
+    @pytest.mark.parametrize(
+        ["args", "expected_command", "expected_targets"],
+        [
+            [["prefetch", "six"], Command.PREFETCH, ["six"]],
+            [["--", "prefetch"], None, ["prefetch"]],
+            [["--check", "prefetch"], None, ["prefetch"]],
+            [["six", "prefetch"], None, ["six", "prefetch"]],
+        ],
+    )
+    def test_normal(self, monkeypatch, args, expected_command, expected_targets):
+        monkeypatch.setattr(sys, "argv", ["thank-you-stars"] + args)
+        options = parse_option()
+
+        assert options.command == expected_command
+        assert options.targets == expected_targets
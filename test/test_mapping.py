@@ -0,0 +1,117 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import json
+import time
+
+import pytest
+
+from thank_you_stars._cache import CacheTime
+from thank_you_stars._candidate import CandidateRank
+from thank_you_stars._mapping import (
+    MappingSource,
+    RepoMappingDB,
+    get_candidate_source,
+    make_mapping_lifetime,
+    make_repo_mapping,
+)
+
+
+class Test_RepoMappingDB:
+    def test_normal(self, tmpdir):
+        db = RepoMappingDB(str(tmpdir.join("mapping.sqlite3")))
+
+        assert db.get("msgfy") is None
+        assert db.put(
+            make_repo_mapping(
+                "MsgFy", "thombashi/msgfy", get_candidate_source(CandidateRank.METADATA)
+            )
+        )
+
+        mapping = db.get("msgfy")
+        assert mapping.repo_id == "thombashi/msgfy"
+        assert mapping.source == MappingSource.METADATA
+
+        # lower confidence mappings do not replace existing mappings
+        assert not db.put(
+            make_repo_mapping("msgfy", "other/msgfy", MappingSource.SEARCH_CODE_SEARCH)
+        )
+        assert db.put(
+            make_repo_mapping("msgfy", "thombashi/msgfy", MappingSource.METADATA_NAME_MATCH)
+        )
+        assert db.get("msgfy").confidence == 1.0
+        assert len(db) == 1
+
+    def test_normal_export_merge(self, tmpdir):
+        src_db = RepoMappingDB(str(tmpdir.join("src.sqlite3")))
+        src_db.merge(
+            [
+                make_repo_mapping("msgfy", "thombashi/msgfy", MappingSource.METADATA),
+                make_repo_mapping("six", "benjaminp/six", MappingSource.SEARCH_CONTRIBUTOR),
+            ]
+        )
+        export_path = str(tmpdir.join("mapping.json"))
+        assert src_db.export(export_path) == 2
+
+        dst_db = RepoMappingDB(str(tmpdir.join("dst.sqlite3")))
+        dst_db.put(make_repo_mapping("six", "benjaminp/six", MappingSource.METADATA_NAME_MATCH))
+
+        assert dst_db.merge_file(export_path) == 1
+        assert [mapping.pypi_pkg_name for mapping in dst_db.iter_mappings()] == ["msgfy", "six"]
+        assert dst_db.get("six").source == MappingSource.METADATA_NAME_MATCH
+
+    def test_normal_lifetime(self, tmpdir):
+        db = RepoMappingDB(str(tmpdir.join("mapping.sqlite3")), lifetime=CacheTime(days=1))
+        two_days_ago = time.time() - CacheTime(days=2).seconds
+
+        db.put(
+            make_repo_mapping(
+                "msgfy", "old/msgfy", MappingSource.METADATA_NAME_MATCH, updated_at=two_days_ago
+            )
+        )
+        assert db.get("msgfy") is None
+
+        # an expired mapping is replaced by a newer discovery with lower confidence
+        assert db.put(
+            make_repo_mapping("msgfy", "thombashi/msgfy", MappingSource.SEARCH_CODE_SEARCH)
+        )
+        assert db.get("msgfy").repo_id == "thombashi/msgfy"
+        assert not db.put(make_repo_mapping("msgfy", "other/msgfy", MappingSource.STARRED_INFO))
+
+    def test_normal_not_before(self, tmpdir):
+        db_path = str(tmpdir.join("mapping.sqlite3"))
+        RepoMappingDB(db_path).put(
+            make_repo_mapping("msgfy", "thombashi/msgfy", MappingSource.METADATA)
+        )
+
+        db = RepoMappingDB(db_path, not_before=time.time() + 1)
+        assert db.get("msgfy") is None
+        assert len(db) == 1
+
+    def test_normal_make_mapping_lifetime(self):
+        assert make_mapping_lifetime() == CacheTime(days=90)
+        assert make_mapping_lifetime({"mapping": {"lifetime_days": 7}}) == CacheTime(days=7)
+
+        with pytest.raises(ValueError):
+            make_mapping_lifetime({"mapping": {"lifetime_days": -1}})
+
+    @pytest.mark.parametrize(
+        ["data"],
+        [
+            [{"schema_version": 999, "mappings": []}],
+            [{"schema_version": 1, "mappings": [["msgfy", "msgfy", 1.0, "metadata", 0]]}],
+            [{"schema_version": 1, "mappings": [["msgfy", None, 1.0, "metadata", 0]]}],
+            [{"schema_version": 1, "mappings": [["msgfy", "a/b", 1.0, "metadata", "now"]]}],
+            [{"schema_version": 1, "mappings": [["msgfy", "a/b", 1.0]]}],
+        ],
+    )
+    def test_exception(self, tmpdir, data):
+        db = RepoMappingDB(str(tmpdir.join("mapping.sqlite3")))
+        p = tmpdir.join("mapping.json")
+        p.write(json.dumps(data))
+
+        with pytest.raises(ValueError):
+            db.merge_file(str(p))
+
+        assert len(db) == 0
@@ -0,0 +1,51 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import pytest
+
+from thank_you_stars._matcher import NameMatcher, normalize_person_name, normalize_pkg_name
+
+
+class Test_normalize_pkg_name:
+    @pytest.mark.parametrize(
+        ["value", "expected"],
+        [
+            ["Thank_You.Stars", "thank-you-stars"],
+            ["python-dateutil", "dateutil"],
+            ["PyYAML", "yaml"],
+            ["pytest-py", "test"],
+            ["github3.py", "github3"],
+            ["requests-python", "requests"],
+            ["py", "py"],
+        ],
+    )
+    def test_normal(self, value, expected):
+        assert normalize_pkg_name(value) == expected
+
+
+class Test_normalize_person_name:
+    def test_normal(self):
+        assert normalize_person_name("  Tsuyoshi \t Hombashi ") == "tsuyoshi hombashi"
+
+
+class Test_NameMatcher:
+    def test_normal(self):
+        matcher = NameMatcher(0.6)
+
+        assert matcher.ratio("python-dateutil", "dateutil") == 1
+        assert matcher.ratio("", "dateutil") == 0
+        assert matcher.is_match("PyYAML", "yaml")
+        assert not matcher.is_match("requests", "a")
+
+    def test_normal_best_match(self):
+        matcher = NameMatcher(0.6, normalizer=normalize_person_name)
+
+        result = matcher.best_match(
+            "Tsuyoshi Hombashi", ["", "thombashi", "tsuyoshi hombashi", "Tsuyoshi H."]
+        )
+        assert result.name == "tsuyoshi hombashi"
+        assert result.ratio == 1
+
+        assert matcher.best_match("Tsuyoshi Hombashi", ["x", "abc"]) is None
+        assert matcher.best_match("", ["thombashi"]) is None
@@ -0,0 +1,85 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import pytest
+
+from thank_you_stars._negative import (
+    NegativeIndex,
+    NegativeKind,
+    NegativeReason,
+    make_negative_ttl_map,
+)
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Test_NegativeIndex:
+    def test_normal(self):
+        clock = _Clock(1000.0)
+        ttl_map = {
+            NegativeReason.NOT_FOUND: 100,
+            NegativeReason.NO_MATCH: 50,
+            NegativeReason.RATE_LIMITED: 10,
+        }
+        index = NegativeIndex(ttl_map=ttl_map, clock=clock)
+
+        assert index.get(NegativeKind.PACKAGE, "pkg") is None
+
+        index.add(NegativeKind.PACKAGE, "Pkg", NegativeReason.NO_MATCH)
+        index.add(NegativeKind.REPO, "owner/repo", NegativeReason.NOT_FOUND)
+        index.add(NegativeKind.PACKAGE, "limited", NegativeReason.RATE_LIMITED, expires_at=1200)
+
+        assert index.get(NegativeKind.PACKAGE, "pkg") == NegativeReason.NO_MATCH
+        assert index.get(NegativeKind.REPO, "pkg") is None
+        assert (NegativeKind.REPO, "Owner/Repo") in index
+
+        clock.now = 1060
+        assert index.get(NegativeKind.PACKAGE, "pkg") is None
+        assert index.get(NegativeKind.REPO, "owner/repo") == NegativeReason.NOT_FOUND
+        assert index.get(NegativeKind.PACKAGE, "limited") == NegativeReason.RATE_LIMITED
+
+        stats = index.stats
+        assert stats.hits == 3
+        assert stats.misses == 3
+        assert stats.size == 3
+
+    def test_normal_save(self, tmpdir):
+        filepath = str(tmpdir.join("negative_index.json"))
+        index = NegativeIndex(filepath=filepath)
+        index.add(NegativeKind.PACKAGE, "pkg", NegativeReason.NO_MATCH)
+        index.save()
+
+        other_index = NegativeIndex(filepath=filepath)
+        other_index.add(NegativeKind.REPO, "owner/repo", NegativeReason.NOT_FOUND)
+        index.add(NegativeKind.PACKAGE, "pkg2", NegativeReason.NO_MATCH)
+        other_index.save()
+        index.save()
+
+        loaded_index = NegativeIndex(filepath=filepath)
+        assert loaded_index.get(NegativeKind.PACKAGE, "pkg") == NegativeReason.NO_MATCH
+        assert loaded_index.get(NegativeKind.PACKAGE, "pkg2") == NegativeReason.NO_MATCH
+        assert loaded_index.get(NegativeKind.REPO, "owner/repo") == NegativeReason.NOT_FOUND
+
+
+class Test_make_negative_ttl_map:
+    def test_normal(self):
+        ttl_map = make_negative_ttl_map({"negative": {NegativeReason.NO_MATCH: 1}})
+
+        assert ttl_map[NegativeReason.NO_MATCH] == 24 * 60 * 60
+        assert (
+            ttl_map[NegativeReason.NOT_FOUND] == make_negative_ttl_map()[NegativeReason.NOT_FOUND]
+        )
+
+    @pytest.mark.parametrize(
+        ["cache_configs"], [[{"negative": {"unknown": 1}}], [{"negative": {"no_match": "a"}}]]
+    )
+    def test_exception(self, cache_configs):
+        with pytest.raises(ValueError):
+            make_negative_ttl_map(cache_configs)
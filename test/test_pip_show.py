@@ -0,0 +1,65 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import pytest
+
+from thank_you_stars._pip_show import (
+    PipShow,
+    PipShowBackend,
+    PipShowError,
+    compute_depth_map,
+    load_installed_packages,
+)
+
+
+class Test_PipShow_fetch:
+    @pytest.mark.parametrize(["package_name"], [["msgfy"], ["pytablewriter"], ["Logbook"]])
+    def test_normal(self, package_name):
+        metadata_result = PipShow(PipShow.fetch(package_name, PipShowBackend.METADATA))
+        subprocess_result = PipShow(PipShow.fetch(package_name, PipShowBackend.SUBPROCESS))
+
+        assert metadata_result.extract_pypi_pkg_name() == subprocess_result.extract_pypi_pkg_name()
+        assert metadata_result.extract_author() == subprocess_result.extract_author()
+        assert sorted(metadata_result.extract_requires()) == sorted(
+            subprocess_result.extract_requires()
+        )
+
+    @pytest.mark.parametrize(["backend"], [[backend] for backend in PipShowBackend])
+    def test_exception(self, backend):
+        with pytest.raises(PipShowError):
+            PipShow.fetch("not-installed-package-name-xxxxxxxx", backend)
+
+
+class Test_compute_depth_map:
+    def test_normal(self):
+        require_map = {
+            "app": ["lib", "util"],
+            "lib": ["util", "lib"],
+            "util": [],
+            "tool": ["util"],
+            "cycle-a": ["cycle-b"],
+            "cycle-b": ["cycle-a", "util"],
+        }
+
+        assert compute_depth_map(require_map) == {
+            "app": 0,
+            "tool": 0,
+            "lib": 1,
+            "util": 1,
+            "cycle-a": 0,
+            "cycle-b": 1,
+        }
+
+
+class Test_load_installed_packages:
+    def test_normal(self):
+        installed_packages = load_installed_packages()
+
+        assert "pytablewriter" in installed_packages.pip_show_map
+        assert set(installed_packages.pip_show_map) == set(installed_packages.depth_map)
+        assert installed_packages.depth_map["dataproperty"] > 0
+
+        pip_show = PipShow(installed_packages.pip_show_map["pytablewriter"])
+        assert pip_show.extract_pypi_pkg_name() == "pytablewriter"
+        assert "DataProperty" in pip_show.extract_requires()
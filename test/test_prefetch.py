@@ -0,0 +1,114 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import pytest
+
+from thank_you_stars._cache import CacheType
+from thank_you_stars._negative import NegativeIndex, NegativeKind, NegativeReason
+from thank_you_stars._pip_show import PipShow
+from thank_you_stars._prefetch import CachePrefetcher
+
+
+NOW = 1000000.0
+
+
+class _CacheManager:
+    def __init__(self, expires_at_map):
+        self.__expires_at_map = expires_at_map
+
+    def get_pkg_cache_filepath(self, package_name, filename):
+        return (package_name, filename)
+
+    def get_expires_at(self, cache_file_path):
+        return self.__expires_at_map.get(cache_file_path)
+
+    def write_text(self, cache_file_path, text):
+        pass
+
+
+class _PyPIClient:
+    def __init__(self):
+        self.revalidated = []
+
+    def fetch_info(self, pypi_pkg_name, revalidate=False):
+        self.revalidated.append((pypi_pkg_name, revalidate))
+
+
+class _Extractor:
+    def __init__(self):
+        self.pypi_client = _PyPIClient()
+        self.extracted = []
+
+    def extract_starred_info(self, pypi_pkg_name, use_cache=True):
+        self.extracted.append((pypi_pkg_name, use_cache))
+
+
+def make_expires_at_map(pypi_pkg_name, pip_show, pypi_desc, starred_info):
+    return {
+        (pypi_pkg_name, "pip_show"): pip_show,
+        (pypi_pkg_name, "pypi_desc"): pypi_desc,
+        (pypi_pkg_name, "starred_info"): starred_info,
+    }
+
+
+@pytest.fixture
+def cache_mgr_map():
+    expires_at_map = {}
+    expires_at_map.update(make_expires_at_map("fresh", NOW + 900, NOW + 900, NOW + 900))
+    expires_at_map.update(make_expires_at_map("soon", NOW + 900, NOW + 50, NOW + 900))
+    expires_at_map.update(make_expires_at_map("sooner", NOW + 10, NOW + 900, NOW + 900))
+    expires_at_map.update(make_expires_at_map("missing", NOW + 900, NOW + 900, None))
+    expires_at_map.update(make_expires_at_map("not-found", NOW + 900, NOW + 900, None))
+    cache_mgr = _CacheManager(expires_at_map)
+
+    return {CacheType.PIP: cache_mgr, CacheType.PYPI: cache_mgr}
+
+
+class Test_CachePrefetcher:
+    def test_normal(self, monkeypatch, cache_mgr_map):
+        monkeypatch.setattr(PipShow, "fetch", classmethod(lambda cls, package_name: ""))
+        monkeypatch.setattr(PipShow, "cache_mgr", cache_mgr_map[CacheType.PIP])
+        extractor = _Extractor()
+        prefetcher = CachePrefetcher(
+            extractor, cache_mgr_map, expire_within_seconds=100, max_workers=1, clock=lambda: NOW
+        )
+
+        assert prefetcher.get_expires_at("soon") == NOW + 50
+        assert prefetcher.get_expires_at("missing") == 0
+        assert prefetcher.list_refresh_targets(["fresh", "soon", "sooner", "missing"]) == [
+            "missing",
+            "sooner",
+            "soon",
+        ]
+
+        stats = prefetcher.prefetch(["fresh", "soon", "sooner", "missing"])
+        assert stats.packages == 4
+        assert stats.refreshed == 3
+        assert extractor.pypi_client.revalidated == [
+            ("missing", True),
+            ("sooner", True),
+            ("soon", True),
+        ]
+        assert extractor.extracted == [("missing", False), ("sooner", False), ("soon", False)]
+
+    def test_normal_negative_index(self, cache_mgr_map):
+        negative_index = NegativeIndex(clock=lambda: NOW)
+        negative_index.add(NegativeKind.PACKAGE, "not-found", NegativeReason.NO_MATCH)
+        prefetcher = CachePrefetcher(
+            _Extractor(),
+            cache_mgr_map,
+            expire_within_seconds=100,
+            clock=lambda: NOW,
+            negative_index=negative_index,
+        )
+
+        # packages without repositories are up to date while their negative results are
+        assert prefetcher.get_expires_at("not-found") == NOW + 900
+        assert prefetcher.get_expires_at("missing") == 0
+        assert prefetcher.list_refresh_targets(["fresh", "missing", "not-found"]) == ["missing"]
+        assert negative_index.stats.hits == 0
+
+    def test_exception(self, cache_mgr_map):
+        with pytest.raises(ValueError):
+            CachePrefetcher(_Extractor(), cache_mgr_map, expire_within_seconds=0, max_workers=0)
@@ -0,0 +1,45 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import io
+
+from thank_you_stars._const import StarStatus
+from thank_you_stars._extractor import GitHubStarredInfo
+from thank_you_stars._printer import print_starred_info_stream
+
+
+def make_starred_info(pypi_pkg_name, star_status=StarStatus.NOT_STARRED):
+    return GitHubStarredInfo(
+        pypi_pkg_name=pypi_pkg_name,
+        github_repo_id="owner/{}".format(pypi_pkg_name),
+        star_status=star_status,
+        is_owned=False,
+        url="https://github.com/owner/{}".format(pypi_pkg_name),
+    )
+
+
+class Test_print_starred_info_stream:
+    def test_normal(self):
+        stream = io.StringIO()
+        written_rows = []
+
+        def iter_starred_info():
+            yield make_starred_info("six", StarStatus.STARRED)
+            # the previous row is written before the next one is produced
+            written_rows.append(stream.getvalue().count("owner/six"))
+            yield make_starred_info("msgfy")
+
+        print_starred_info_stream(
+            iter_starred_info(),
+            {"six": 1, "msgfy": 0},
+            verbosity=1,
+            target_map={"six": ["a", "b"]},
+            stream=stream,
+        )
+        lines = stream.getvalue().splitlines()
+
+        assert written_rows == [1]
+        assert [line.split("|")[1].strip() for line in lines[2:]] == ["six", "msgfy"]
+        assert "a, b" in lines[2]
+        assert "Depth" in lines[0]
@@ -0,0 +1,136 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from thank_you_stars._cache import CacheBackend, CacheManager, CacheTime
+from thank_you_stars._pypi import PyPIClient, project_pypi_info
+
+
+ETAG = '"etag-1"'
+INFO = {
+    "name": "thank-you-stars",
+    "author_email": "tsuyoshi.hombashi@gmail.com",
+    "description": "https://github.com/thombashi/thank-you-stars\n"
+    "https://github.com/thombashi/thank-you-stars\n"
+    "https://github.com/thombashi/msgfy",
+    "home_page": "https://github.com/thombashi/thank-you-stars",
+    "project_urls": None,
+}
+
+
+class _PyPIStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+
+        if self.path != "/pypi/thank-you-stars/json":
+            self.__write(404, b"")
+            return
+
+        if self.headers.get("If-None-Match") == ETAG:
+            self.__write(304, b"")
+            return
+
+        content = json.dumps({"info": INFO})
+        self.__write(200, content.encode("utf8"), {"ETag": ETAG})
+
+    def log_message(self, format, *args):
+        pass
+
+    def __write(self, status_code, content, headers=None):
+        self.send_response(status_code)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+
+@pytest.fixture
+def pypi_url(tmpdir, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmpdir))
+
+    server = HTTPServer(("127.0.0.1", 0), _PyPIStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _PyPIStubHandler.requests = []
+
+    yield "http://127.0.0.1:{}/pypi/".format(server.server_port)
+
+    server.shutdown()
+    server.server_close()
+
+
+class Test_project_pypi_info:
+    def test_normal(self):
+        record = project_pypi_info(INFO)
+
+        assert "description" not in record
+        assert record["github_repo_urls"] == [
+            "https://github.com/thombashi/thank-you-stars",
+            "https://github.com/thombashi/msgfy",
+        ]
+        assert record["project_urls"] == {}
+
+
+class Test_PyPIClient:
+    @pytest.mark.parametrize(["backend"], [[backend] for backend in CacheBackend])
+    def test_normal(self, pypi_url, backend):
+        cache_mgr = CacheManager("tester", "PyPI", CacheTime(days=14), backend)
+        client = PyPIClient(cache_mgr, base_url=pypi_url)
+
+        assert client.fetch_info("thank-you-stars")["author_email"] == INFO["author_email"]
+        assert client.fetch_info("thank-you-stars")["author_email"] == INFO["author_email"]
+        assert _PyPIStubHandler.requests == [("/pypi/thank-you-stars/json", None)]
+
+    def test_normal_revalidate(self, pypi_url):
+        cache_mgr = CacheManager("tester", "PyPI", CacheTime(seconds=0))
+        client = PyPIClient(cache_mgr, base_url=pypi_url)
+
+        assert client.fetch_info("thank-you-stars")["author_email"] == INFO["author_email"]
+        assert client.fetch_info("thank-you-stars")["author_email"] == INFO["author_email"]
+        assert _PyPIStubHandler.requests == [
+            ("/pypi/thank-you-stars/json", None),
+            ("/pypi/thank-you-stars/json", ETAG),
+        ]
+
+    @pytest.mark.parametrize(["backend"], [[backend] for backend in CacheBackend])
+    def test_normal_upgrade(self, pypi_url, monkeypatch, backend):
+        written_at = time.time() - 3600
+        with monkeypatch.context() as m:
+            m.setattr(time, "time", lambda: written_at)
+            cache_mgr = CacheManager("tester", "PyPI", CacheTime(days=14), backend)
+            cache_filepath = cache_mgr.get_pkg_cache_filepath("thank-you-stars", "pypi_desc")
+            cache_mgr.dump_json(cache_filepath, INFO)
+
+        local_filepath = cache_mgr.get_local_filepath(cache_filepath)
+        if local_filepath is not None:
+            os.utime(local_filepath, (written_at, written_at))
+
+        cache_mgr = CacheManager("tester", "PyPI", CacheTime(days=14), backend)
+        expires_at = cache_mgr.get_expires_at(cache_filepath)
+        client = PyPIClient(cache_mgr, base_url=pypi_url)
+
+        assert client.fetch_info("thank-you-stars") == project_pypi_info(INFO)
+        assert "description" not in cache_mgr.load_json(cache_filepath)
+        assert _PyPIStubHandler.requests == []
+
+        # the upgrade does not extend the lifetime of the cache
+        assert cache_mgr.get_expires_at(cache_filepath) == pytest.approx(expires_at)
+        assert expires_at == pytest.approx(written_at + CacheTime(days=14).seconds)
+
+    def test_exception(self, pypi_url):
+        cache_mgr = CacheManager("tester", "PyPI", CacheTime(days=14))
+        client = PyPIClient(cache_mgr, base_url=pypi_url)
+
+        assert client.fetch_info("not-exist") is None
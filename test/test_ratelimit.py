@@ -0,0 +1,90 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import time
+
+import pytest
+from github.GithubException import RateLimitExceededException
+
+from thank_you_stars._ratelimit import (
+    RateLimitBucket,
+    RateLimitExhausted,
+    RateLimitScheduler,
+    detect_rate_limit_bucket,
+)
+
+
+class Test_detect_rate_limit_bucket:
+    @pytest.mark.parametrize(
+        ["value", "expected"],
+        [
+            ["/graphql", RateLimitBucket.GRAPHQL],
+            ["/search/code", RateLimitBucket.CODE_SEARCH],
+            ["/search/repositories", RateLimitBucket.SEARCH],
+            ["/user/starred", RateLimitBucket.CORE],
+        ],
+    )
+    def test_normal(self, value, expected):
+        assert detect_rate_limit_bucket(value) == expected
+
+
+class Test_RateLimitScheduler:
+    def test_normal(self):
+        scheduler = RateLimitScheduler(max_wait_seconds=10, margin=0)
+        scheduler.update_from_headers(
+            RateLimitBucket.CORE,
+            {
+                "X-RateLimit-Remaining": "1",
+                "X-RateLimit-Reset": str(int(time.time()) + 3600),
+                "X-RateLimit-Resource": "search",
+            },
+        )
+
+        # the resource header takes precedence
+        assert scheduler.get_wait_seconds(RateLimitBucket.CORE) == 0
+        scheduler.acquire(RateLimitBucket.SEARCH)
+        assert scheduler.get_wait_seconds(RateLimitBucket.SEARCH) > 10
+
+        with pytest.raises(RateLimitExhausted):
+            scheduler.acquire(RateLimitBucket.SEARCH)
+
+        # other buckets are independent
+        scheduler.acquire(RateLimitBucket.CORE)
+
+    def test_normal_wait(self):
+        scheduler = RateLimitScheduler(max_wait_seconds=10, margin=0)
+        scheduler.update(RateLimitBucket.CORE, 0, time.time() + 0.2)
+
+        start = time.time()
+        scheduler.acquire(RateLimitBucket.CORE)
+
+        assert time.time() - start >= 0.15
+        assert scheduler.get_wait_seconds(RateLimitBucket.CORE) == 0
+
+    def test_normal_run(self):
+        scheduler = RateLimitScheduler(max_wait_seconds=10, margin=0)
+        calls = []
+
+        def func(value):
+            calls.append(value)
+            if len(calls) == 1:
+                raise RateLimitExceededException(
+                    403,
+                    {"message": "API rate limit exceeded"},
+                    {"x-ratelimit-remaining": "0", "x-ratelimit-reset": str(time.time() + 0.2)},
+                )
+
+            return value
+
+        assert scheduler.run(RateLimitBucket.SEARCH, func, "a") == "a"
+        assert calls == ["a", "a"]
+
+    def test_exception(self):
+        scheduler = RateLimitScheduler(max_wait_seconds=10)
+
+        def func():
+            raise RateLimitExceededException(403, {"message": "secondary rate limit"}, {})
+
+        with pytest.raises(RateLimitExceededException):
+            scheduler.run(RateLimitBucket.CORE, func)
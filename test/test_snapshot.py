@@ -0,0 +1,138 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import pytest
+
+from thank_you_stars._const import StarStatus
+from thank_you_stars._extractor import GitHubStarredInfo
+from thank_you_stars._mapping import MappingSource, make_repo_mapping
+from thank_you_stars._pip_show import PipShow
+from thank_you_stars._snapshot import OfflineGithubClient, Snapshot, traverse_preloaded_packages
+from thank_you_stars._starred import StarredRepoIndex
+
+
+NOW = 1000000.0
+LIFETIME = 100.0
+
+
+@pytest.fixture
+def preloaded_pip_show(monkeypatch):
+    def fetch(package_name):
+        raise AssertionError("pip executed for {}".format(package_name))
+
+    monkeypatch.setattr(PipShow, "fetch", fetch)
+    PipShow.preload(
+        {
+            "root": "Name: root\nRequires: six, tqdm\n",
+            "six": "Name: six\nRequires: \n",
+            "msgfy": "Name: msgfy\nRequires: \n",
+        },
+        exclusive=True,
+    )
+    yield
+    PipShow.preload({})
+
+
+def create_snapshot():
+    return Snapshot(
+        user_name="thombashi",
+        created_at=NOW - 10,
+        starred_repo_ids=["benjaminp/six"],
+        repo_mappings=[
+            make_repo_mapping("six", "benjaminp/six", MappingSource.METADATA, updated_at=NOW),
+            make_repo_mapping(
+                "msgfy", "thombashi/msgfy", MappingSource.METADATA, updated_at=NOW - 1000
+            ),
+        ],
+        not_found_pkg_names=["private-pkg"],
+        pip_show_map={"six": "Name: six\n"},
+        pypi_info_map={"six": {"schema_version": 1, "name": "six"}},
+    )
+
+
+class Test_Snapshot:
+    def test_normal(self, tmpdir):
+        filepath = str(tmpdir.join("snapshot.json"))
+        create_snapshot().dump(filepath)
+        snapshot = Snapshot.load(filepath)
+        starred_repo_index = StarredRepoIndex(snapshot.starred_repo_ids)
+
+        assert snapshot.user_name == "thombashi"
+        assert snapshot.pip_show_map == {"six": "Name: six\n"}
+
+        info, stale_status = snapshot.get_starred_info("Six", starred_repo_index, LIFETIME, NOW)
+        assert info.github_repo_id == "benjaminp/six"
+        assert info.star_status == StarStatus.STARRED
+        assert not info.is_owned
+        assert stale_status is None
+
+        info, stale_status = snapshot.get_starred_info("msgfy", starred_repo_index, LIFETIME, NOW)
+        assert info.star_status == StarStatus.NOT_STARRED
+        assert info.is_owned
+        assert stale_status == "stale"
+
+        info, stale_status = snapshot.get_starred_info(
+            "private-pkg", starred_repo_index, LIFETIME, NOW
+        )
+        assert info.star_status == StarStatus.NOT_FOUND
+        assert stale_status is None
+
+        info, stale_status = snapshot.get_starred_info("tqdm", starred_repo_index, LIFETIME, NOW)
+        assert info.star_status == StarStatus.NOT_AVAILABLE
+        assert stale_status == "missing"
+
+    def test_normal_build(self, preloaded_pip_show):
+        starred_infos = [
+            GitHubStarredInfo(
+                pypi_pkg_name="six",
+                github_repo_id="benjaminp/six",
+                star_status=StarStatus.STARRED,
+                is_owned=False,
+                url="https://github.com/benjaminp/six",
+            ),
+            GitHubStarredInfo(
+                pypi_pkg_name="msgfy",
+                github_repo_id="[Rate limit exceeded]",
+                star_status=StarStatus.NOT_AVAILABLE,
+                is_owned=None,
+                url=None,
+            ),
+        ]
+
+        snapshot = Snapshot.build(
+            "thombashi",
+            starred_infos,
+            StarredRepoIndex(["benjaminp/six"]),
+            pip_pkg_names=["root", "six", "msgfy", "tqdm"],
+        )
+
+        # pip show results of every package of the graph, even if the repository is unknown
+        assert sorted(snapshot.pip_show_map) == ["msgfy", "root", "six"]
+        assert [mapping.pypi_pkg_name for mapping in snapshot.repo_mappings] == ["six"]
+
+    def test_exception(self, tmpdir):
+        p = tmpdir.join("snapshot.json")
+        p.write('{"schema_version": 0}')
+
+        with pytest.raises(ValueError):
+            Snapshot.load(str(p))
+
+
+class Test_traverse_preloaded_packages:
+    def test_normal(self, preloaded_pip_show):
+        depth_map, missing_pkg_names = traverse_preloaded_packages([("root", 0)], max_depth=2)
+
+        assert depth_map == {"root": 0, "six": 1, "tqdm": 1}
+        assert missing_pkg_names == ["tqdm"]
+
+        assert traverse_preloaded_packages([("root", 0)], max_depth=0) == ({"root": 0}, [])
+
+
+class Test_OfflineGithubClient:
+    def test_normal(self):
+        assert OfflineGithubClient("thombashi").get_user().login == "thombashi"
+
+    def test_exception(self):
+        with pytest.raises(RuntimeError):
+            OfflineGithubClient("thombashi").call("core", lambda: None)
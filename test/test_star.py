@@ -0,0 +1,166 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from thank_you_stars._ratelimit import RateLimitBucket, RateLimitScheduler
+from thank_you_stars._star import StarringEngine
+
+
+class _Response:
+    def __init__(self, status_code, headers=None, text=""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+class _RestClient:
+    def __init__(self, responses_map):
+        self.__responses_map = responses_map
+        self.__lock = threading.Lock()
+        self.requests = []
+
+    def request(self, method, path, headers):
+        with self.__lock:
+            self.requests.append((method, path))
+
+            return self.__responses_map[path].pop(0)
+
+
+class Test_StarringEngine:
+    def test_normal(self):
+        rest_client = _RestClient(
+            {
+                "/user/starred/a/a": [_Response(204)],
+                "/user/starred/b/b": [_Response(404)],
+                "/user/starred/c/c": [
+                    _Response(403, text="You have exceeded a secondary rate limit."),
+                    _Response(429, headers={"Retry-After": "0"}),
+                    _Response(204),
+                ],
+                "/user/starred/d/d": [_Response(403, headers={"X-RateLimit-Remaining": "0"})],
+            }
+        )
+        engine = StarringEngine(rest_client, max_workers=4, backoff_factor=0)
+
+        results = engine.star(["a/a", "b/b", "c/c", "d/d"])
+
+        assert [result.repo_id for result in results] == ["a/a", "b/b", "c/c", "d/d"]
+        assert [result.is_success for result in results] == [True, False, True, False]
+        assert len(rest_client.requests) == 6
+        assert all(method == "PUT" for method, _path in rest_client.requests)
+
+    def test_normal_max_retries(self):
+        rest_client = _RestClient(
+            {"/user/starred/a/a": [_Response(429, headers={"Retry-After": "0"})] * 3}
+        )
+        engine = StarringEngine(rest_client, max_retries=2)
+
+        assert not engine.star(["a/a"])[0].is_success
+        assert len(rest_client.requests) == 3
+
+    def test_normal_star_iter(self):
+        rest_client = _RestClient(
+            {"/user/starred/a/a": [_Response(204)], "/user/starred/b/b": [_Response(404)]}
+        )
+        engine = StarringEngine(rest_client, max_workers=2)
+
+        def iter_repo_ids():
+            yield "a/a"
+            yield "b/b"
+
+        results = {result.repo_id: result for result in engine.star_iter(iter_repo_ids())}
+
+        assert results["a/a"].is_success
+        assert not results["b/b"].is_success
+        assert list(engine.star_iter([])) == []
+
+
+class _StarStubHandler(BaseHTTPRequestHandler):
+    request_count = 0
+
+    def do_PUT(self):
+        type(self).request_count += 1
+
+        self.send_response(404 if self.path == "/user/starred/b/b" else 204)
+        self.send_header("Content-Length", "0")
+        if self.path == "/user/starred/c/c":
+            self.send_header("X-RateLimit-Remaining", "0")
+            self.send_header("X-RateLimit-Reset", str(int(time.time()) + 3600))
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Test_AsyncStarringEngine:
+    def test_normal(self):
+        pytest.importorskip("aiohttp")
+        from thank_you_stars._async import AsyncStarringEngine
+
+        _StarStubHandler.request_count = 0
+        server = HTTPServer(("127.0.0.1", 0), _StarStubHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        scheduler = RateLimitScheduler(max_wait_seconds=0)
+
+        try:
+            engine = AsyncStarringEngine(
+                token=None,
+                base_url="http://127.0.0.1:{}".format(server.server_port),
+                scheduler=scheduler,
+            )
+            results = engine.star(["a/a", "b/b"])
+            assert scheduler.get_wait_seconds(RateLimitBucket.CORE) == 0
+
+            # the budget exhausted by a response is shared with the other clients
+            assert engine.star(["c/c"])[0].is_success
+            assert scheduler.get_wait_seconds(RateLimitBucket.CORE) > 0
+            assert not engine.star(["a/a"])[0].is_success
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert [result.repo_id for result in results] == ["a/a", "b/b"]
+        assert [result.is_success for result in results] == [True, False]
+        assert _StarStubHandler.request_count == 3
+
+    def test_normal_star_iter(self):
+        pytest.importorskip("aiohttp")
+        from thank_you_stars._async import AsyncStarringEngine
+
+        server = HTTPServer(("127.0.0.1", 0), _StarStubHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        first_result_event = threading.Event()
+        waited = []
+
+        def iter_repo_ids():
+            yield "a/a"
+            # starring starts before the rest of repositories are produced
+            waited.append(first_result_event.wait(timeout=10))
+            yield "b/b"
+
+        try:
+            engine = AsyncStarringEngine(
+                token=None,
+                base_url="http://127.0.0.1:{}".format(server.server_port),
+                scheduler=RateLimitScheduler(max_wait_seconds=0),
+            )
+            results = []
+            for result in engine.star_iter(iter_repo_ids()):
+                results.append(result)
+                first_result_event.set()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert waited == [True]
+        assert [result.repo_id for result in results] == ["a/a", "b/b"]
+        assert [result.is_success for result in results] == [True, False]
+        assert list(engine.star_iter([])) == []
@@ -0,0 +1,209 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import pytest
+
+from thank_you_stars import _starred
+from thank_you_stars._cache import CacheManager, CacheTime
+from thank_you_stars._const import Default
+from thank_you_stars._starred import (
+    MappedStarredRepoIndex,
+    StarredRepoIndex,
+    add_starred_repos,
+    fetch_starred_repo_index,
+    fetch_starred_repo_list,
+)
+
+
+class _Response:
+    def __init__(self, status_code, items=None, etag=None, has_next=False):
+        self.status_code = status_code
+        self.headers = {"ETag": etag} if etag else {}
+        self.links = {"next": {"url": ""}} if has_next else {}
+        self.__items = items
+
+    def json(self):
+        return self.__items
+
+    def raise_for_status(self):
+        pass
+
+
+class _RestClient:
+    """
+    Serve starred repositories newest first with two items per page.
+    """
+
+    def __init__(self, repo_ids):
+        self.repo_ids = list(repo_ids)
+        self.requested_pages = []
+
+    @property
+    def etag(self):
+        return '"{}"'.format(hash(tuple(self.repo_ids)))
+
+    def request(self, method, path, params, headers):
+        page = params["page"]
+        self.requested_pages.append(page)
+
+        if page == 1 and headers.get("If-None-Match") == self.etag:
+            return _Response(304)
+
+        begin = (page - 1) * 2
+        items = [
+            {"repo": {"full_name": repo_id}, "starred_at": "starred-at-{}".format(repo_id)}
+            for repo_id in self.repo_ids[begin : begin + 2]
+        ]
+
+        return _Response(200, items=items, etag=self.etag, has_next=begin + 2 < len(self.repo_ids))
+
+
+@pytest.fixture
+def cache_mgr(tmpdir, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmpdir))
+
+    return CacheManager("tester", "GitHub", CacheTime(seconds=0))
+
+
+class Test_fetch_starred_repo_list:
+    def test_normal(self, cache_mgr):
+        rest_client = _RestClient(["a/a", "b/b", "c/c", "d/d", "e/e"])
+
+        assert fetch_starred_repo_list(rest_client, "tester", cache_mgr) == rest_client.repo_ids
+        assert rest_client.requested_pages == [1, 2, 3]
+
+        # revalidate with a conditional request
+        rest_client.requested_pages = []
+        assert fetch_starred_repo_list(rest_client, "tester", cache_mgr) == rest_client.repo_ids
+        assert rest_client.requested_pages == [1]
+
+        # fetch newer pages only
+        rest_client.repo_ids = ["g/g", "f/f", "x/x"] + rest_client.repo_ids
+        rest_client.requested_pages = []
+        assert fetch_starred_repo_list(rest_client, "tester", cache_mgr) == rest_client.repo_ids
+        assert rest_client.requested_pages == [1, 2]
+
+    def test_normal_add_starred_repos(self, cache_mgr):
+        rest_client = _RestClient(["a/a", "b/b", "c/c"])
+        fetch_starred_repo_list(rest_client, "tester", cache_mgr)
+
+        add_starred_repos(cache_mgr, "tester", ["z/z"])
+        rest_client.repo_ids = ["z/z"] + rest_client.repo_ids
+        rest_client.requested_pages = []
+
+        assert fetch_starred_repo_list(rest_client, "tester", cache_mgr) == rest_client.repo_ids
+        assert rest_client.requested_pages == [1]
+
+    def test_normal_full_sync(self, cache_mgr, monkeypatch):
+        rest_client = _RestClient(["a/a", "b/b", "c/c", "d/d", "e/e"])
+        fetch_starred_repo_list(rest_client, "tester", cache_mgr)
+
+        # an older repository unstarred outside of the tool remains after an incremental sync
+        rest_client.repo_ids = ["f/f", "a/a", "b/b", "c/c", "e/e"]
+        rest_client.requested_pages = []
+        assert fetch_starred_repo_list(rest_client, "tester", cache_mgr) == [
+            "f/f",
+            "a/a",
+            "b/b",
+            "c/c",
+            "d/d",
+            "e/e",
+        ]
+        assert rest_client.requested_pages == [1]
+
+        now = _starred.time.time()
+        with monkeypatch.context() as m:
+            m.setattr(_starred.time, "time", lambda: now + _starred._FULL_SYNC_INTERVAL_SECONDS + 1)
+            rest_client.requested_pages = []
+
+            assert fetch_starred_repo_list(rest_client, "tester", cache_mgr) == rest_client.repo_ids
+            assert rest_client.requested_pages == [1, 2, 3]
+
+
+class Test_StarredRepoIndex:
+    REPO_IDS = ["thombashi/thank-you-stars", "PyGithub/PyGithub", "tqdm/tqdm", "b/ü", "a/b"]
+
+    def test_normal(self):
+        index = StarredRepoIndex(self.REPO_IDS)
+
+        assert "pygithub/pygithub" in index
+        assert "Thombashi/Thank-You-Stars" in index
+        assert "tqdm/other" not in index
+
+        index.add("Other/Repo")
+        assert "other/repo" in index
+        assert len(index) == 6
+
+        loaded_index = StarredRepoIndex.loads(index.dumps())
+        assert sorted(loaded_index) == sorted(index)
+
+    def test_normal_mmap(self, tmpdir):
+        index_filepath = str(tmpdir.join("starred_index"))
+        repo_ids = self.REPO_IDS + ["owner{}/repo{}".format(i, i) for i in range(1000)]
+        with open(index_filepath, "w", encoding="utf8") as f:
+            f.write(StarredRepoIndex(repo_ids).dumps())
+
+        index = MappedStarredRepoIndex(index_filepath)
+        assert len(index) == len(repo_ids)
+
+        for repo_id in repo_ids:
+            assert repo_id.upper() in index
+        for repo_id in ["owner1/repo2", "a/a", "zzz/zzz", "", "b/u"]:
+            assert repo_id not in index
+
+        index.add("new/repo")
+        assert "New/Repo" in index
+        assert len(index) == len(repo_ids) + 1
+        assert sorted(StarredRepoIndex.loads(index.dumps())) == sorted(index)
+
+    def test_normal_mmap_close(self, tmpdir, monkeypatch):
+        # count lines over multiple chunks
+        monkeypatch.setattr(_starred, "_COUNT_CHUNK_SIZE", 7)
+        index_filepath = str(tmpdir.join("starred_index"))
+        with open(index_filepath, "w", encoding="utf8") as f:
+            f.write(StarredRepoIndex(self.REPO_IDS).dumps())
+
+        with MappedStarredRepoIndex(index_filepath) as index:
+            assert len(index) == len(self.REPO_IDS)
+            assert not index.closed
+
+        assert index.closed
+
+
+class Test_fetch_starred_repo_index:
+    def test_normal(self, tmpdir, monkeypatch):
+        monkeypatch.setenv("HOME", str(tmpdir))
+        monkeypatch.setattr(Default, "MMAP_THRESHOLD_BYTES", 1)
+        rest_client = _RestClient(["A/A", "b/b", "c/c"])
+
+        cache_mgr = CacheManager("tester", "GitHub", CacheTime(days=1))
+        index = fetch_starred_repo_index(rest_client, "tester", cache_mgr)
+        assert isinstance(index, StarredRepoIndex)
+        assert "a/a" in index
+
+        cache_mgr = CacheManager("tester", "GitHub", CacheTime(days=1))
+        rest_client.requested_pages = []
+        index = fetch_starred_repo_index(rest_client, "tester", cache_mgr)
+        assert isinstance(index, MappedStarredRepoIndex)
+        assert "a/a" in index
+        assert rest_client.requested_pages == []
+
+        # the memory map is released while the mapped file is replaced
+        write_text = cache_mgr.write_text
+        closed_map = {}
+
+        def record_write_text(cache_filepath, text, keep_mtime=False):
+            closed_map[cache_filepath.name] = index.closed
+            write_text(cache_filepath, text, keep_mtime)
+
+        monkeypatch.setattr(cache_mgr, "write_text", record_write_text)
+        add_starred_repos(cache_mgr, "tester", ["Z/Z"], index)
+        assert closed_map == {"starred_repos": False, "starred_index": True}
+        assert not index.closed
+        assert "z/z" in index
+        assert len(index) == 4
+        assert "z/z" in fetch_starred_repo_index(rest_client, "tester", cache_mgr)
+
+        index.close()
+        assert index.closed
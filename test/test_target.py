@@ -0,0 +1,282 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import json
+
+import pytest
+
+from thank_you_stars._pip_show import PipShow, PipShowError
+from thank_you_stars._target import (
+    Marker,
+    Target,
+    attribute_targets,
+    exclude_uninstalled_packages,
+    iter_root_packages,
+    load_target,
+    parse_lock_depth_map,
+    parse_lock_file,
+    parse_pyproject_file,
+    parse_requirements_file,
+    tomllib,
+)
+
+
+class Test_parse_requirements_file:
+    def test_normal(self, tmpdir):
+        base = tmpdir.join("base.txt")
+        base.write("requests>=2.0  # http\nPyYAML\n")
+        main = tmpdir.join("requirements.txt")
+        main.write(
+            "\n".join(
+                [
+                    "# comment",
+                    "-r base.txt",
+                    "--index-url https://example.com/simple",
+                    "-e git+https://github.com/thombashi/tcconfig.git#egg=tcconfig",
+                    "Logbook[compression]==1.5.3; python_version >= '3.5'",
+                    "-r requirements.txt",
+                    "",
+                ]
+            )
+        )
+
+        assert parse_requirements_file(str(main)) == ["requests", "pyyaml", "logbook"]
+
+
+@pytest.mark.skipif(tomllib is None, reason="requires tomllib or tomli")
+class Test_parse_pyproject_file:
+    def test_normal(self, tmpdir):
+        p = tmpdir.join("pyproject.toml")
+        p.write(
+            "\n".join(
+                [
+                    "[project]",
+                    'name = "sample"',
+                    'dependencies = ["msgfy>=0.1", "tqdm"]',
+                    "[tool.poetry.dependencies]",
+                    'python = "^3.8"',
+                    'DataProperty = "^1.0"',
+                    'colorama = { version = "*", optional = true }',
+                ]
+            )
+        )
+
+        assert parse_pyproject_file(str(p)) == ["msgfy", "tqdm", "dataproperty"]
+
+
+class Test_parse_lock_file:
+    @pytest.mark.skipif(tomllib is None, reason="requires tomllib or tomli")
+    def test_normal_toml(self, tmpdir):
+        p = tmpdir.join("poetry.lock")
+        p.write(
+            '[[package]]\nname = "Click"\nversion = "8.0"\n\n'
+            '[[package]]\nname = "six"\nversion = "1.16"\n'
+        )
+
+        assert parse_lock_file(str(p)) == ["click", "six"]
+
+    @pytest.mark.skipif(
+        tomllib is None or Marker is None, reason="requires tomllib or tomli, and packaging"
+    )
+    @pytest.mark.parametrize(
+        ["filename", "content"],
+        [
+            [
+                "poetry.lock",
+                '[[package]]\nname = "six"\nversion = "1.16"\n\n'
+                '[[package]]\nname = "pywin32"\nversion = "306"\n'
+                "markers = \"python_version < '3'\"\n",
+            ],
+            [
+                "uv.lock",
+                '[[package]]\nname = "six"\nversion = "1.16"\n'
+                'dependencies = [{ name = "pywin32", marker = "python_version < \'3\'" }]\n\n'
+                '[[package]]\nname = "pywin32"\nversion = "306"\n',
+            ],
+        ],
+    )
+    def test_normal_toml_markers(self, tmpdir, filename, content):
+        p = tmpdir.join(filename)
+        p.write(content)
+
+        assert parse_lock_file(str(p)) == ["six"]
+
+    def test_normal_pipfile(self, tmpdir):
+        p = tmpdir.join("Pipfile.lock")
+        p.write(json.dumps({"_meta": {}, "default": {"requests": {}}, "develop": {"pytest": {}}}))
+
+        assert parse_lock_file(str(p)) == ["requests", "pytest"]
+
+    @pytest.mark.skipif(Marker is None, reason="requires packaging")
+    def test_normal_pipfile_markers(self, tmpdir):
+        p = tmpdir.join("Pipfile.lock")
+        p.write(
+            json.dumps(
+                {
+                    "default": {
+                        "requests": {"markers": "python_version >= '3'"},
+                        "pywin32": {"markers": "python_version < '3'"},
+                    }
+                }
+            )
+        )
+
+        assert parse_lock_file(str(p)) == ["requests"]
+
+
+_POETRY_LOCK = (
+    '[[package]]\nname = "requests"\nversion = "2.31"\n'
+    '[package.dependencies]\nurllib3 = ">=1.21"\nidna = ">=2.5"\n\n'
+    '[[package]]\nname = "urllib3"\nversion = "2.0"\n\n'
+    '[[package]]\nname = "idna"\nversion = "3.4"\n\n'
+    '[[package]]\nname = "click"\nversion = "8.0"\n\n'
+    '[[package]]\nname = "pytest"\nversion = "7.4"\n'
+    '[package.dependencies]\niniconfig = "*"\n\n'
+    '[[package]]\nname = "iniconfig"\nversion = "2.0"\n'
+)
+
+
+@pytest.mark.skipif(tomllib is None, reason="requires tomllib or tomli")
+class Test_parse_lock_depth_map:
+    def test_normal_poetry(self, tmpdir):
+        tmpdir.join("pyproject.toml").write(
+            '[tool.poetry.dependencies]\npython = "^3.8"\nrequests = "*"\nurllib3 = "*"\n'
+        )
+        p = tmpdir.join("poetry.lock")
+        p.write(_POETRY_LOCK)
+
+        # a direct dependency that is also a transitive one is a root, and packages
+        # unreachable from the direct dependencies are the roots of their own graphs
+        assert parse_lock_depth_map(str(p)) == {
+            "requests": 0,
+            "urllib3": 0,
+            "idna": 1,
+            "click": 0,
+            "pytest": 0,
+            "iniconfig": 1,
+        }
+
+    def test_normal_no_project_file(self, tmpdir):
+        p = tmpdir.join("poetry.lock")
+        p.write(_POETRY_LOCK)
+
+        assert parse_lock_depth_map(str(p)) == {
+            "requests": 0,
+            "urllib3": 1,
+            "idna": 1,
+            "click": 0,
+            "pytest": 0,
+            "iniconfig": 1,
+        }
+
+    def test_normal_uv(self, tmpdir):
+        p = tmpdir.join("uv.lock")
+        p.write(
+            '[[package]]\nname = "myapp"\nversion = "0.1"\nsource = { editable = "." }\n'
+            'dependencies = [{ name = "requests" }]\n\n'
+            '[[package]]\nname = "requests"\nversion = "2.31"\n'
+            'dependencies = [{ name = "urllib3" }]\n\n'
+            '[[package]]\nname = "urllib3"\nversion = "2.0"\n'
+        )
+
+        # the project itself is replaced with its dependencies
+        assert parse_lock_depth_map(str(p)) == {"requests": 0, "urllib3": 1}
+
+    def test_normal_pipfile(self, tmpdir):
+        p = tmpdir.join("Pipfile.lock")
+        p.write(json.dumps({"default": {"requests": {}, "urllib3": {}}, "develop": {}}))
+
+        assert parse_lock_depth_map(str(p)) is None
+
+        tmpdir.join("Pipfile").write('[packages]\nrequests = "*"\n\n[dev-packages]\n')
+
+        # dependencies of the direct dependencies are left to the traversal
+        assert parse_lock_depth_map(str(p)) == {"requests": 0}
+
+
+class Test_load_target:
+    def test_normal(self, tmpdir):
+        p = tmpdir.join("requirements.txt")
+        p.write("six\nsix\nmsgfy\n")
+
+        target = load_target(str(p))
+        assert target.label == str(p)
+        assert target.pypi_pkg_names == ["six", "msgfy"]
+
+        assert load_target("Thank-You-Stars").pypi_pkg_names == ["thank-you-stars"]
+
+    @pytest.mark.skipif(tomllib is None, reason="requires tomllib or tomli")
+    def test_normal_lock_file(self, tmpdir):
+        tmpdir.join("pyproject.toml").write('[project]\ndependencies = ["requests"]\n')
+        p = tmpdir.join("poetry.lock")
+        p.write(_POETRY_LOCK)
+
+        target = load_target(str(p))
+
+        assert target.pypi_pkg_names[:2] == ["requests", "click"]
+        assert dict(iter_root_packages(target)) == {
+            "requests": 0,
+            "urllib3": 1,
+            "idna": 1,
+            "click": 0,
+            "pytest": 0,
+            "iniconfig": 1,
+        }
+        assert dict(iter_root_packages(load_target("six"))) == {"six": 0}
+
+    def test_exception(self, tmpdir):
+        p = tmpdir.join("requirements.txt")
+        p.write("# empty\n")
+
+        with pytest.raises(ValueError):
+            load_target(str(p))
+
+
+class _PipCacheManager:
+    def is_cache_available(self, cache_filepath, allow_stale=False):
+        return False
+
+    def get_pkg_cache_filepath(self, package_name, filename):
+        return "{}/{}".format(package_name, filename)
+
+    def write_text(self, cache_filepath, text):
+        pass
+
+
+class Test_exclude_uninstalled_packages:
+    def test_normal(self, tmpdir, monkeypatch):
+        def fetch(package_name):
+            if package_name == "pywin32":
+                raise PipShowError(package_name)
+
+            return "Name: {}\n".format(package_name)
+
+        monkeypatch.setattr(PipShow, "cache_mgr", _PipCacheManager())
+        monkeypatch.setattr(PipShow, "fetch", fetch)
+        p = tmpdir.join("Pipfile.lock")
+        p.write(json.dumps({"default": {"six": {}, "pywin32": {}}}))
+
+        targets = exclude_uninstalled_packages(
+            [load_target(str(p)), Target(label="pywin32", pypi_pkg_names=["pywin32"])]
+        )
+
+        # an uninstalled lock entry is skipped instead of exiting the process
+        assert targets == [Target(label=str(p), pypi_pkg_names=["six"])]
+
+
+class Test_attribute_targets:
+    def test_normal(self, monkeypatch):
+        monkeypatch.setattr(
+            PipShow,
+            "find",
+            classmethod(lambda cls, package_name: PipShow("Name: {}\n".format(package_name))),
+        )
+        targets = [
+            Target(label="lock", pypi_pkg_names=["a", "b"], depth_map={"a": 0, "b": 2}),
+            Target(label="b", pypi_pkg_names=["b"]),
+        ]
+
+        # packages of lock files deeper than max_depth are not attributed
+        assert attribute_targets(targets, max_depth=1) == {"a": ["lock"], "b": ["b"]}
+        assert attribute_targets(targets, max_depth=2) == {"a": ["lock"], "b": ["lock", "b"]}
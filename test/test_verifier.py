@@ -0,0 +1,80 @@
+"""
+.. codeauthor:: Tsuyoshi Hombashi <tsuyoshi.hombashi@gmail.com>
+"""
+
+import pytest
+
+from thank_you_stars._cache import CacheManager, CacheTime
+from thank_you_stars._verifier import ApiRequestType, RepoMetadataVerifier, VerificationCounter
+
+
+SETUP_PY = """\
+setuptools.setup(
+    name="thank-you-stars",
+    author="Tsuyoshi Hombashi (+dev)",
+    author_email="tsuyoshi.hombashi@gmail.com",
+)
+"""
+
+
+class _Response:
+    def __init__(self, status_code, text=""):
+        self.status_code = status_code
+        self.text = text
+
+
+class _RestClient:
+    def __init__(self, files_map):
+        self.__files_map = files_map
+        self.requests = []
+
+    def request(self, method, path, headers):
+        self.requests.append(path)
+
+        if path in self.__files_map:
+            return _Response(200, self.__files_map[path])
+
+        return _Response(404)
+
+
+@pytest.fixture
+def cache_mgr(tmpdir, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmpdir))
+
+    return CacheManager("tester", "GitHub", CacheTime(days=14))
+
+
+class Test_RepoMetadataVerifier:
+    def test_normal(self, cache_mgr):
+        rest_client = _RestClient({"/repos/thombashi/thank-you-stars/contents/setup.py": SETUP_PY})
+        counter = VerificationCounter()
+        verifier = RepoMetadataVerifier(rest_client, cache_mgr, counter)
+
+        assert verifier.verify(
+            "thombashi/thank-you-stars",
+            ["tsuyoshi hombashi (+dev)", "tsuyoshi.hombashi@gmail.com"],
+        )
+        assert not verifier.verify("thombashi/thank-you-stars", ["Tsuyoshi.+", "a@b.c"])
+        assert not verifier.verify("thombashi/thank-you-stars", [None])
+        assert len(rest_client.requests) == 4
+        assert counter.stats.api_request_counts == {ApiRequestType.CONTENTS: 4}
+
+    def test_normal_no_metadata(self, cache_mgr):
+        verifier = RepoMetadataVerifier(_RestClient({}), cache_mgr)
+
+        assert verifier.verify("thombashi/empty", ["Tsuyoshi Hombashi"]) is None
+
+
+class Test_VerificationCounter:
+    def test_normal(self):
+        counter = VerificationCounter()
+        counter.add_package("local")
+        counter.add_package("local")
+        counter.add_package()
+        counter.add_api_request(ApiRequestType.CODE_SEARCH, count=2)
+
+        stats = counter.stats
+        assert stats.packages == 3
+        assert stats.verified == 2
+        assert stats.stage_counts == {"local": 2}
+        assert stats.api_request_counts == {ApiRequestType.CODE_SEARCH: 2}
@@ -3,3 +3,4 @@
 """
 
 from .__version__ import __author__, __copyright__, __email__, __license__, __version__
+from ._async import AsyncDiscoveryEngine, AsyncStarringEngine
@@ -2,48 +2,85 @@
 
 import argparse
 import errno
-import os.path
 import sys
+import time
+from collections import OrderedDict, namedtuple
+from itertools import chain
 from textwrap import dedent
 
 import logbook
-import msgfy
-from github.GithubException import UnknownObjectException
 from logbook.more import ColorizedStderrHandler
 from subprocrunner import SubprocessRunner
-from tqdm import tqdm
 
 from .__version__ import __version__
-from ._cache import CacheManager, CacheTime, CacheType
-from ._config import app_config_mgr
+from ._async import AsyncDiscoveryEngine, AsyncStarringEngine, is_aiohttp_available
+from ._cache import CacheBackend, CacheManager, CacheTime, CacheType, make_cache_policy
+from ._config import app_config_mgr, load_cache_configs
 from ._const import PACKAGE_NAME, Default, StarStatus
 from ._extractor import GithubStarredInfoExtractor
-from ._github import create_github_client
+from ._github import create_github_client, create_github_rest_client, extract_github_api_token
+from ._graphql import GitHubRepoResolver
 from ._logger import logger, set_log_level
-from ._printer import print_starred_info
-from ._starred import fetch_starred_repo_list
+from ._mapping import RepoMappingDB, get_default_mapping_db_path, make_mapping_lifetime
+from ._negative import NegativeIndex, get_negative_index_filepath, make_negative_ttl_map
+from ._pip_show import PipShow, PipShowBackend, load_installed_packages
+from ._prefetch import CachePrefetcher
+from ._printer import print_starred_info, print_starred_info_stream
+from ._pypi import PyPIClient
+from ._ratelimit import RateLimitScheduler
+from ._snapshot import OfflineGithubClient, Snapshot, traverse_preloaded_packages
+from ._star import StarringEngine
+from ._starred import StarredRepoIndex, add_starred_repos, fetch_starred_repo_index
+from ._target import (
+    attribute_targets,
+    exclude_uninstalled_packages,
+    iter_root_packages,
+    load_target,
+)
+from ._verifier import RepoMetadataVerifier, VerificationCounter
 
 
-def parse_option():
-    description = "Give stars a PyPI package and its dependencies."
-    parser = argparse.ArgumentParser(
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        description=description,
-        epilog=dedent(
+RunContext = namedtuple(
+    "RunContext", "user_name scheduler rest_client cache_mgr_map negative_index extractor"
+)
+
+
+class Command:
+    PREFETCH = "prefetch"
+
+
+def make_common_parser():
+    """
+    Make a parser of the arguments that shared between the default mode and the commands.
+    """
+
+    parser = argparse.ArgumentParser(add_help=False)
+
+    parser.add_argument(
+        "targets",
+        metavar="target",
+        nargs="*",
+        help=dedent(
             """\
-            Issue tracker: https://github.com/thombashi/{:s}/issues
-            """.format(
-                PACKAGE_NAME
-            )
+            PyPI package names, paths to package source code directories, pyproject.toml,
+            or lock files (poetry.lock, pdm.lock, uv.lock, Pipfile.lock).
+            dependencies of all of the targets are resolved at once.
+            depths of locked packages are measured from the direct dependencies
+            in pyproject.toml or Pipfile next to the lock file.
+            defaults to the current directory.
+            """
         ),
     )
-
     parser.add_argument(
-        "target", help="""PyPI package name or path to the package source code directory"""
+        "-r",
+        "--requirement",
+        dest="requirement_files",
+        metavar="FILE",
+        action="append",
+        default=[],
+        help="give stars to packages in a requirements file. can be specified multiple times.",
     )
 
-    parser.add_argument("--version", action="version", version="%(prog)s {}".format(__version__))
-
     group = parser.add_argument_group("Configurations")
     group.add_argument("--token", help="GitHub personal access token that has public_repo scope.")
     group.add_argument(
@@ -53,6 +90,9 @@ def parse_option():
             """\
             path to a conig file. the config file expected to contain token:
             { "token" : <GitHub personal access token that has public_repo scope> }
+            cache lifetimes can be configured for each cache type (pip/PyPI/GitHub/default):
+            { "cache": { "default": { "lifetime_days": 14, "stale_days": 7, "jitter": 0.2 } } }
+            stale caches are used while revalidating in background.
             (defaults to %(default)s).",
             """
         ),
@@ -64,20 +104,6 @@ def parse_option():
         help="setup token interactively, and then starring.",
     )
 
-    group = parser.add_argument_group("Star Status")
-    group.add_argument(
-        "--check",
-        action="store_true",
-        default=False,
-        help=dedent(
-            """\
-            list starred status for each package with tabular format and exit.
-            does not actually star to found GitHub repositories.
-            """
-        ),
-    )
-    group.add_argument("-v", "--verbosity", action="count", help="increase output verbosity.")
-
     group = parser.add_argument_group("Repository Search")
     group.add_argument(
         "--depth",
@@ -94,16 +120,117 @@ def parse_option():
         ),
     )
     group.add_argument(
-        "--include-owner-repo",
+        "--all-installed",
         action="store_true",
         default=False,
-        help="starred to repositories that owned by you.",
+        help=dedent(
+            """\
+            star all of the packages installed in the current environment.
+            depths are computed from packages that no other package requires.
+            --depth is ignored.
+            """
+        ),
     )
     group.add_argument(
         "--no-cache", action="store_true", default=False, help="disable the local caches."
     )
+    group.add_argument(
+        "--cache-backend",
+        choices=[backend.value for backend in CacheBackend],
+        default=CacheBackend.FILE.value,
+        help=dedent(
+            """\
+            storage of the local caches (defaults to %(default)s).
+            file: store each cache entry as a file.
+            sqlite: store cache entries into a SQLite database.
+            existing cache files are imported to the database at the first time.
+            """
+        ),
+    )
+    group.add_argument(
+        "--pypi-url",
+        default=Default.PYPI_URL,
+        help=dedent(
+            """\
+            base URL of the PyPI JSON API to fetch package information,
+            such as a mirror (defaults to %(default)s).
+            """
+        ),
+    )
+    group.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=Default.MAX_WORKERS,
+        help=dedent(
+            """\
+            number of packages to collect information concurrently (defaults to %(default)s).
+            """
+        ),
+    )
+    group.add_argument(
+        "--pip-backend",
+        choices=[backend.value for backend in PipShowBackend],
+        default=PipShowBackend.METADATA.value,
+        help=dedent(
+            """\
+            how to get installed package information (defaults to %(default)s).
+            metadata: read installed distribution metadata in-process.
+            subprocess: execute 'pip show' for each package.
+            """
+        ),
+    )
 
-    parser.add_argument("--dry-run", action="store_true", default=False, help="Do no harm.")
+    group = parser.add_argument_group("Repository Mapping")
+    group.add_argument(
+        "--mapping-db",
+        default=None,
+        metavar="PATH",
+        help=dedent(
+            """\
+            path to the database of package to repository mappings
+            (defaults to {}). the mappings are shared between GitHub users,
+            and rediscovered after {} days (the mapping.lifetime_days of the cache config).
+            """.format(
+                get_default_mapping_db_path(), Default.REPO_MAPPING_LIFETIME_DAYS
+            )
+        ),
+    )
+    group.add_argument(
+        "--no-mapping",
+        action="store_true",
+        default=False,
+        help="neither look up nor record package to repository mappings.",
+    )
+    group.add_argument(
+        "--import-mapping",
+        metavar="FILE",
+        action="append",
+        default=[],
+        help=dedent(
+            """\
+            merge mappings of a file that exported by --export-mapping into the database.
+            a mapping with higher confidence wins. can be specified multiple times.
+            """
+        ),
+    )
+    group.add_argument(
+        "--import-snapshot",
+        metavar="FILE",
+        action="append",
+        default=[],
+        help=dedent(
+            """\
+            merge mappings of a snapshot file into the database.
+            can be specified multiple times.
+            """
+        ),
+    )
+    group.add_argument(
+        "--export-mapping",
+        metavar="FILE",
+        help="export mappings of the database to a file at the end of the execution.",
+    )
 
     dest = "log_level"
     group = parser.add_mutually_exclusive_group()
@@ -135,7 +262,137 @@ def parse_option():
         """,
     )
 
-    return parser.parse_args()
+    return parser
+
+
+def parse_option():
+    common_parser = make_common_parser()
+    description = "Give stars a PyPI package and its dependencies."
+    parser = argparse.ArgumentParser(
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        description=description,
+        parents=[common_parser],
+        epilog=dedent(
+            """\
+            Commands:
+              prefetch  refresh caches of the targets in bulk ahead of time, without starring.
+                        see '%(prog)s prefetch --help' for the options.
+
+            a first target that has the same name as a command is parsed as the command:
+            put '--' before the targets to give stars to the package, e.g.
+            '%(prog)s -- prefetch'.
+
+            Issue tracker: https://github.com/thombashi/{:s}/issues
+            """.format(
+                PACKAGE_NAME
+            )
+        ),
+    )
+    parser.add_argument("--version", action="version", version="%(prog)s {}".format(__version__))
+
+    group = parser.add_argument_group("Star Status")
+    group.add_argument(
+        "--check",
+        action="store_true",
+        default=False,
+        help=dedent(
+            """\
+            list starred status for each package with tabular format and exit.
+            does not actually star to found GitHub repositories.
+            """
+        ),
+    )
+    group.add_argument("-v", "--verbosity", action="count", help="increase output verbosity.")
+    group.add_argument(
+        "--include-owner-repo",
+        action="store_true",
+        default=False,
+        help="starred to repositories that owned by you.",
+    )
+    group.add_argument(
+        "--stream",
+        action="store_true",
+        default=False,
+        help=dedent(
+            """\
+            stream results: start starring (or writing rows with --check)
+            as soon as information of each package is collected.
+            """
+        ),
+    )
+    group.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        default=False,
+        help=dedent(
+            """\
+            discover packages and repositories with the asyncio engine.
+            repositories are starred with aiohttp if installed
+            (pip install thank-you-stars[async]).
+            with --stream, repositories are starred while the discovery continues.
+            """
+        ),
+    )
+
+    group = parser.add_argument_group("Offline")
+    group.add_argument(
+        "--export-snapshot",
+        metavar="FILE",
+        help=dedent(
+            """\
+            export a snapshot of the execution to a file: starred repositories, mappings,
+            pip show results and PyPI information of the found packages.
+            """
+        ),
+    )
+    group.add_argument(
+        "--offline",
+        metavar="SNAPSHOT",
+        help=dedent(
+            """\
+            execute --check with a snapshot file only, without any network access.
+            entries that older than the cache lifetime or not in the snapshot are reported.
+            """
+        ),
+    )
+
+    parser.add_argument("--dry-run", action="store_true", default=False, help="Do no harm.")
+    parser.set_defaults(command=None)
+
+    command_parser = argparse.ArgumentParser(prog=parser.prog, description=description)
+    subparsers = command_parser.add_subparsers(dest="command", metavar="command")
+    prefetch_parser = subparsers.add_parser(
+        Command.PREFETCH,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        parents=[common_parser],
+        help="refresh caches of the targets in bulk ahead of time.",
+        description=dedent(
+            """\
+            refresh caches of the targets in bulk ahead of time, without starring.
+            entries that missing or expire within --expire-within days are refreshed
+            from the closest to the expiry. suitable for cron.
+            """
+        ),
+    )
+    prefetch_parser.add_argument(
+        "--expire-within",
+        type=float,
+        default=Default.PREFETCH_EXPIRE_WITHIN_DAYS,
+        metavar="DAYS",
+        help=dedent(
+            """\
+            refresh caches that expire within the days (defaults to %(default)s).
+            """
+        ),
+    )
+
+    # targets after "--" are never parsed as a command: "thank-you-stars -- prefetch"
+    args = sys.argv[1:]
+    if args and args[0] in subparsers.choices:
+        return command_parser.parse_args(args)
+
+    return parser.parse_args(args)
 
 
 def initialize_cli(options):
@@ -153,29 +410,217 @@ def initialize_cli(options):
 
     set_log_level(options.log_level)
     SubprocessRunner.is_save_history = True
+    PipShow.backend = PipShowBackend(options.pip_backend)
 
     if options.is_output_stacktrace:
         SubprocessRunner.is_output_stacktrace = options.is_output_stacktrace
 
 
-def extract_package_name(options):
-    if options.target and options.target != ".":
-        return options.target
+def create_cache_mgr(user_name, cache_type, cache_configs, options):
+    """
+    :raises ValueError: If the cache configurations are invalid.
+    """
 
-    if os.path.isfile("setup.py"):
-        runner = SubprocessRunner([sys.executable, "setup.py", "--name"])
-        if runner.run() == 0:
-            return runner.stdout.strip().lower()
+    policy = make_cache_policy(cache_type, cache_configs)
+    storage_lifetime = None
+    if options.no_cache and cache_type != CacheType.PIP:
+        # bypass reading existing entries without deleting them
+        storage_lifetime = CacheTime(
+            seconds=policy.lifetime.seconds + policy.stale_lifetime.seconds
+        )
+        policy = policy._replace(
+            lifetime=CacheTime(seconds=10), stale_lifetime=CacheTime(seconds=0)
+        )
 
-    raise ValueError("no package found")
+    return CacheManager(
+        user_name,
+        cache_type.value,
+        policy.lifetime,
+        CacheBackend(options.cache_backend),
+        stale_lifetime=policy.stale_lifetime,
+        jitter=policy.jitter,
+        storage_lifetime=storage_lifetime,
+    )
 
 
-def star_repository(github_client, starred_info_set, cache_mgr_map, options):
-    github_user = github_client.get_user()
-    starred_count = 0
+def load_targets(options):
+    values = options.targets + options.requirement_files
+    if not values:
+        values = ["."]
 
-    for starred_info in sorted(starred_info_set):
-        if starred_info.star_status == StarStatus.STARRED:
+    return [load_target(value) for value in values]
+
+
+def load_pypi_pkg_name_queue(extractor, options):
+    """
+    Add packages of the targets to the extractor.
+
+    :return:
+        Pair of the targets and the queue of packages to traverse with their depths.
+        The queue is ``None`` if the packages are already added with their depths.
+    :raises ValueError:
+        If no package found in the targets, or installed packages could not read.
+    """
+
+    if options.all_installed:
+        if options.targets or options.requirement_files:
+            raise ValueError("--all-installed can not be used with targets")
+
+        try:
+            installed_packages = load_installed_packages()
+        except RuntimeError as e:
+            raise ValueError("--all-installed is not available: {}".format(e))
+
+        PipShow.preload(installed_packages.pip_show_map)
+        extractor.add_pypi_packages(installed_packages.depth_map)
+        logger.info("found {} installed packages".format(len(installed_packages.depth_map)))
+
+        return ([], None)
+
+    targets = exclude_uninstalled_packages(load_targets(options))
+    if not targets:
+        raise ValueError("no installed package found in the targets")
+
+    # dependencies shared between targets are resolved only once.
+    # packages of lock files are queued with their depths in the lock files.
+    return (
+        targets,
+        [
+            (pypi_pkg_name, depth)
+            for target in targets
+            for pypi_pkg_name, depth in iter_root_packages(target)
+            if depth <= options.depth
+        ],
+    )
+
+
+def print_check_result(starred_info_iter, extractor, target_map, options):
+    if options.stream:
+        print_starred_info_stream(
+            starred_info_iter, extractor.repo_depth_map, options.verbosity, target_map
+        )
+    else:
+        print_starred_info(
+            starred_info_iter, extractor.repo_depth_map, options.verbosity, target_map
+        )
+
+
+def preload_offline_pip_show(snapshot):
+    pip_show_map = dict(snapshot.pip_show_map)
+
+    try:
+        # installed packages take precedence over the snapshot
+        pip_show_map.update(load_installed_packages().pip_show_map)
+    except RuntimeError as e:
+        logger.warning("use pip show results of the snapshot only: {}".format(e))
+
+    # never execute pip for packages that are neither installed nor in the snapshot
+    PipShow.preload(pip_show_map, exclusive=True)
+
+
+def log_snapshot_status(stale_pkg_names_map):
+    for stale_status, pypi_pkg_names in sorted(stale_pkg_names_map.items()):
+        logger.warning(
+            "{} {} entries in the snapshot: {}".format(
+                len(pypi_pkg_names), stale_status, ", ".join(pypi_pkg_names)
+            )
+        )
+
+
+def check_offline(options):
+    """
+    Execute ``--check`` with a snapshot only: no GitHub/PyPI access, and no ``pip`` execution.
+    """
+
+    try:
+        snapshot = Snapshot.load(options.offline)
+        lifetime_seconds = make_cache_policy(
+            CacheType.PYPI, load_cache_configs(options.config)
+        ).lifetime.seconds
+    except (OSError, ValueError) as e:
+        logger.error(e)
+        return errno.EINVAL
+
+    preload_offline_pip_show(snapshot)
+
+    starred_repo_index = StarredRepoIndex(snapshot.starred_repo_ids)
+    extractor = GithubStarredInfoExtractor(
+        github_client=OfflineGithubClient(snapshot.user_name),
+        max_depth=options.depth,
+        cache_mgr_map={CacheType.PIP: None, CacheType.GITHUB: None, CacheType.PYPI: None},
+        starred_repo_index=starred_repo_index,
+    )
+
+    try:
+        targets, pypi_pkg_name_queue = load_pypi_pkg_name_queue(extractor, options)
+    except (OSError, ValueError) as e:
+        logger.error(e)
+        return errno.EINVAL
+
+    stale_pkg_names_map = {}
+    if pypi_pkg_name_queue is not None:
+        depth_map, missing_pkg_names = traverse_preloaded_packages(
+            pypi_pkg_name_queue, options.depth
+        )
+        extractor.add_pypi_packages(depth_map)
+        if missing_pkg_names:
+            stale_pkg_names_map["missing pip show"] = missing_pkg_names
+
+    starred_infos = []
+    for pypi_pkg_name in sorted(extractor.repo_depth_map):
+        starred_info, stale_status = snapshot.get_starred_info(
+            pypi_pkg_name, starred_repo_index, lifetime_seconds
+        )
+        starred_infos.append(starred_info)
+        if stale_status:
+            stale_pkg_names_map.setdefault(stale_status, []).append(pypi_pkg_name)
+
+    target_map = attribute_targets(targets, options.depth) if len(targets) > 1 else None
+    print_check_result(iter(starred_infos), extractor, target_map, options)
+    log_snapshot_status(stale_pkg_names_map)
+
+    return 0
+
+
+def _record_iter(iterable, records):
+    for item in iterable:
+        records.append(item)
+        yield item
+
+
+def export_snapshot(user_name, starred_infos, extractor, repo_mapping_db, options):
+    if not options.export_snapshot:
+        return
+
+    snapshot = Snapshot.build(
+        user_name,
+        starred_infos,
+        extractor.starred_repo_index,
+        repo_mapping_db=repo_mapping_db,
+        pypi_client=extractor.pypi_client,
+        pip_pkg_names=extractor.repo_depth_map,
+    )
+    snapshot.dump(options.export_snapshot)
+    logger.info(
+        "exported a snapshot to {}: packages={}".format(
+            options.export_snapshot, len(snapshot.pip_show_map)
+        )
+    )
+
+
+def iter_star_targets(
+    starred_info_iter, starred_repo_index, pkg_names_map, options, target_map=None
+):
+    """
+    Filter out repositories that should not be starred, and yield repository ids to star.
+    Package names of each repository are collected into ``pkg_names_map``.
+    """
+
+    for starred_info in starred_info_iter:
+        if (
+            starred_info.star_status == StarStatus.STARRED
+            or starred_info.github_repo_id in starred_repo_index
+        ):
             logger.info("skip already starred: {}".format(starred_info.github_repo_id))
             continue
 
@@ -193,38 +638,217 @@ def star_repository(github_client, starred_info_set, cache_mgr_map, options):
             )
             continue
 
-        logger.info("star to {}".format(starred_info.github_repo_id))
-        if options.dry_run:
-            continue
-
-        try:
-            repo_obj = github_client.get_repo(starred_info.github_repo_id)
-        except UnknownObjectException as e:
-            logger.error(msgfy.to_error_message(e))
-            continue
+        is_new_repo = starred_info.github_repo_id not in pkg_names_map
+        pkg_names_map.setdefault(starred_info.github_repo_id, []).append(starred_info.pypi_pkg_name)
 
-        try:
-            github_user.add_to_starred(repo_obj)
-            starred_count += 1
-            cache_mgr_map[CacheType.PYPI].remove_pkg_cache(
-                starred_info.pypi_pkg_name, "starred_info"
-            )
-        except UnknownObjectException as e:
-            logger.error(
-                dedent(
-                    """\
-                    failed to star a repository. the personal access token
-                    may not has public_repo scope.
-                    msg: {}
-                    """.format(
-                        msgfy.to_error_message(e)
+        if is_new_repo:
+            if target_map:
+                logger.info(
+                    "star to {} (required by {})".format(
+                        starred_info.github_repo_id,
+                        ", ".join(target_map.get(starred_info.pypi_pkg_name.lower(), [])),
                     )
                 )
+            else:
+                logger.info("star to {}".format(starred_info.github_repo_id))
+            yield starred_info.github_repo_id
+
+
+def star_repository(
+    starring_engine,
+    user_name,
+    starred_info_iter,
+    starred_repo_index,
+    cache_mgr_map,
+    options,
+    target_map=None,
+):
+    """
+    Star repositories while ``starred_info_iter`` is being produced:
+    results are reported as soon as each of the repositories is starred.
+    """
+
+    pkg_names_map = OrderedDict()
+    star_targets = iter_star_targets(
+        starred_info_iter, starred_repo_index, pkg_names_map, options, target_map
+    )
+
+    if options.dry_run:
+        for _repo_id in star_targets:
+            pass
+        return
+
+    results = []
+    for result in starring_engine.star_iter(star_targets):
+        if result.is_success:
+            logger.info("starred: {}".format(result.repo_id))
+        else:
+            logger.error("failed to star {}: {}".format(result.repo_id, result.message))
+
+        results.append(result)
+
+    starred_repo_ids = [result.repo_id for result in results if result.is_success]
+
+    # invalidate caches at once after starring
+    for repo_id in starred_repo_ids:
+        for pypi_pkg_name in pkg_names_map[repo_id]:
+            cache_mgr_map[CacheType.PYPI].remove_pkg_cache(pypi_pkg_name, "starred_info")
+
+    if starred_repo_ids:
+        add_starred_repos(
+            cache_mgr_map[CacheType.GITHUB], user_name, starred_repo_ids, starred_repo_index
+        )
+
+    logger.info(
+        "starred {} repositories, failed {} repositories".format(
+            len(starred_repo_ids), len(results) - len(starred_repo_ids)
+        )
+    )
+
+
+def log_cache_memo_stats(cache_mgr_map):
+    for cache_type, cache_mgr in sorted(cache_mgr_map.items(), key=lambda item: item[0].value):
+        stats = cache_mgr.memo_stats
+        logger.debug(
+            "in-memory cache: type={}, hits={}, misses={}, size={}".format(
+                cache_type.value, stats.hits, stats.misses, stats.size
             )
-            continue
+        )
+
+
+def log_verification_stats(stats):
+    if not stats.packages:
+        return
+
+    api_request_count = sum(stats.api_request_counts.values())
+    logger.info(
+        "verification: verified={}/{} ({:.1f}%), API requests={} ({:.2f}/package)".format(
+            stats.verified,
+            stats.packages,
+            100.0 * stats.verified / stats.packages,
+            api_request_count,
+            api_request_count / stats.packages,
+        )
+    )
+    logger.debug(
+        "verification details: stages={}, API requests={}".format(
+            stats.stage_counts, stats.api_request_counts
+        )
+    )
+
+
+def open_repo_mapping_db(options):
+    if options.no_mapping:
+        return None
+
+    repo_mapping_db = RepoMappingDB(
+        options.mapping_db or get_default_mapping_db_path(),
+        lifetime=make_mapping_lifetime(load_cache_configs(options.config)),
+        # only mappings that found in this run are looked up without caches
+        not_before=time.time() if options.no_cache else None,
+    )
+
+    for filepath in options.import_mapping:
+        count = repo_mapping_db.merge_file(filepath)
+        logger.info("imported {} repository mappings from {}".format(count, filepath))
+
+    for filepath in options.import_snapshot:
+        count = repo_mapping_db.merge(Snapshot.load(filepath).repo_mappings)
+        logger.info("imported {} repository mappings from {}".format(count, filepath))
+
+    return repo_mapping_db
+
+
+def export_repo_mapping(repo_mapping_db, options):
+    if repo_mapping_db is None or not options.export_mapping:
+        return
+
+    count = repo_mapping_db.export(options.export_mapping)
+    logger.info("exported {} repository mappings to {}".format(count, options.export_mapping))
+
+
+def prepare_run(options, repo_mapping_db):
+    """
+    :return:
+        Tuple of |RunContext|, the targets and the queue of root packages.
+        ``None`` if failed.
+    """
+
+    try:
+        context = create_run_context(options, repo_mapping_db)
+    except (RuntimeError, ValueError) as e:
+        logger.error(e)
+        return None
+
+    try:
+        targets, pypi_pkg_name_queue = load_pypi_pkg_name_queue(context.extractor, options)
+    except (OSError, ValueError) as e:
+        logger.error(e)
+        return None
+
+    return (context, targets, pypi_pkg_name_queue)
+
+
+def prefetch(options):
+    try:
+        repo_mapping_db = open_repo_mapping_db(options)
+    except (OSError, ValueError) as e:
+        logger.error(e)
+        return errno.EINVAL
+
+    prepared = prepare_run(options, repo_mapping_db)
+    if prepared is None:
+        return errno.EINVAL
+
+    context, _targets, pypi_pkg_name_queue = prepared
+    extractor = context.extractor
+
+    if pypi_pkg_name_queue is not None:
+        extractor.list_pypi_packages(pypi_pkg_name_queue)
+
+    try:
+        prefetcher = CachePrefetcher(
+            extractor,
+            context.cache_mgr_map,
+            expire_within_seconds=CacheTime(days=options.expire_within).seconds,
+            max_workers=options.jobs,
+            negative_index=context.negative_index,
+        )
+    except ValueError as e:
+        logger.error(e)
+        return errno.EINVAL
+
+    stats = prefetcher.prefetch(sorted(extractor.repo_depth_map))
+    logger.info("prefetch: refreshed {} of {} packages".format(stats.refreshed, stats.packages))
+    log_run_stats(context.cache_mgr_map, extractor, context.negative_index)
+    export_repo_mapping(repo_mapping_db, options)
+
+    return 0
+
+
+def log_negative_stats(stats):
+    lookups = stats.hits + stats.misses
+    if not lookups:
+        return
+
+    logger.info(
+        "negative index: hit rate={:.1f}% ({}/{} lookups), entries={}".format(
+            stats.hits / lookups * 100, stats.hits, lookups, stats.size
+        )
+    )
 
-    if starred_count:
-        cache_mgr_map[CacheType.GITHUB].remove_misc_cache(github_user.login, "starred")
+
+def log_run_stats(cache_mgr_map, extractor, negative_index=None):
+    # stale caches that served during the execution are revalidated in background
+    for cache_mgr in cache_mgr_map.values():
+        cache_mgr.wait_revalidation()
+
+    if negative_index is not None:
+        negative_index.save()
+
+    log_cache_memo_stats(cache_mgr_map)
+    log_negative_stats(extractor.negative_stats)
+    log_verification_stats(extractor.verification_stats)
 
 
 def setup_config(options):
@@ -236,6 +860,99 @@ def setup_config(options):
         sys.exit(return_code)
 
 
+def is_mapping_only(options):
+    return bool(
+        (options.import_mapping or options.import_snapshot or options.export_mapping)
+        and not (options.targets or options.requirement_files or options.all_installed)
+    )
+
+
+def create_run_context(options, repo_mapping_db):
+    """
+    Create clients, caches and the extractor of an execution for the GitHub user.
+
+    :raises RuntimeError: If the GitHub client could not create.
+    :raises ValueError: If the configurations are invalid.
+    """
+
+    # share the budgets of the API rate limit between the clients
+    scheduler = RateLimitScheduler()
+    github_client = create_github_client(options, scheduler)
+    user_name = github_client.get_user().login
+
+    cache_configs = load_cache_configs(options.config)
+    cache_mgr_map = {
+        cache_type: create_cache_mgr(user_name, cache_type, cache_configs, options)
+        for cache_type in CacheType
+    }
+    negative_index = NegativeIndex(
+        filepath=None if options.no_cache else get_negative_index_filepath(user_name),
+        ttl_map=make_negative_ttl_map(cache_configs),
+    )
+    rest_client = create_github_rest_client(options, scheduler)
+    verification_counter = VerificationCounter()
+    extractor = GithubStarredInfoExtractor(
+        github_client=github_client,
+        max_depth=options.depth,
+        cache_mgr_map=cache_mgr_map,
+        starred_repo_index=fetch_starred_repo_index(
+            rest_client, user_name, cache_mgr_map[CacheType.GITHUB]
+        ),
+        max_workers=options.jobs,
+        repo_resolver=GitHubRepoResolver(rest_client),
+        pypi_client=PyPIClient(cache_mgr_map[CacheType.PYPI], base_url=options.pypi_url),
+        metadata_verifier=RepoMetadataVerifier(
+            rest_client, cache_mgr_map[CacheType.GITHUB], verification_counter
+        ),
+        verification_counter=verification_counter,
+        repo_mapping_db=repo_mapping_db,
+        negative_index=negative_index,
+    )
+
+    return RunContext(
+        user_name=user_name,
+        scheduler=scheduler,
+        rest_client=rest_client,
+        cache_mgr_map=cache_mgr_map,
+        negative_index=negative_index,
+        extractor=extractor,
+    )
+
+
+def iter_collected_starred_info(extractor, pypi_pkg_name_queue, options):
+    if options.use_async and pypi_pkg_name_queue is not None:
+        engine = AsyncDiscoveryEngine(extractor, max_workers=options.jobs)
+        if options.stream:
+            return engine.iter_run(pypi_pkg_name_queue)
+
+        return iter(sorted(engine.run(pypi_pkg_name_queue)))
+
+    if pypi_pkg_name_queue is not None:
+        extractor.list_pypi_packages(pypi_pkg_name_queue)
+
+    if options.stream:
+        return extractor.iter_starred_info()
+
+    return iter(sorted(extractor.collect_starred_info()))
+
+
+def create_starring_engine(context, options):
+    if options.use_async and is_aiohttp_available():
+        return AsyncStarringEngine(
+            extract_github_api_token(options),
+            max_concurrency=options.jobs,
+            scheduler=context.scheduler,
+        )
+
+    return StarringEngine(context.rest_client, max_workers=options.jobs)
+
+
+def finish_run(context, repo_mapping_db, starred_infos, options):
+    log_run_stats(context.cache_mgr_map, context.extractor, context.negative_index)
+    export_repo_mapping(repo_mapping_db, options)
+    export_snapshot(context.user_name, starred_infos, context.extractor, repo_mapping_db, options)
+
+
 def main():
     options = parse_option()
 
@@ -249,53 +966,56 @@ def main():
             return return_code
     """
 
-    try:
-        github_client = create_github_client(options)
-    except RuntimeError as e:
-        logger.error(e)
-        return errno.EINVAL
+    if options.command == Command.PREFETCH:
+        return prefetch(options)
 
-    github_user = github_client.get_user()
-    user_name = github_user.login
-    cache_mgr_map = {CacheType.PIP: CacheManager(user_name, "pip", CacheTime(days=14))}
-
-    if options.no_cache:
-        cache_mgr_map[CacheType.GITHUB] = CacheManager(user_name, "GitHub", CacheTime(seconds=10))
-        cache_mgr_map[CacheType.PYPI] = CacheManager(user_name, "PyPI", CacheTime(seconds=10))
-    else:
-        cache_mgr_map[CacheType.GITHUB] = CacheManager(user_name, "GitHub", CacheTime(days=14))
-        cache_mgr_map[CacheType.PYPI] = CacheManager(user_name, "PyPI", CacheTime(days=14))
+    if options.offline:
+        return check_offline(options)
 
     try:
-        extractor = GithubStarredInfoExtractor(
-            github_client=github_client,
-            max_depth=options.depth,
-            cache_mgr_map=cache_mgr_map,
-            starred_repo_id_list=fetch_starred_repo_list(
-                github_client, cache_mgr_map[CacheType.GITHUB]
-            ),
-        )
-    except ValueError as e:
+        repo_mapping_db = open_repo_mapping_db(options)
+    except (OSError, ValueError) as e:
         logger.error(e)
         return errno.EINVAL
 
-    extractor.list_pypi_packages([(extract_package_name(options), 0)])
+    if is_mapping_only(options):
+        # only maintain the mappings: those do not depend on GitHub users
+        export_repo_mapping(repo_mapping_db, options)
+        return 0
 
-    starred_info_set = set()
-    for pypi_pkg_name, depth in tqdm(
-        sorted(extractor.repo_depth_map.items()), desc="Collect GitHub info"
-    ):
-        starred_info_set.add(extractor.extract_starred_info(pypi_pkg_name))
+    prepared = prepare_run(options, repo_mapping_db)
+    if prepared is None:
+        return errno.EINVAL
 
-    if not starred_info_set:
+    context, targets, pypi_pkg_name_queue = prepared
+    extractor = context.extractor
+    starred_info_iter = iter_collected_starred_info(extractor, pypi_pkg_name_queue, options)
+
+    first_starred_info = next(starred_info_iter, None)
+    if first_starred_info is None:
         logger.error("starred information not found")
         return errno.ENOENT
 
+    starred_info_iter = chain([first_starred_info], starred_info_iter)
+    starred_infos = []
+    if options.export_snapshot:
+        starred_info_iter = _record_iter(starred_info_iter, starred_infos)
+    target_map = attribute_targets(targets, options.depth) if len(targets) > 1 else None
+
     if options.check:
-        print_starred_info(starred_info_set, extractor.repo_depth_map, options.verbosity)
-        return 0
+        print_check_result(starred_info_iter, extractor, target_map, options)
+    else:
+        star_repository(
+            create_starring_engine(context, options),
+            context.user_name,
+            starred_info_iter,
+            extractor.starred_repo_index,
+            context.cache_mgr_map,
+            options,
+            target_map,
+        )
 
-    star_repository(github_client, starred_info_set, cache_mgr_map, options)
+    finish_run(context, repo_mapping_db, starred_infos, options)
 
     return 0
 
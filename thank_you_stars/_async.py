@@ -0,0 +1,371 @@
+import asyncio
+import functools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import msgfy
+from tqdm import tqdm
+
+from ._const import Default
+from ._logger import logger
+from ._pip_show import PipShow
+from ._ratelimit import RateLimitExhausted, RateLimitScheduler, detect_rate_limit_bucket
+from ._star import NOT_FOUND_MESSAGE, StarResult, get_retry_wait_seconds, make_star_path
+
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+def is_aiohttp_available():
+    return aiohttp is not None
+
+
+def run_coroutine(coroutine):
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def iter_coroutine_results(make_coroutine):
+    """
+    Run a coroutine in a background thread, and yield values that the coroutine passes to
+    the callback as soon as they are produced.
+
+    :param make_coroutine: Function that returns a coroutine from the callback.
+    """
+
+    result_queue = queue.Queue()
+    end_of_results = object()
+    error_holder = []
+
+    def run():
+        try:
+            run_coroutine(make_coroutine(result_queue.put))
+        except BaseException as e:
+            error_holder.append(e)
+        finally:
+            result_queue.put(end_of_results)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+
+    while True:
+        result = result_queue.get()
+        if result is end_of_results:
+            break
+
+        yield result
+
+    thread.join()
+    if error_holder:
+        raise error_holder[0]
+
+
+class _Host:
+    LOCAL = "local"
+    PYPI = "pypi"
+    GITHUB = "github"
+
+
+async def _wait_all(tasks):
+    """
+    Wait for ``tasks`` that may grow while waiting. Cancel the rest if one of them failed.
+    """
+
+    while tasks:
+        done, _pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        tasks.difference_update(done)
+
+        for task in done:
+            if task.exception() is not None:
+                for pending_task in tasks:
+                    pending_task.cancel()
+                raise task.exception()
+
+
+class AsyncDiscoveryEngine:
+    """
+    Discover dependencies of packages and their GitHub repositories with an asyncio pipeline:
+    each package is passed to the next stage as soon as it is found, instead of
+    waiting for every package at the same depth.
+    Blocking clients are executed in a thread pool, and concurrency of the stages is bounded
+    per host (``pip show``, PyPI and GitHub).
+
+    Packages with caches are extracted as soon as found. Repository candidates of the other
+    packages are resolved in chunks of ``prefetch_chunk_size`` packages with
+    :py:meth:`GithubStarredInfoExtractor.prefetch_repo_resolutions` while the discovery
+    continues, and each chunk is extracted as soon as resolved.
+    GitHub requests go through the clients of the extractor, and share the rate limit
+    scheduler with the synchronous path.
+
+    Results are the same as
+    :py:meth:`GithubStarredInfoExtractor.list_pypi_packages` followed by
+    :py:meth:`GithubStarredInfoExtractor.collect_starred_info`.
+    """
+
+    def __init__(
+        self,
+        extractor,
+        max_workers=Default.MAX_WORKERS,
+        max_concurrency_per_host=Default.MAX_CONCURRENCY_PER_HOST,
+        prefetch_chunk_size=Default.PREFETCH_CHUNK_SIZE,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than zero")
+        if max_concurrency_per_host < 1:
+            raise ValueError("max_concurrency_per_host must be greater than zero")
+        if prefetch_chunk_size < 1:
+            raise ValueError("prefetch_chunk_size must be greater than zero")
+
+        self.__extractor = extractor
+        self.__max_workers = max_workers
+        self.__max_concurrency_per_host = max_concurrency_per_host
+        self.__prefetch_chunk_size = prefetch_chunk_size
+
+    def run(self, pypi_pkg_name_queue):
+        starred_infos = set()
+        run_coroutine(self.discover(pypi_pkg_name_queue, starred_infos.add))
+
+        return starred_infos
+
+    def iter_run(self, pypi_pkg_name_queue):
+        """
+        Yield |GitHubStarredInfo| of discovered packages in the order of completion.
+        """
+
+        return iter_coroutine_results(functools.partial(self.discover, pypi_pkg_name_queue))
+
+    async def discover(self, pypi_pkg_name_queue, callback):
+        """
+        :param pypi_pkg_name_queue: Pairs of a package name and the depth of the package.
+        :param callback: Function called with |GitHubStarredInfo| of each discovered package.
+        """
+
+        extractor = self.__extractor
+        repo_depth_map = extractor.repo_depth_map
+        loop = asyncio.get_event_loop()
+        semaphore_map = {
+            host: asyncio.Semaphore(self.__max_concurrency_per_host)
+            for host in (_Host.LOCAL, _Host.PYPI, _Host.GITHUB)
+        }
+        tasks = set()
+        uncached_pkg_names = []
+
+        async def call(host, func, *args):
+            async with semaphore_map[host]:
+                return await loop.run_in_executor(executor, functools.partial(func, *args))
+
+        async def visit(pypi_pkg_name, depth):
+            pip_show = await call(_Host.LOCAL, PipShow.execute, pypi_pkg_name)
+
+            if depth >= extractor.max_depth or repo_depth_map[pypi_pkg_name] < depth:
+                return
+
+            for require_package in pip_show.extract_requires():
+                schedule(require_package.lower(), depth + 1)
+
+        async def extract(host, pypi_pkg_name):
+            callback(await call(host, extractor.extract_starred_info, pypi_pkg_name))
+            pbar.update(1)
+
+        async def resolve(pypi_pkg_names):
+            await loop.run_in_executor(
+                prefetch_executor, extractor.prefetch_repo_resolutions, pypi_pkg_names
+            )
+            await _wait_all(
+                {
+                    loop.create_task(extract(_Host.GITHUB, pypi_pkg_name))
+                    for pypi_pkg_name in pypi_pkg_names
+                }
+            )
+
+        def flush_uncached():
+            tasks.add(loop.create_task(resolve(sorted(uncached_pkg_names))))
+            del uncached_pkg_names[:]
+
+        async def prepare(pypi_pkg_name):
+            if extractor.is_starred_info_cached(pypi_pkg_name):
+                # caches do not consume the API rate limit
+                await extract(_Host.LOCAL, pypi_pkg_name)
+                return
+
+            await call(_Host.PYPI, extractor.pypi_client.fetch_info, pypi_pkg_name)
+            uncached_pkg_names.append(pypi_pkg_name)
+            if len(uncached_pkg_names) >= self.__prefetch_chunk_size:
+                flush_uncached()
+
+        def schedule(pypi_pkg_name, depth):
+            prev_depth = repo_depth_map.get(pypi_pkg_name)
+            if prev_depth is not None and prev_depth <= depth:
+                return
+
+            # the depth of a package is the shortest depth from the root packages:
+            # visit again if a shorter path found to propagate the depth
+            repo_depth_map[pypi_pkg_name] = depth
+            tasks.add(loop.create_task(visit(pypi_pkg_name, depth)))
+
+            if prev_depth is None:
+                tasks.add(loop.create_task(prepare(pypi_pkg_name)))
+                pbar.total += 1
+                pbar.refresh()
+
+        # chunks are resolved one at a time in order, as the synchronous path does
+        with tqdm(desc="Collect GitHub info", total=0) as pbar, ThreadPoolExecutor(
+            max_workers=self.__max_workers
+        ) as executor, ThreadPoolExecutor(max_workers=1) as prefetch_executor:
+            for pypi_pkg_name, depth in pypi_pkg_name_queue:
+                schedule(pypi_pkg_name, depth)
+
+            await _wait_all(tasks)
+
+            # the rest of packages that do not fill a chunk
+            if uncached_pkg_names:
+                flush_uncached()
+                await _wait_all(tasks)
+
+
+class AsyncStarringEngine:
+    """
+    Star GitHub repositories concurrently with ``aiohttp``:
+    the asyncio counterpart of |StarringEngine|.
+    Requests are throttled by ``scheduler`` under the rate limit as the same as
+    |GitHubRestClient|: share the scheduler with the other clients to coordinate the budget.
+    Requires ``aiohttp`` (``pip install thank-you-stars[async]``).
+    """
+
+    def __init__(
+        self,
+        token,
+        base_url=Default.GITHUB_API_URL,
+        max_concurrency=Default.MAX_CONCURRENCY_PER_HOST,
+        max_retries=5,
+        backoff_factor=2.0,
+        scheduler=None,
+    ):
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is required: pip install thank-you-stars[async]")
+
+        self.__base_url = base_url.rstrip("/")
+        self.__headers = {"Accept": "application/vnd.github.v3+json", "Content-Length": "0"}
+        if token:
+            self.__headers["Authorization"] = "token {}".format(token)
+
+        self.__max_concurrency = max_concurrency
+        self.__max_retries = max_retries
+        self.__backoff_factor = backoff_factor
+        self.__scheduler = scheduler if scheduler is not None else RateLimitScheduler()
+
+    def star(self, repo_ids):
+        """
+        Return |StarResult| for each of the repositories in the same order as ``repo_ids``.
+        """
+
+        if not repo_ids:
+            return []
+
+        return run_coroutine(self.star_async(repo_ids))
+
+    def star_iter(self, repo_ids):
+        """
+        Star repositories while ``repo_ids`` is being produced,
+        and yield |StarResult| in the order of completion.
+        """
+
+        return iter_coroutine_results(functools.partial(self.star_stream, repo_ids))
+
+    async def star_async(self, repo_ids):
+        semaphore = asyncio.Semaphore(self.__max_concurrency)
+
+        async with aiohttp.ClientSession(headers=self.__headers) as session:
+            return await asyncio.gather(
+                *[self.__star(session, semaphore, repo_id) for repo_id in repo_ids]
+            )
+
+    async def star_stream(self, repo_ids, callback):
+        """
+        :param repo_ids:
+            Iterable of repository ids. Items are taken in a thread: ``repo_ids``
+            may be a generator that blocks, e.g. the discovery of the repositories.
+        :param callback: Function called with |StarResult| of each of the repositories.
+        """
+
+        semaphore = asyncio.Semaphore(self.__max_concurrency)
+        loop = asyncio.get_event_loop()
+        repo_id_iter = iter(repo_ids)
+        end_of_repo_ids = object()
+        tasks = set()
+
+        async def star(repo_id):
+            callback(await self.__star(session, semaphore, repo_id))
+
+        async with aiohttp.ClientSession(headers=self.__headers) as session:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                while True:
+                    repo_id = await loop.run_in_executor(
+                        executor, next, repo_id_iter, end_of_repo_ids
+                    )
+                    if repo_id is end_of_repo_ids:
+                        break
+
+                    tasks.add(loop.create_task(star(repo_id)))
+
+            await _wait_all(tasks)
+
+    async def __star(self, session, semaphore, repo_id):
+        path = make_star_path(repo_id)
+        bucket = detect_rate_limit_bucket(path)
+        loop = asyncio.get_event_loop()
+        retry_count = 0
+
+        while True:
+            try:
+                # acquire in a thread: waiting for the reset of the rate limit blocks
+                await loop.run_in_executor(None, self.__scheduler.acquire, bucket)
+            except RateLimitExhausted as e:
+                return StarResult(repo_id, False, msgfy.to_error_message(e))
+
+            try:
+                async with semaphore, session.put(self.__base_url + path) as r:
+                    status_code = r.status
+                    headers = r.headers
+                    text = await r.text()
+            except aiohttp.ClientError as e:
+                return StarResult(repo_id, False, str(e))
+
+            self.__scheduler.update_from_headers(bucket, headers)
+
+            if (
+                status_code in (403, 429)
+                and headers.get("X-RateLimit-Remaining") == "0"
+                and self.__scheduler.get_wait_seconds(bucket) > 0
+                and self.__scheduler.can_wait(bucket)
+            ):
+                # primary rate limit exceeded: retry after the reset
+                continue
+
+            if status_code == 204:
+                return StarResult(repo_id, True, "starred")
+
+            if status_code == 404:
+                return StarResult(repo_id, False, NOT_FOUND_MESSAGE)
+
+            wait_seconds = get_retry_wait_seconds(
+                status_code, headers, text, retry_count, self.__backoff_factor
+            )
+            if wait_seconds is None or retry_count >= self.__max_retries:
+                return StarResult(repo_id, False, "status={}: {}".format(status_code, text.strip()))
+
+            logger.debug(
+                "secondary rate limit exceeded, retry after {:.1f} seconds: {}".format(
+                    wait_seconds, repo_id
+                )
+            )
+            await asyncio.sleep(wait_seconds)
+            retry_count += 1
@@ -1,5 +1,12 @@
 import enum
 import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from functools import total_ordering
 
@@ -8,7 +15,7 @@ from datetimerange import DateTimeRange
 from path import Path
 from pathvalidate import sanitize_filename, sanitize_filepath
 
-from ._const import PACKAGE_NAME
+from ._const import PACKAGE_NAME, Default
 from ._logger import logger
 
 
@@ -23,9 +30,10 @@ def hour_to_sec(hour):
     return hour * (60 ** 2)
 
 
-def touch(filepath):
-    with open(filepath, "w"):
-        pass
+@enum.unique
+class CacheBackend(enum.Enum):
+    FILE = "file"
+    SQLITE = "sqlite"
 
 
 @enum.unique
@@ -61,82 +69,603 @@ class CacheTime:
         return self.seconds < other.seconds
 
 
-class CacheManager:
-    def __init__(self, user_name, cache_type, cache_lifetime):
-        self.__base_dir = (
-            Path(
-                "~/.cache/{package}/{user}/{cache_type}".format(
-                    package=PACKAGE_NAME, user=user_name, cache_type=cache_type
+CachePolicy = namedtuple("CachePolicy", "lifetime stale_lifetime jitter")
+
+_DEFAULT_CACHE_POLICY_MAP = {
+    CacheType.PIP: CachePolicy(CacheTime(days=14), CacheTime(seconds=0), 0.0),
+    CacheType.GITHUB: CachePolicy(CacheTime(days=14), CacheTime(days=7), 0.2),
+    CacheType.PYPI: CachePolicy(CacheTime(days=14), CacheTime(days=7), 0.2),
+}
+
+
+def make_cache_policy(cache_type, cache_configs=None):
+    """
+    Make |CachePolicy| of a cache type from the ``cache`` entry of the config file:
+    a mapping of cache type names (or ``default``) to ``lifetime_days``, ``stale_days``
+    and ``jitter``. Unspecified values are the defaults of the cache type.
+
+    :raises ValueError: If the configurations are invalid.
+    """
+
+    policy = _DEFAULT_CACHE_POLICY_MAP[cache_type]
+    cache_configs = {key.lower(): value for key, value in (cache_configs or {}).items()}
+    configs = {}
+
+    for key in ("default", cache_type.value.lower()):
+        configs.update(cache_configs.get(key) or {})
+
+    try:
+        if "lifetime_days" in configs:
+            policy = policy._replace(lifetime=CacheTime(days=float(configs["lifetime_days"])))
+        if "stale_days" in configs:
+            policy = policy._replace(stale_lifetime=CacheTime(days=float(configs["stale_days"])))
+        if "jitter" in configs:
+            policy = policy._replace(jitter=float(configs["jitter"]))
+    except (TypeError, ValueError) as e:
+        raise ValueError("invalid cache config of {}: {}".format(cache_type.value, e))
+
+    if policy.lifetime.seconds < 0 or policy.stale_lifetime.seconds < 0:
+        raise ValueError("cache lifetime must be greater or equal to zero")
+    if not 0 <= policy.jitter < 1:
+        raise ValueError("cache jitter must be in the range of [0, 1)")
+
+    return policy
+
+
+class CacheState:
+    FRESH = "fresh"
+    STALE = "stale"
+    ABSENT = "absent"
+
+
+MemoStats = namedtuple("MemoStats", "hits misses size")
+
+
+class _LruMemo:
+    """
+    Thread-safe, size-bounded LRU mapping of cache entries to the values that already
+    loaded within the process.
+    """
+
+    def __init__(self, maxsize):
+        self.__maxsize = maxsize
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def stats(self):
+        with self.__lock:
+            return MemoStats(hits=self.__hits, misses=self.__misses, size=len(self.__entries))
+
+    def get(self, key, field):
+        with self.__lock:
+            value = self.__entries.get(key, {}).get(field)
+
+            if value is None:
+                self.__misses += 1
+                return None
+
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+
+            return value
+
+    def update(self, key, **fields):
+        with self.__lock:
+            self.__entries.setdefault(key, {}).update(fields)
+            self.__entries.move_to_end(key)
+
+            while len(self.__entries) > self.__maxsize:
+                self.__entries.popitem(last=False)
+
+    def set(self, key, **fields):
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+        self.update(key, **fields)
+
+    def invalidate(self, key):
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+
+class _Revalidator:
+    """
+    Execute revalidations of stale cache entries in background threads:
+    an entry is revalidated at most once at a time.
+    """
+
+    def __init__(self, max_workers):
+        self.__max_workers = max_workers
+        self.__lock = threading.Lock()
+        self.__executor = None
+        self.__pending_keys = set()
+
+    def submit(self, key, func):
+        with self.__lock:
+            if key in self.__pending_keys:
+                return False
+
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(max_workers=self.__max_workers)
+
+            self.__pending_keys.add(key)
+            self.__executor.submit(self.__run, key, func)
+
+        return True
+
+    def __run(self, key, func):
+        try:
+            func()
+        except Exception as e:
+            logger.debug("failed to revalidate {}: {}".format(key, msgfy.to_debug_message(e)))
+        finally:
+            with self.__lock:
+                self.__pending_keys.discard(key)
+
+    def wait(self):
+        with self.__lock:
+            executor = self.__executor
+            self.__executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+class FileCacheStorage:
+    """
+    Store each cache entry as a file: ``<base dir>/<key>/<name>``.
+    """
+
+    def __init__(self, base_dir):
+        self.__base_dir = base_dir
+        self.__created_dirs = set()
+
+    def get_entry(self, key, name):
+        cache_dir = self.__base_dir.joinpath(key)
+
+        if cache_dir not in self.__created_dirs:
+            cache_dir.makedirs_p()
+            self.__created_dirs.add(cache_dir)
+
+        return cache_dir.joinpath(name)
+
+    def get_mtime(self, cache_file_path):
+        if not cache_file_path.isfile():
+            return None
+
+        try:
+            return cache_file_path.mtime
+        except OSError:
+            return None
+
+    def read_text(self, cache_file_path):
+        with cache_file_path.open() as f:
+            return f.read()
+
+    def write_text(self, cache_file_path, text, expires_at, mtime=None):
+        # replace atomically: readers never see a partially written file, and
+        # memory-mapped old contents stay valid.
+        temp_filepath = Path(
+            "{}.{}.{}.tmp".format(cache_file_path, os.getpid(), threading.get_ident())
+        )
+
+        with temp_filepath.open(mode="w") as f:
+            f.write(text)
+
+        if mtime is not None:
+            os.utime(temp_filepath, (mtime, mtime))
+
+        os.replace(temp_filepath, cache_file_path)
+
+    def remove(self, cache_file_path):
+        cache_file_path.remove_p()
+
+    def get_local_filepath(self, cache_file_path):
+        return cache_file_path
+
+
+class SqliteCacheEntry(namedtuple("SqliteCacheEntry", "cache_type key name")):
+    def __str__(self):
+        return "{}/{}/{}".format(self.cache_type, self.key, self.name)
+
+
+class _SqliteDatabase:
+    __lock = threading.Lock()
+    __instances = {}
+
+    @classmethod
+    def open(cls, db_path):
+        with cls.__lock:
+            if db_path not in cls.__instances:
+                cls.__instances[db_path] = cls(db_path)
+
+            return cls.__instances[db_path]
+
+    def __init__(self, db_path):
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+
+        with self.lock:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache (
+                    type TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    updated_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (type, key, name)
                 )
+                """
             )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)"
+            )
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS migration (type TEXT NOT NULL PRIMARY KEY)"
+            )
+
+    def execute(self, sql, parameters=()):
+        with self.lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+
+class SqliteCacheStorage:
+    """
+    Store cache entries of all of the cache types into a single SQLite database.
+    Each row has an expiry timestamp, expired rows are regarded as absent.
+    """
+
+    def __init__(self, db_path, cache_type):
+        self.__db = _SqliteDatabase.open(db_path)
+        self.__cache_type = cache_type
+
+    def get_entry(self, key, name):
+        return SqliteCacheEntry(cache_type=self.__cache_type, key=key, name=name)
+
+    def get_mtime(self, entry):
+        rows = self.__db.execute(
+            "SELECT updated_at FROM cache WHERE type=? AND key=? AND name=? AND expires_at>?",
+            (entry.cache_type, entry.key, entry.name, time.time()),
+        )
+        if not rows:
+            return None
+
+        return rows[0][0]
+
+    def read_text(self, entry):
+        rows = self.__db.execute(
+            "SELECT content FROM cache WHERE type=? AND key=? AND name=?",
+            (entry.cache_type, entry.key, entry.name),
+        )
+        if not rows:
+            raise OSError("cache entry not found: {}".format(entry))
+
+        return rows[0][0]
+
+    def write_text(self, entry, text, expires_at, mtime=None):
+        self.__db.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                entry.cache_type,
+                entry.key,
+                entry.name,
+                text,
+                time.time() if mtime is None else mtime,
+                expires_at,
+            ),
+        )
+
+    def remove(self, entry):
+        self.__db.execute(
+            "DELETE FROM cache WHERE type=? AND key=? AND name=?",
+            (entry.cache_type, entry.key, entry.name),
+        )
+
+    def get_local_filepath(self, entry):
+        return None
+
+    def purge_expired(self, grace_seconds=0):
+        """
+        Delete rows that expired before the grace period. Rows within the grace period are
+        kept for revalidation.
+        """
+
+        self.__db.execute(
+            "DELETE FROM cache WHERE type=? AND expires_at<=?",
+            (self.__cache_type, time.time() - grace_seconds),
+        )
+
+    def import_file_tree(self, base_dir, cache_lifetime):
+        """
+        Import cache files that created by the file storage, only once for each cache type.
+        """
+
+        with self.__db.lock:
+            if self.__db.execute("SELECT 1 FROM migration WHERE type=?", (self.__cache_type,)):
+                return 0
+
+            count = 0
+            if base_dir.isdir():
+                for cache_file_path in base_dir.walkfiles():
+                    try:
+                        with cache_file_path.open() as f:
+                            content = f.read()
+                        mtime = cache_file_path.mtime
+                    except (OSError, UnicodeDecodeError) as e:
+                        logger.debug(
+                            "skip migrating cache file '{}': {}".format(
+                                cache_file_path, msgfy.to_debug_message(e)
+                            )
+                        )
+                        continue
+
+                    self.__db.execute(
+                        "INSERT OR IGNORE INTO cache VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            self.__cache_type,
+                            base_dir.relpathto(cache_file_path.parent).replace("\\", "/"),
+                            cache_file_path.name,
+                            content,
+                            mtime,
+                            mtime + cache_lifetime.seconds,
+                        ),
+                    )
+                    count += 1
+
+            self.__db.execute("INSERT INTO migration VALUES (?)", (self.__cache_type,))
+
+        logger.debug(
+            "migrated {} cache files to the database: type={}".format(count, self.__cache_type)
+        )
+
+        return count
+
+
+class CacheManager:
+    @property
+    def memo_stats(self):
+        return self.__memo.stats
+
+    def __init__(
+        self,
+        user_name,
+        cache_type,
+        cache_lifetime,
+        backend=CacheBackend.FILE,
+        memo_size=Default.CACHE_MEMO_SIZE,
+        stale_lifetime=None,
+        jitter=0.0,
+        storage_lifetime=None,
+    ):
+        """
+        :param CacheTime cache_lifetime:
+            Lifetime of cache entries. Each entry expires earlier up to ``jitter`` ratio of
+            the lifetime, so that entries written at the same time do not expire at once.
+        :param CacheTime stale_lifetime:
+            Period after the expiry that an entry can be used while revalidating in
+            background.
+        :param CacheTime storage_lifetime:
+            Lifetime of the entries in the storage if ``cache_lifetime`` is shortened only
+            for this run (e.g. ``--no-cache``). Entries are written with this lifetime, and
+            the storage is neither migrated nor purged so that existing entries are kept.
+        """
+
+        user_dir = (
+            Path("~/.cache/{package}/{user}".format(package=PACKAGE_NAME, user=user_name))
             .expand()
             .normpath()
         )
+        file_cache_dir = user_dir.joinpath(cache_type)
         self.__cache_lifetime = cache_lifetime
+        self.__stale_lifetime = (
+            stale_lifetime if stale_lifetime is not None else CacheTime(seconds=0)
+        )
+        self.__storage_lifetime = (
+            storage_lifetime if storage_lifetime is not None else cache_lifetime
+        )
+        self.__jitter = jitter
+        self.__memo = _LruMemo(memo_size)
+        self.__revalidator = _Revalidator(Default.MAX_REVALIDATION_WORKERS)
+
+        if backend == CacheBackend.SQLITE:
+            user_dir.makedirs_p()
+            self.__storage = SqliteCacheStorage(user_dir.joinpath("cache.sqlite3"), cache_type)
+            if storage_lifetime is None:
+                self.__storage.import_file_tree(
+                    file_cache_dir,
+                    CacheTime(seconds=cache_lifetime.seconds + self.__stale_lifetime.seconds),
+                )
+                self.__storage.purge_expired(
+                    grace_seconds=cache_lifetime.seconds + self.__stale_lifetime.seconds
+                )
+        else:
+            self.__storage = FileCacheStorage(file_cache_dir)
 
-    def is_cache_available(self, cache_file_path):
-        if not cache_file_path.isfile():
-            logger.debug("cache not found: {}".format(cache_file_path))
+    def is_cache_available(self, cache_file_path, allow_stale=False):
+        """
+        :param bool allow_stale:
+            Regard stale entries as available. Callers should revalidate the entries with
+            :py:meth:`revalidate`.
+        """
+
+        state = self.get_cache_state(cache_file_path)
+
+        return state == CacheState.FRESH or (allow_stale and state == CacheState.STALE)
+
+    def get_cache_state(self, cache_file_path):
+        state = self.__memo.get(cache_file_path, "state")
+        if state is None:
+            state = self.__check_cache_state(cache_file_path)
+            self.__memo.update(cache_file_path, state=state)
+
+        return state
+
+    def revalidate(self, cache_file_path, func):
+        """
+        Call ``func`` in background to rewrite a cache entry if the entry is stale.
+
+        :return: ``True`` if a revalidation started.
+        """
+
+        if self.get_cache_state(cache_file_path) != CacheState.STALE:
             return False
 
+        logger.debug("revalidate a stale cache in background: {}".format(cache_file_path))
+
+        return self.__revalidator.submit(str(cache_file_path), func)
+
+    def wait_revalidation(self):
+        self.__revalidator.wait()
+
+    def get_expires_at(self, cache_file_path):
+        """
+        Return the expiry timestamp of a cache entry. ``None`` if the entry not found.
+        """
+
+        mtime = self.__storage.get_mtime(cache_file_path)
+        if mtime is None:
+            return None
+
+        return mtime + self.__get_lifetime_seconds(cache_file_path, mtime)
+
+    def __get_lifetime_seconds(self, cache_file_path, mtime):
+        lifetime_seconds = self.__cache_lifetime.seconds
+        if not self.__jitter:
+            return lifetime_seconds
+
+        # deterministic for each entry: the expiry does not change between calls
+        ratio = zlib.crc32("{}:{}".format(cache_file_path, mtime).encode("utf8")) / 0xFFFFFFFF
+
+        return lifetime_seconds * (1 - self.__jitter * ratio)
+
+    def __check_cache_state(self, cache_file_path):
+        mtime = self.__storage.get_mtime(cache_file_path)
+        if mtime is None:
+            logger.debug("cache not found: {}".format(cache_file_path))
+            return CacheState.ABSENT
+
         try:
-            dtr = DateTimeRange(datetime.fromtimestamp(cache_file_path.mtime), datetime.now())
+            dtr = DateTimeRange(datetime.fromtimestamp(mtime), datetime.now())
         except OSError:
-            return False
+            return CacheState.ABSENT
 
         if not dtr.is_valid_timerange():
-            return False
+            return CacheState.ABSENT
 
         cache_elapsed = CacheTime(dtr.get_timedelta_second())
+        cache_lifetime = CacheTime(self.__get_lifetime_seconds(cache_file_path, mtime))
         cache_msg = "path={path}, lifetime={lifetime:.1f}h, elapsed={elapsed:.1f}h".format(
-            path=cache_file_path, lifetime=self.__cache_lifetime.hour, elapsed=cache_elapsed.hour
+            path=cache_file_path, lifetime=cache_lifetime.hour, elapsed=cache_elapsed.hour
         )
 
-        if cache_elapsed < self.__cache_lifetime:
+        if cache_elapsed < cache_lifetime:
             logger.debug("cache available: {}".format(cache_msg))
-            return True
-
-        logger.debug("cache expired: {}".format(cache_msg))
+            return CacheState.FRESH
 
-        return False
+        if cache_elapsed.seconds < cache_lifetime.seconds + self.__stale_lifetime.seconds:
+            logger.debug("cache stale: {}".format(cache_msg))
+            return CacheState.STALE
 
-    def __get_pkg_cache_dir(self, package_name):
-        cache_dir = self.__base_dir.joinpath(sanitize_filename(package_name).lower())
-        cache_dir.makedirs_p()
+        logger.debug("cache expired: {}".format(cache_msg))
 
-        return cache_dir
+        return CacheState.ABSENT
 
     def get_pkg_cache_filepath(self, package_name, filename):
-        return self.__get_pkg_cache_dir(package_name).joinpath(sanitize_filename(filename))
+        return self.__storage.get_entry(
+            sanitize_filename(package_name).lower(), sanitize_filename(filename)
+        )
 
     def remove_pkg_cache(self, package_name, filename):
         filepath = self.get_pkg_cache_filepath(package_name, filename)
         logger.debug("remove cache: {}".format(filepath))
-        filepath.remove_p()
-
-    def __get_misc_cache_dir(self, classifier_name):
-        cache_dir = self.__base_dir.joinpath(sanitize_filepath(classifier_name))
-        cache_dir.makedirs_p()
-
-        return cache_dir
+        self.__storage.remove(filepath)
+        self.__memo.invalidate(filepath)
 
     def get_misc_cache_filepath(self, classifier_name, filename):
-        return self.__get_misc_cache_dir(classifier_name).joinpath(sanitize_filename(filename))
+        return self.__storage.get_entry(
+            sanitize_filepath(classifier_name), sanitize_filename(filename)
+        )
 
     def remove_misc_cache(self, classifier_name, filename):
         filepath = self.get_misc_cache_filepath(classifier_name, filename)
         logger.debug("remove cache: {}".format(filepath))
-        filepath.remove_p()
+        self.__storage.remove(filepath)
+        self.__memo.invalidate(filepath)
+
+    def get_local_filepath(self, cache_file_path):
+        """
+        Return the file path of a cache entry if the entry is stored as a file,
+        otherwise ``None``.
+        """
+
+        return self.__storage.get_local_filepath(cache_file_path)
+
+    def read_text(self, cache_file_path):
+        text = self.__memo.get(cache_file_path, "text")
+        if text is None:
+            text = self.__storage.read_text(cache_file_path)
+            self.__memo.update(cache_file_path, text=text)
+
+        return text
+
+    def write_text(self, cache_file_path, text, keep_mtime=False):
+        """
+        :param bool keep_mtime:
+            Keep the modification time of the existing entry: rewriting the content,
+            e.g. to upgrade the format, does not extend the lifetime of the entry.
+        """
+
+        mtime = self.__storage.get_mtime(cache_file_path) if keep_mtime else None
+        written_at = time.time() if mtime is None else mtime
+
+        self.__storage.write_text(
+            cache_file_path,
+            text,
+            written_at + self.__storage_lifetime.seconds + self.__stale_lifetime.seconds,
+            mtime=mtime,
+        )
+
+        if mtime is None:
+            self.__memo.set(cache_file_path, state=self.__get_written_state(), text=text)
+        else:
+            # the state is checked again with the kept modification time
+            self.__memo.set(cache_file_path, text=text)
+
+    def __get_written_state(self):
+        if self.__cache_lifetime.seconds > 0:
+            return CacheState.FRESH
+        if self.__stale_lifetime.seconds > 0:
+            return CacheState.STALE
+
+        return CacheState.ABSENT
+
+    def touch(self, cache_file_path):
+        self.write_text(cache_file_path, "")
 
     def load_json(self, cache_file_path):
-        with cache_file_path.open() as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError as e:
-                logger.error(
-                    "failed to load cache file '{}': {}".format(
-                        cache_file_path, msgfy.to_error_message(e)
-                    )
+        data = self.__memo.get(cache_file_path, "json")
+        if data is not None:
+            return data
+
+        try:
+            data = json.loads(self.read_text(cache_file_path))
+            self.__memo.update(cache_file_path, json=data)
+
+            return data
+        except json.JSONDecodeError as e:
+            logger.error(
+                "failed to load cache file '{}': {}".format(
+                    cache_file_path, msgfy.to_error_message(e)
                 )
+            )
 
         return None
+
+    def dump_json(self, cache_file_path, data, indent=None, keep_mtime=False):
+        self.write_text(cache_file_path, json.dumps(data, indent=indent), keep_mtime=keep_mtime)
@@ -0,0 +1,83 @@
+import re
+from collections import OrderedDict, namedtuple
+
+from ._const import GITHUB_REPO_URL_REGEXP
+
+
+RepoCandidate = namedtuple("RepoCandidate", "repo_id owner_name repo_name rank")
+
+
+class CandidateRank:
+    """
+    Rank of repository candidates: the lower is the more likely.
+    """
+
+    METADATA_NAME_MATCH = 0
+    METADATA = 1
+    DESCRIPTION_NAME_MATCH = 2
+
+
+_PIP_SHOW_URL_REGEXP = re.compile(r"^(?:Home-page|Project-URL):(?P<value>.*)$", re.MULTILINE)
+_GIT_SUFFIX_REGEXP = re.compile(r"(\.git)?\.*$", re.IGNORECASE)
+
+
+def _iter_github_repo_names(text):
+    for match in GITHUB_REPO_URL_REGEXP.finditer(text):
+        repo_name = _GIT_SUFFIX_REGEXP.sub("", match.group("repo_name"), count=1)
+        if repo_name:
+            yield match.group("user_name"), repo_name
+
+
+def extract_repo_candidates(pypi_pkg_name, pip_show_content="", pypi_info=None):
+    """
+    Extract GitHub repository candidates of a package from the ``Home-page``/``Project-URL``
+    fields of ``pip show``, and ``home_page``/``project_urls``/description of PyPI information.
+
+    Each source is scanned once. Candidates are deduplicated by case-insensitive repository id
+    and sorted by |CandidateRank|: repositories found in the description are candidates
+    only if the name of the repository matches the package name.
+
+    :return: List of |RepoCandidate|.
+    """
+
+    metadata_texts = [
+        match.group("value") for match in _PIP_SHOW_URL_REGEXP.finditer(pip_show_content or "")
+    ]
+    description_texts = []
+
+    if pypi_info:
+        metadata_texts.append(pypi_info.get("home_page") or "")
+        metadata_texts.extend((pypi_info.get("project_urls") or {}).values())
+        description_texts.extend(pypi_info.get("github_repo_urls") or [])
+
+    pkg_name = pypi_pkg_name.lower()
+    candidate_map = OrderedDict()
+
+    for text, is_metadata in (
+        ("\n".join(metadata_texts), True),
+        ("\n".join(description_texts), False),
+    ):
+        for owner_name, repo_name in _iter_github_repo_names(text):
+            is_name_match = repo_name.lower() == pkg_name
+
+            if is_metadata:
+                rank = (
+                    CandidateRank.METADATA_NAME_MATCH if is_name_match else CandidateRank.METADATA
+                )
+            elif is_name_match:
+                rank = CandidateRank.DESCRIPTION_NAME_MATCH
+            else:
+                continue
+
+            repo_id = "{}/{}".format(owner_name, repo_name)
+            key = repo_id.casefold()
+
+            if key in candidate_map and candidate_map[key].rank <= rank:
+                continue
+
+            candidate_map[key] = RepoCandidate(
+                repo_id=repo_id, owner_name=owner_name, repo_name=repo_name, rank=rank
+            )
+
+    # sorted is stable: candidates with the same rank keep the order of appearance
+    return sorted(candidate_map.values(), key=lambda candidate: candidate.rank)
@@ -1,3 +1,6 @@
+import json
+import os.path
+
 from appconfigpy import ConfigItem, ConfigManager, DefaultDisplayStyle
 
 from ._const import Default
@@ -15,3 +18,27 @@ app_config_mgr = ConfigManager(
         )
     ],
 )
+
+
+def load_cache_configs(config_filepath=None):
+    """
+    Load the ``cache`` entry of the config file. The file is read directly since
+    ``ConfigManager.load`` drops entries other than the config items.
+
+    :raises ValueError: If the config file is not a valid JSON.
+    """
+
+    if not config_filepath:
+        config_filepath = app_config_mgr.config_filepath
+
+    config_filepath = os.path.expanduser(config_filepath)
+    if not os.path.isfile(config_filepath):
+        return {}
+
+    with open(config_filepath) as f:
+        configs = json.load(f)
+
+    if not isinstance(configs, dict):
+        raise ValueError("invalid config file: {}".format(config_filepath))
+
+    return configs.get("cache") or {}
@@ -1,5 +1,13 @@
+import re
+
+
 PACKAGE_NAME = "thank-you-stars"
 
+GITHUB_REPO_URL_REGEXP = re.compile(
+    "http[s]?://github.com/(?P<user_name>[a-zA-Z0-9][a-zA-Z0-9-]*?)/(?P<repo_name>[a-zA-Z0-9-_.]+)",
+    re.MULTILINE,
+)
+
 
 class StarStatus:
     STARRED = "starred"
@@ -11,3 +19,18 @@ class StarStatus:
 class Default:
     CONFIG_FILENAME = ".{:s}.json".format(PACKAGE_NAME)
     CONFIG_FILEPATH = "~/.{:s}.json".format(PACKAGE_NAME)
+    CACHE_MEMO_SIZE = 1024
+    CONTRIBUTOR_MAX_FULL_NAMES = 20
+    CONTRIBUTOR_MAX_PAGES = 5
+    GITHUB_API_URL = "https://api.github.com"
+    MAX_CONCURRENCY_PER_HOST = 8
+    MAX_REVALIDATION_WORKERS = 2
+    MAX_WORKERS = 8
+    MMAP_THRESHOLD_BYTES = 1024 ** 2
+    PREFETCH_CHUNK_SIZE = 50
+    PREFETCH_EXPIRE_WITHIN_DAYS = 2
+    PYPI_URL = "https://pypi.org/pypi"
+    REPO_MAPPING_DB_FILENAME = "repo_mapping.sqlite3"
+    REPO_MAPPING_LIFETIME_DAYS = 90
+    RATE_LIMIT_MAX_WAIT_SECONDS = 15 * 60
+    STARRED_FULL_SYNC_DAYS = 7
@@ -0,0 +1,179 @@
+from collections import namedtuple
+
+from ._common import get_github_repo_id
+from ._logger import logger
+from ._matcher import MatchResult, normalize_person_name
+from ._ratelimit import RateLimitBucket
+from ._verifier import ApiRequestType
+
+
+Contributor = namedtuple("Contributor", "login_name full_name")
+
+_SCHEMA_VERSION = 2
+_PER_PAGE = 100
+
+
+class ContributorIndex:
+    """
+    Contributors of a repository indexed by normalized login/full names.
+    """
+
+    @property
+    def contributors(self):
+        return self.__contributors
+
+    @property
+    def resolved_count(self):
+        """
+        Number of contributors from the top whose full names are already fetched.
+        """
+
+        return self.__resolved_count
+
+    @property
+    def is_complete(self):
+        """
+        ``False`` if fetching contributors stopped at the page limit.
+        """
+
+        return self.__is_complete
+
+    def __init__(self, contributors, is_complete=True, resolved_count=0):
+        self.__contributors = list(contributors)
+        self.__is_complete = is_complete
+        self.__resolved_count = resolved_count
+        self.__name_map = {}
+
+        for contributor in self.__contributors:
+            for name in (contributor.login_name, contributor.full_name):
+                if name:
+                    self.__name_map.setdefault(normalize_person_name(name), name)
+
+    def __len__(self):
+        return len(self.__contributors)
+
+    def find(self, author_names, matcher):
+        """
+        Return |MatchResult| of a contributor that matches one of ``author_names``:
+        exact matches of normalized names are looked up before fuzzy matching with ``matcher``.
+        """
+
+        author_names = [author_name for author_name in author_names if author_name]
+
+        for author_name in author_names:
+            name = self.__name_map.get(normalize_person_name(author_name))
+            if name is not None:
+                return MatchResult(name=name, ratio=1.0)
+
+        for author_name in author_names:
+            result = matcher.best_match(author_name, self.__name_map.values())
+            if result is not None:
+                return result
+
+        return None
+
+    def dumps(self):
+        return {
+            "schema_version": _SCHEMA_VERSION,
+            "complete": self.__is_complete,
+            "resolved": self.__resolved_count,
+            "contributors": [contributor._asdict() for contributor in self.__contributors],
+        }
+
+    @classmethod
+    def loads(cls, data):
+        """
+        :return: ``None`` if ``data`` is not a record of the current schema.
+        """
+
+        if not isinstance(data, dict) or data.get("schema_version") != _SCHEMA_VERSION:
+            return None
+
+        return cls(
+            [Contributor(**contributor) for contributor in data["contributors"]],
+            is_complete=data["complete"],
+            resolved_count=data["resolved"],
+        )
+
+
+def _request(github_client, counter, request_type, func, *args):
+    """
+    Send a request with ``func`` under the rate limit of the core bucket.
+    """
+
+    if counter is not None:
+        counter.add_api_request(request_type)
+
+    if github_client is None:
+        return func(*args)
+
+    return github_client.call(RateLimitBucket.CORE, func, *args)
+
+
+def fetch_contributor_index(repo, max_pages, github_client=None, counter=None):
+    """
+    Fetch contributors of a repository up to ``max_pages`` pages.
+    Contributors are ordered by the number of contributions,
+    so that major authors are in the first pages even for large projects.
+    The index only consists of the login names in the list responses:
+    full names require a request per user (:py:func:`fetch_contributor_full_names`).
+    Each page is a request that counted by ``counter`` and scheduled by ``github_client``.
+    """
+
+    contributors = []
+    paginated_contributors = repo.get_contributors()
+    is_complete = False
+
+    for page in range(max_pages):
+        page_contributors = _request(
+            github_client,
+            counter,
+            ApiRequestType.CONTRIBUTORS,
+            paginated_contributors.get_page,
+            page,
+        )
+        contributors.extend(
+            # reading other attributes, such as name, sends a request per user
+            Contributor(login_name=contributor.login, full_name=None)
+            for contributor in page_contributors
+        )
+
+        if len(page_contributors) < _PER_PAGE:
+            is_complete = True
+            break
+
+    logger.debug(
+        "fetched contributors: repo={}, count={}, complete={}".format(
+            get_github_repo_id(repo), len(contributors), is_complete
+        )
+    )
+
+    return ContributorIndex(contributors, is_complete=is_complete)
+
+
+def fetch_contributor_full_names(index, github_client, max_users, counter=None):
+    """
+    Fetch the full names of the top ``max_users`` contributors that not fetched yet.
+
+    :return: New |ContributorIndex| with the full names.
+    """
+
+    contributors = list(index.contributors)
+    resolved_count = max(index.resolved_count, min(max_users, len(contributors)))
+
+    for i in range(index.resolved_count, resolved_count):
+        login_name = contributors[i].login_name
+
+        user = _request(
+            github_client, counter, ApiRequestType.USERS, github_client.get_user, login_name
+        )
+
+        contributors[i] = Contributor(login_name=login_name, full_name=user.name)
+
+    logger.debug(
+        "fetched full names of contributors: count={}".format(resolved_count - index.resolved_count)
+    )
+
+    return ContributorIndex(
+        contributors, is_complete=index.is_complete, resolved_count=resolved_count
+    )
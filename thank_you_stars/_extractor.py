@@ -1,31 +1,31 @@
-import json
-import re
-import sys
-from collections import namedtuple
-from difflib import SequenceMatcher
+import threading
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
 
 import msgfy
-import retryrequests
 from github.GithubException import RateLimitExceededException, UnknownObjectException
 from mbstrdecoder import MultiByteStrDecoder
 from pathvalidate import sanitize_filename
 from tqdm import tqdm
 
-from ._cache import CacheType, touch
+from ._cache import CacheType
+from ._candidate import extract_repo_candidates
 from ._common import get_github_repo_id
-from ._const import StarStatus
+from ._const import Default, StarStatus
+from ._contributor import ContributorIndex, fetch_contributor_full_names, fetch_contributor_index
+from ._graphql import GraphQLError, RepoResolution
 from ._logger import logger
+from ._mapping import get_candidate_source, get_search_source, make_repo_mapping
+from ._matcher import NameMatcher, normalize_person_name
+from ._negative import NegativeIndex, NegativeKind, NegativeReason
 from ._pip_show import PipShow
+from ._pypi import PyPIClient
+from ._ratelimit import RateLimitBucket, RateLimitExhausted
+from ._verifier import ApiRequestType, VerificationCounter, VerificationStage, make_literal_regexp
 
 
-Contributor = namedtuple("Contributor", "login_name full_name")
-
-
-class _GitHubRepoInfo(
-    namedtuple("_GitHubRepoInfo", "owner_name repo_name repo_id url match_endpos")
-):
-    def equals_repo_name(self, name):
-        return self.repo_name.lower() == name.lower()
+_GitHubRepoInfo = namedtuple("_GitHubRepoInfo", "owner_name repo_name repo_id url")
 
 
 class GitHubStarredInfo(
@@ -51,66 +51,169 @@ class GithubStarredInfoExtractor:
     def repo_depth_map(self):
         return self.__repo_depth_map
 
-    def __init__(self, github_client, max_depth, cache_mgr_map, starred_repo_id_list):
+    @property
+    def max_depth(self):
+        return self.__max_depth
+
+    @property
+    def pypi_client(self):
+        return self.__pypi_client
+
+    @property
+    def starred_repo_index(self):
+        return self.__starred_repo_index
+
+    @property
+    def negative_stats(self):
+        return self.__negative_index.stats
+
+    @property
+    def verification_stats(self):
+        return self.__verification_counter.stats
+
+    def __init__(
+        self,
+        github_client,
+        max_depth,
+        cache_mgr_map,
+        starred_repo_index,
+        max_workers=Default.MAX_WORKERS,
+        repo_resolver=None,
+        pypi_client=None,
+        metadata_verifier=None,
+        verification_counter=None,
+        repo_mapping_db=None,
+        negative_index=None,
+        prefetch_chunk_size=Default.PREFETCH_CHUNK_SIZE,
+    ):
         self.__github_client = github_client
-        self.__github_user = github_client.get_user()
+        self.__github_user_login = github_client.get_user().login
         self.__max_depth = max_depth
-        self.__starred_repo_id_list = starred_repo_id_list
+        self.__max_workers = max_workers
+        self.__prefetch_chunk_size = prefetch_chunk_size
+        self.__starred_repo_index = starred_repo_index
+        self.__repo_resolver = repo_resolver
+        self.__metadata_verifier = metadata_verifier
+        self.__repo_mapping_db = repo_mapping_db
+        self.__negative_index = negative_index if negative_index is not None else NegativeIndex()
+        self.__verification_counter = (
+            verification_counter if verification_counter is not None else VerificationCounter()
+        )
         self.__repo_depth_map = {}
+        self.__rate_limit_exceeded = threading.Event()
 
         self.__github_cache_mgr = cache_mgr_map[CacheType.GITHUB]
         self.__pypi_cache_mgr = cache_mgr_map[CacheType.PYPI]
+        self.__pypi_client = (
+            pypi_client if pypi_client is not None else PyPIClient(self.__pypi_cache_mgr)
+        )
 
         PipShow.cache_mgr = cache_mgr_map[CacheType.PIP]
 
+        self.__pkg_name_matcher = NameMatcher(self._MATCH_THRESHOLD)
+        self.__contributor_index_map = {}
+        self.__contributor_index_lock = threading.Lock()
+        self.__person_name_matcher = NameMatcher(
+            self._MATCH_THRESHOLD, normalizer=normalize_person_name
+        )
+
         if self.__max_depth < 0:
             raise ValueError("max_depth must be greater or equal to zero")
-
-        self.__github_repo_url_regexp = re.compile(
-            "http[s]?://github.com/(?P<user_name>[a-zA-Z0-9][a-zA-Z0-9-]*?)/(?P<repo_name>[a-zA-Z0-9-_.]+)",
-            re.MULTILINE,
-        )
+        if self.__max_workers < 1:
+            raise ValueError("max_workers must be greater than zero")
+        if self.__prefetch_chunk_size < 1:
+            raise ValueError("prefetch_chunk_size must be greater than zero")
 
     def list_pypi_packages(self, pypi_pkg_name_queue):
-        prev_depth = None
-        total = self.__max_depth + 1
-        i = 0
-
-        with tqdm(desc="Collect package info", total=total) as pbar:
-            while pypi_pkg_name_queue:
-                pypi_pkg_name, depth = pypi_pkg_name_queue.pop(0)
-
-                if prev_depth is None:
-                    prev_depth = depth
-                elif prev_depth != depth:
-                    i += 1
-                    pbar.update(1)
-                    prev_depth = depth
+        queue = deque(pypi_pkg_name_queue)
+
+        with tqdm(desc="Collect package info", total=len(queue)) as pbar, ThreadPoolExecutor(
+            max_workers=self.__max_workers
+        ) as executor:
+            while queue:
+                # resolve packages level-by-level: packages at the same depth are resolved
+                # concurrently, and the depth of a package is the depth of the first level
+                # that the package found.
+                # packages of lock files may be queued deeper than the next level
+                queue = deque(sorted(queue, key=itemgetter(1)))
+                depth = queue[0][1]
+                frontier = []
+
+                while queue and queue[0][1] == depth:
+                    pypi_pkg_name, _depth = queue.popleft()
+
+                    if pypi_pkg_name in self.__repo_depth_map:
+                        logger.debug("skip: already checked: {}".format(pypi_pkg_name))
+                        self.__repo_depth_map[pypi_pkg_name] = min(
+                            depth, self.__repo_depth_map[pypi_pkg_name]
+                        )
+                        pbar.update(1)
+                        continue
 
-                if pypi_pkg_name in self.__repo_depth_map:
-                    logger.debug("skip: already checked: {}".format(pypi_pkg_name))
-                    self.__repo_depth_map[pypi_pkg_name] = min(
-                        depth, self.__repo_depth_map[pypi_pkg_name]
-                    )
-                    continue
+                    self.__repo_depth_map[pypi_pkg_name] = depth
+                    frontier.append(pypi_pkg_name)
 
-                self.__repo_depth_map[pypi_pkg_name] = depth
-                pip_show = PipShow.execute(pypi_pkg_name)
+                next_frontier = set()
+                for pypi_pkg_name, pip_show in zip(
+                    frontier, executor.map(PipShow.execute, frontier)
+                ):
+                    pbar.update(1)
+
+                    if depth >= self.__max_depth:
+                        continue
 
-                if depth < self.__max_depth:
                     for require_package in pip_show.extract_requires():
+                        require_package = require_package.lower()
+
+                        if (
+                            require_package in self.__repo_depth_map
+                            or require_package in next_frontier
+                        ):
+                            continue
+
                         # recursively search repositories
-                        pypi_pkg_name_queue.append((require_package.lower(), depth + 1))
+                        next_frontier.add(require_package)
+                        queue.append((require_package, depth + 1))
+                        pbar.total += 1
+                        pbar.refresh()
+
+    def add_pypi_packages(self, repo_depth_map):
+        """
+        Add packages whose depths are already known without traversing their dependencies.
+        """
+
+        for pypi_pkg_name, depth in repo_depth_map.items():
+            prev_depth = self.__repo_depth_map.get(pypi_pkg_name)
+            self.__repo_depth_map[pypi_pkg_name] = (
+                depth if prev_depth is None else min(depth, prev_depth)
+            )
 
-            while i < total:
-                i += 1
-                pbar.update(1)
+    def extract_starred_info(self, pypi_pkg_name, use_cache=True):
+        """
+        :param bool use_cache:
+            Use the starred information cache of the package if ``True``.
+            Caches of the intermediate results are used regardless of this value.
+        """
+
+        # negative results are looked up in memory before any I/O
+        negative_reason = self.__negative_index.get(NegativeKind.PACKAGE, pypi_pkg_name)
+        if negative_reason == NegativeReason.RATE_LIMITED:
+            return self.__make_rate_limit_exceeded_info(pypi_pkg_name)
+        if negative_reason is not None:
+            logger.debug(
+                "negative result for a PyPI package found: {}, reason={}".format(
+                    pypi_pkg_name, negative_reason
+                )
+            )
+            return self.__make_not_found_info(pypi_pkg_name)
 
-    def extract_starred_info(self, pypi_pkg_name):
         cache_filepath = self.__pypi_cache_mgr.get_pkg_cache_filepath(pypi_pkg_name, "starred_info")
 
-        if self.__github_cache_mgr.is_cache_available(cache_filepath):
-            cache_data = self.__github_cache_mgr.load_json(cache_filepath)
+        if use_cache and self.__pypi_cache_mgr.is_cache_available(cache_filepath, allow_stale=True):
+            self.__pypi_cache_mgr.revalidate(
+                cache_filepath, lambda: self.extract_starred_info(pypi_pkg_name, use_cache=False)
+            )
+            cache_data = self.__pypi_cache_mgr.load_json(cache_filepath)
             if cache_data:
                 try:
                     info = GitHubStarredInfo(**cache_data)
@@ -119,34 +222,172 @@ class GithubStarredInfoExtractor:
                 except (TypeError, ValueError) as e:
                     logger.debug("failed to load cache: {}".format(msgfy.to_debug_message(e)))
 
-        pip_show = PipShow.execute(pypi_pkg_name)
-        github_repo_info = self.__find_github_repo_info_from_text(pip_show.content)
+        repo_mapping = self.__get_repo_mapping(pypi_pkg_name)
+        if repo_mapping is not None:
+            logger.debug("found a repository mapping: {}".format(repo_mapping))
+            owner_name, repo_name = repo_mapping.repo_id.split("/", 1)
+
+            return self.__register_starred_status(
+                pypi_pkg_name,
+                _GitHubRepoInfo(
+                    owner_name=owner_name,
+                    repo_name=repo_name,
+                    repo_id=repo_mapping.repo_id,
+                    url="https://github.com/{}".format(repo_mapping.repo_id),
+                ),
+                depth=0,
+            )
 
-        if github_repo_info:
-            return self.__register_starred_status(pypi_pkg_name, github_repo_info, depth=0)
+        if self.__rate_limit_exceeded.is_set():
+            # do not spend API calls any more for the rest of packages
+            return self.__make_rate_limit_exceeded_info(pypi_pkg_name)
+
+        pip_show = PipShow.execute(pypi_pkg_name)
 
         try:
-            starred_info = self.__traverse_github_repo(pip_show, pypi_pkg_name, depth=0)
+            pypi_info = self.__pypi_client.fetch_info(pypi_pkg_name)
+
+            github_repo_info, source = self.__verify_repo_candidates(
+                extract_repo_candidates(pypi_pkg_name, pip_show.content, pypi_info)
+            )
+            if github_repo_info:
+                return self.__register_starred_status(
+                    pypi_pkg_name, github_repo_info, depth=0, source=source
+                )
+
+            starred_info = self.__traverse_github_repo(pip_show, pypi_info, pypi_pkg_name, depth=0)
             if starred_info:
                 return starred_info
 
-            return GitHubStarredInfo(
-                pypi_pkg_name=pypi_pkg_name,
-                github_repo_id="[Repository not found]",
-                star_status=StarStatus.NOT_FOUND,
-                is_owned=None,
-                url=None,
-            )
+            return self.__make_not_found_info(pypi_pkg_name)
         except RateLimitExceededException as e:
             logger.error(msgfy.to_error_message(e))
+            self.__rate_limit_exceeded.set()
+            self.__negative_index.add(
+                NegativeKind.PACKAGE,
+                pypi_pkg_name,
+                NegativeReason.RATE_LIMITED,
+                expires_at=getattr(e, "reset_at", None),
+            )
+
+            return self.__make_rate_limit_exceeded_info(pypi_pkg_name)
+
+    def prefetch_repo_resolutions(self, pypi_pkg_names):
+        """
+        Resolve GitHub repository candidates of packages in batches,
+        before extracting starred information of each package.
+        """
+
+        if self.__repo_resolver is None:
+            return
+
+        pypi_pkg_names = [
+            pypi_pkg_name
+            for pypi_pkg_name in pypi_pkg_names
+            if not self.is_starred_info_cached(pypi_pkg_name)
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            candidates_list = list(executor.map(self.__extract_repo_candidates, pypi_pkg_names))
+
+        self.__resolve_repos(
+            [
+                candidate.repo_id
+                for candidates in candidates_list
+                for candidate in candidates
+                if not self.__is_negative_repo(candidate.repo_id)
+            ]
+        )
 
-            return GitHubStarredInfo(
-                pypi_pkg_name=pypi_pkg_name,
-                github_repo_id="Exceed API rate limit",
-                star_status=StarStatus.NOT_AVAILABLE,
-                is_owned=None,
-                url=None,
+    def collect_starred_info(self):
+        return set(self.iter_starred_info())
+
+    def iter_starred_info(self):
+        """
+        Yield |GitHubStarredInfo| of the listed packages in the order of completion.
+        Packages that have caches are extracted first: they do not consume the API rate limit.
+        Repository candidates of the other packages are resolved in chunks in the background,
+        and each chunk is extracted as soon as resolved.
+        """
+
+        cached_pkg_names = []
+        uncached_pkg_names = []
+        for pypi_pkg_name in sorted(self.__repo_depth_map):
+            if self.is_starred_info_cached(pypi_pkg_name):
+                cached_pkg_names.append(pypi_pkg_name)
+            else:
+                uncached_pkg_names.append(pypi_pkg_name)
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor, ThreadPoolExecutor(
+            max_workers=1
+        ) as prefetch_executor:
+            futures = [
+                executor.submit(self.extract_starred_info, pypi_pkg_name)
+                for pypi_pkg_name in cached_pkg_names
+            ]
+
+            for i in range(0, len(uncached_pkg_names), self.__prefetch_chunk_size):
+                chunk = uncached_pkg_names[i : i + self.__prefetch_chunk_size]
+                prefetch_future = prefetch_executor.submit(self.prefetch_repo_resolutions, chunk)
+                futures.extend(
+                    executor.submit(
+                        self.__extract_prefetched_starred_info, prefetch_future, pypi_pkg_name
+                    )
+                    for pypi_pkg_name in chunk
+                )
+
+            for future in tqdm(
+                as_completed(futures), desc="Collect GitHub info", total=len(futures)
+            ):
+                yield future.result()
+
+    def __extract_prefetched_starred_info(self, prefetch_future, pypi_pkg_name):
+        # chunks are submitted in order: workers wait only for the resolution of the chunk
+        # that they are extracting
+        prefetch_future.result()
+
+        return self.extract_starred_info(pypi_pkg_name)
+
+    def is_starred_info_cached(self, pypi_pkg_name):
+        """
+        Return ``True`` if the starred information of a package can be extracted from caches,
+        the repository mapping or the negative index.
+        """
+
+        return (
+            (NegativeKind.PACKAGE, pypi_pkg_name) in self.__negative_index
+            or self.__pypi_cache_mgr.is_cache_available(
+                self.__pypi_cache_mgr.get_pkg_cache_filepath(pypi_pkg_name, "starred_info"),
+                allow_stale=True,
             )
+            or self.__get_repo_mapping(pypi_pkg_name) is not None
+        )
+
+    def __get_repo_mapping(self, pypi_pkg_name):
+        if self.__repo_mapping_db is None:
+            return None
+
+        return self.__repo_mapping_db.get(pypi_pkg_name)
+
+    @staticmethod
+    def __make_not_found_info(pypi_pkg_name):
+        return GitHubStarredInfo(
+            pypi_pkg_name=pypi_pkg_name,
+            github_repo_id="[Repository not found]",
+            star_status=StarStatus.NOT_FOUND,
+            is_owned=None,
+            url=None,
+        )
+
+    @staticmethod
+    def __make_rate_limit_exceeded_info(pypi_pkg_name):
+        return GitHubStarredInfo(
+            pypi_pkg_name=pypi_pkg_name,
+            github_repo_id="Exceed API rate limit",
+            star_status=StarStatus.NOT_AVAILABLE,
+            is_owned=None,
+            url=None,
+        )
 
     def __extract_github_repo_info(self, repo):
         owner_name = repo.owner.login
@@ -158,109 +399,120 @@ class GithubStarredInfoExtractor:
             repo_name=repo_name,
             repo_id=repo_id,
             url="https://github.com/{}".format(repo_id),
-            match_endpos=None,
         )
 
-    @staticmethod
-    def __normalize_pkg_name(name):
-        return re.sub(sys.executable, "", name, flags=re.IGNORECASE).lower()
-
-    def __fetch_pypi_info(self, pypi_pkg_name):
-        cache_filepath = self.__pypi_cache_mgr.get_pkg_cache_filepath(pypi_pkg_name, "pypi_desc")
-
-        if self.__pypi_cache_mgr.is_cache_available(cache_filepath):
-            logger.debug("load PyPI info cache: {}".format(cache_filepath))
-
-            cache_data = self.__pypi_cache_mgr.load_json(cache_filepath)
-            if cache_data:
-                return cache_data
-
-        r = retryrequests.get("https://pypi.org/pypi/{}/json".format(pypi_pkg_name))
-        if r.status_code != 200:
-            return None
-
-        pypi_info = r.json().get("info")
+    def __extract_repo_candidates(self, pypi_pkg_name):
+        return extract_repo_candidates(
+            pypi_pkg_name,
+            PipShow.execute(pypi_pkg_name).content,
+            self.__pypi_client.fetch_info(pypi_pkg_name),
+        )
 
-        with cache_filepath.open(mode="w") as f:
-            logger.debug("write PyPI info cache: {}".format(cache_filepath))
-            f.write(json.dumps(pypi_info))
+    def __is_negative_repo(self, repo_id):
+        return self.__negative_index.get(NegativeKind.REPO, repo_id) is not None
 
-        return pypi_info
+    def __verify_repo_candidates(self, candidates):
+        candidates = [
+            candidate for candidate in candidates if not self.__is_negative_repo(candidate.repo_id)
+        ]
+        self.__resolve_repos([candidate.repo_id for candidate in candidates])
 
-    def __find_github_repo_info_from_text(self, text, pos=0):
-        match = self.__github_repo_url_regexp.search(text, pos)
+        for candidate in candidates:
+            github_repo_info = self.__find_github_repo_info(
+                candidate.owner_name, candidate.repo_name
+            )
+            if github_repo_info:
+                return (github_repo_info, get_candidate_source(candidate.rank))
 
-        if not match:
-            return None
+        return (None, None)
 
-        owner_name = match.group("user_name")
-        repo_name = match.group("repo_name")
+    def __find_github_repo_info(self, owner_name, repo_name):
         repo_id = "{}/{}".format(owner_name, repo_name)
-        negative_cache_filepath = self.__github_cache_mgr.get_misc_cache_filepath(
-            repo_id, "negative"
-        )
+        resolution = self.__resolve_repo(repo_id)
 
-        if self.__github_cache_mgr.is_cache_available(negative_cache_filepath):
-            return None
-
-        try:
-            repo_obj = self.__github_client.get_repo(repo_id)  # noqa: W0612
-        except UnknownObjectException as e:
-            if e.status == 404:
-                logger.debug(
-                    "create negative cache for a GitHub repo: {}".format(negative_cache_filepath)
+        if resolution is None:
+            try:
+                repo_obj = self.__github_client.call(  # noqa: W0612
+                    RateLimitBucket.CORE, self.__github_client.get_repo, repo_id
                 )
-                touch(negative_cache_filepath)
+            except UnknownObjectException as e:
+                if e.status != 404:
+                    raise
+
+                resolution = RepoResolution(
+                    repo_id=repo_id,
+                    exists=False,
+                    name_with_owner=None,
+                    owner_login=None,
+                    viewer_has_starred=None,
+                )
+
+        if resolution is not None:
+            if not resolution.exists:
+                self.__negative_index.add(NegativeKind.REPO, repo_id, NegativeReason.NOT_FOUND)
 
                 return None
 
-            raise
+            # use the canonical name of the repository
+            repo_id = resolution.name_with_owner
+            owner_name = resolution.owner_login
+            repo_name = repo_id.split("/", 1)[1]
 
         return _GitHubRepoInfo(
             owner_name=owner_name,
             repo_name=repo_name,
             repo_id=repo_id,
             url="https://github.com/{}".format(repo_id),
-            match_endpos=match.endpos,
         )
 
-    def __traverse_github_repo(self, pip_show, pypi_pkg_name, depth):
-        pypi_info = self.__fetch_pypi_info(pypi_pkg_name)
-        negative_cache_filepath = self.__pypi_cache_mgr.get_pkg_cache_filepath(
-            pypi_pkg_name, "negative"
-        )
+    def __resolve_repo(self, repo_id):
+        return self.__resolve_repos([repo_id]).get(repo_id)
 
-        if self.__github_cache_mgr.is_cache_available(negative_cache_filepath):
-            logger.debug(
-                " negative cache for a PyPI package found: {}".format(negative_cache_filepath)
-            )
-            return None
+    def __resolve_repos(self, repo_ids):
+        repo_resolver = self.__repo_resolver
+        if repo_resolver is None or not repo_ids:
+            return {}
 
-        if pypi_info:
-            pos = 0
+        try:
+            return repo_resolver.resolve(repo_ids)
+        except (GraphQLError, RateLimitExhausted) as e:
+            self.__disable_repo_resolver(e)
 
-            while True:
-                github_repo_info = self.__find_github_repo_info_from_text(
-                    pypi_info.get("description"), pos
-                )
+        return {}
 
-                if not github_repo_info:
-                    break
+    def __disable_repo_resolver(self, e):
+        logger.debug(
+            "fall back to the REST API to find repositories: {}".format(msgfy.to_debug_message(e))
+        )
+        self.__repo_resolver = None
+
+    def __is_starred(self, repo_id):
+        if repo_id in self.__starred_repo_index:
+            return True
+
+        repo_resolver = self.__repo_resolver
+        if repo_resolver is None:
+            return False
 
-                pos = github_repo_info.match_endpos
+        resolution = repo_resolver.get(repo_id)
 
-                if github_repo_info.equals_repo_name(pypi_pkg_name):
-                    return self.__register_starred_status(pypi_pkg_name, github_repo_info, depth)
+        return bool(resolution and resolution.viewer_has_starred)
 
+    def __traverse_github_repo(self, pip_show, pypi_info, pypi_pkg_name, depth):
+        if pypi_info:
             logger.debug("search at github: {}".format(pypi_pkg_name))
-            results = self.__github_client.search_repositories(
-                query="{} language:python".format(pypi_pkg_name), sort="stars", order="desc"
+            self.__verification_counter.add_api_request(ApiRequestType.REPO_SEARCH)
+            results = self.__github_client.call(
+                RateLimitBucket.SEARCH,
+                lambda: self.__github_client.search_repositories(
+                    query="{} language:python".format(pypi_pkg_name), sort="stars", order="desc"
+                ).get_page(0),
             )
             author_name = pip_show.extract_author()
             author_email = pypi_info.get("author_email")
 
-            for i, repo in enumerate(results.get_page(0)):
-                if self.__calc_match_ratio(pypi_pkg_name, repo.name) < self._MATCH_THRESHOLD:
+            for i, repo in enumerate(results):
+                if not self.__pkg_name_matcher.is_match(pypi_pkg_name, repo.name):
                     continue
 
                 if i > 4:
@@ -268,53 +520,61 @@ class GithubStarredInfoExtractor:
 
                 github_repo_info = self.__extract_github_repo_info(repo)
 
-                if self.__search_github_repo(
-                    github_repo_info.repo_id, author_name, "author_name"
-                ) and self.__search_github_repo(
-                    github_repo_info.repo_id, author_email, "author_email"
-                ):
-                    return self.__register_starred_status(pypi_pkg_name, github_repo_info, depth)
+                stage = self.__verify_repo(repo, pypi_pkg_name, author_name, author_email)
+                if stage:
+                    self.__verification_counter.add_package(stage)
+                    return self.__register_starred_status(
+                        pypi_pkg_name, github_repo_info, depth, source=get_search_source(stage)
+                    )
 
-                try:
-                    if author_email.rsplit(".", 1)[0] == repo.organization.email.rsplit(".", 1)[0]:
-                        return self.__register_starred_status(
-                            pypi_pkg_name, github_repo_info, depth
-                        )
-                except AttributeError:
-                    pass
+            self.__verification_counter.add_package()
+            self.__negative_index.add(NegativeKind.PACKAGE, pypi_pkg_name, NegativeReason.NO_MATCH)
 
-                if self.__search_contributor_github(repo, pypi_pkg_name, author_name):
-                    return self.__register_starred_status(pypi_pkg_name, github_repo_info, depth)
+        return None
 
-            logger.debug(
-                "create negative cache for a PyPI package: {}".format(negative_cache_filepath)
-            )
-            touch(negative_cache_filepath)
+    def __verify_repo(self, repo, pypi_pkg_name, author_name, author_email):
+        """
+        Verify that a repository is the source of a package with the author information,
+        from the cheapest stage: code search is the last resort for the repositories that
+        could not be verified locally, e.g. metadata files that read the author from
+        another file.
 
-        return None
+        :return: Verified stage. ``None`` if not verified.
+        """
 
-    def __calc_match_ratio(self, a, b):
-        if not a or not b:
-            return 0
-
-        return SequenceMatcher(
-            a=self.__normalize_pkg_name(a), b=self.__normalize_pkg_name(b)
-        ).ratio()
-
-    def __match_contributor(self, repo_id, pip_author_name, github_contributor_name):
-        for author_name in pip_author_name.split(", "):
-            match_ratio = self.__calc_match_ratio(author_name, github_contributor_name)
-            if match_ratio >= self._MATCH_THRESHOLD:
-                logger.debug(
-                    "found contributor: repo={}, github_user={}, pip_author={}, match_ratio={}".format(
-                        repo_id, github_contributor_name, author_name, match_ratio
-                    )
-                )
-                return True
+        repo_id = get_github_repo_id(repo)
+        is_verified = None
 
-        return False
+        if self.__metadata_verifier is not None:
+            is_verified = self.__metadata_verifier.verify(repo_id, [author_name, author_email])
+            if is_verified:
+                return VerificationStage.LOCAL
+
+        try:
+            organization_email = self.__github_client.call(
+                RateLimitBucket.CORE, lambda: repo.organization.email
+            )
+            if author_email.rsplit(".", 1)[0] == organization_email.rsplit(".", 1)[0]:
+                return VerificationStage.ORGANIZATION
+        except AttributeError:
+            pass
+
+        if self.__search_contributor_github(repo, pypi_pkg_name, author_name):
+            return VerificationStage.CONTRIBUTOR
+
+        if (
+            is_verified is not True
+            and self.__search_github_repo(repo_id, author_name, "author_name")
+            and self.__search_github_repo(repo_id, author_email, "author_email")
+        ):
+            return VerificationStage.CODE_SEARCH
+
+        return None
 
     def __search_github_repo(self, repo_id, search_value, category_name):
+        if not search_value:
+            return False
+
         cache_filepath = self.__github_cache_mgr.get_misc_cache_filepath(
             "/".join([repo_id, category_name]), sanitize_filename(search_value)
         )
@@ -322,116 +582,158 @@ class GithubStarredInfoExtractor:
         msg_template = "source {result} include {category}: repo={repo} path={path}"
 
         if self.__github_cache_mgr.is_cache_available(cache_filepath):
-            with cache_filepath.open() as f:
-                try:
-                    if int(f.read()):
-                        logger.debug(
-                            msg_template.format(
-                                result="found",
-                                category=category_name,
-                                repo=repo_id,
-                                path=cache_filepath,
-                            )
+            try:
+                if int(self.__github_cache_mgr.read_text(cache_filepath)):
+                    logger.debug(
+                        msg_template.format(
+                            result="found",
+                            category=category_name,
+                            repo=repo_id,
+                            path=cache_filepath,
                         )
-                        return True
-                    else:
-                        logger.debug(
-                            msg_template.format(
-                                result="not found",
-                                category=category_name,
-                                repo=repo_id,
-                                path=cache_filepath,
-                            )
+                    )
+                    return True
+                else:
+                    logger.debug(
+                        msg_template.format(
+                            result="not found",
+                            category=category_name,
+                            repo=repo_id,
+                            path=cache_filepath,
                         )
-                        return False
-                except ValueError as e:
-                    logger.warn(msgfy.to_error_message(e))
+                    )
+                    return False
+            except ValueError as e:
+                logger.warn(msgfy.to_error_message(e))
 
         query = "{} in:file language:python repo:{}".format(search_value, repo_id)
         logger.debug("search {}: {}".format(category_name, query))
-        results = self.__github_client.search_code(query)
-        search_regexp = re.compile(search_value, re.MULTILINE)
+        self.__verification_counter.add_api_request(ApiRequestType.CODE_SEARCH)
+        results = self.__github_client.call(
+            RateLimitBucket.CODE_SEARCH,
+            lambda: self.__github_client.search_code(query).get_page(0),
+        )
+        search_regexp = make_literal_regexp(search_value)
 
-        with cache_filepath.open(mode="w") as f:
-            for content_file in results.get_page(0):
-                decoded_content = MultiByteStrDecoder(content_file.decoded_content).unicode_str
-                if not search_regexp.search(decoded_content):
-                    continue
+        for content_file in results:
+            decoded_content = MultiByteStrDecoder(
+                self.__github_client.call(
+                    RateLimitBucket.CORE, lambda: content_file.decoded_content
+                )
+            ).unicode_str
+            if not search_regexp.search(decoded_content):
+                continue
 
-                logger.debug(
-                    msg_template.format(
-                        result="found", category=category_name, repo=repo_id, path=content_file.path
-                    )
+            logger.debug(
+                msg_template.format(
+                    result="found", category=category_name, repo=repo_id, path=content_file.path
                 )
+            )
 
-                f.write("1")
-                return True
+            self.__github_cache_mgr.write_text(cache_filepath, "1")
+            return True
 
-            f.write("0")
+        self.__github_cache_mgr.write_text(cache_filepath, "0")
 
         return False
 
     def __search_contributor_github(self, repo, pypi_pkg_name, author_name):
         repo_id = get_github_repo_id(repo)
-        cache_filepath = self.__github_cache_mgr.get_misc_cache_filepath(repo_id, "contributors")
+        contributor_index = self.__get_contributor_index(repo)
+        author_names = (author_name or "").split(", ")
 
-        if self.__github_cache_mgr.is_cache_available(cache_filepath):
-            logger.debug("load contributors cache: {}".format(cache_filepath))
+        result = contributor_index.find(author_names, self.__person_name_matcher)
+        if result is None and contributor_index.resolved_count < min(
+            len(contributor_index), Default.CONTRIBUTOR_MAX_FULL_NAMES
+        ):
+            logger.debug("fetch full names of contributors: {}".format(repo_id))
+            contributor_index = fetch_contributor_full_names(
+                contributor_index,
+                self.__github_client,
+                Default.CONTRIBUTOR_MAX_FULL_NAMES,
+                counter=self.__verification_counter,
+            )
+            self.__put_contributor_index(repo_id, contributor_index)
+            result = contributor_index.find(author_names, self.__person_name_matcher)
+
+        if result is None:
+            logger.debug(
+                "author not found in the contributors: repo={}, pkg={}, author={}".format(
+                    repo_id, pypi_pkg_name, author_name
+                )
+            )
+            return False
 
-            with cache_filepath.open() as f:
-                for line in f:
-                    contributor = Contributor(**json.loads(line))
+        logger.debug(
+            "found contributor: repo={}, github_user={}, pip_author={}, match_ratio={}".format(
+                repo_id, result.name, author_name, result.ratio
+            )
+        )
 
-                    if self.__match_contributor(repo_id, author_name, contributor.full_name):
-                        return True
+        return True
 
-                    if self.__match_contributor(repo_id, author_name, contributor.login_name):
-                        return True
+    def __get_contributor_index(self, repo):
+        repo_id = get_github_repo_id(repo)
 
-            logger.debug(
-                "contributor not found in the contributors cache: pkg={}, author={}".format(
-                    pypi_pkg_name, author_name
-                )
+        with self.__contributor_index_lock:
+            contributor_index = self.__contributor_index_map.get(repo_id)
+        if contributor_index is not None:
+            return contributor_index
+
+        cache_filepath = self.__get_contributor_index_cache_filepath(repo_id)
+
+        if self.__github_cache_mgr.is_cache_available(cache_filepath):
+            logger.debug("load contributor index cache: {}".format(cache_filepath))
+            contributor_index = ContributorIndex.loads(
+                self.__github_cache_mgr.load_json(cache_filepath)
             )
 
-            return False
+        if contributor_index is None:
+            logger.debug("find contributors: {}".format(repo_id))
+            contributor_index = fetch_contributor_index(
+                repo,
+                Default.CONTRIBUTOR_MAX_PAGES,
+                github_client=self.__github_client,
+                counter=self.__verification_counter,
+            )
+            self.__put_contributor_index(repo_id, contributor_index)
+        else:
+            with self.__contributor_index_lock:
+                self.__contributor_index_map[repo_id] = contributor_index
 
-        logger.debug("find contributors: {}".format(repo_id))
-        with cache_filepath.open(mode="w") as f:
-            for contributor in repo.get_contributors():
-                contributor_map = {"login_name": contributor.login, "full_name": contributor.name}
-                f.write("{}\n".format(json.dumps(contributor_map)))
-
-                for contributor_name in (contributor.name, contributor.login):
-                    if self.__match_contributor(repo_id, author_name, contributor_name):
-                        logger.debug(
-                            "found contributor: auth={}, contributor={}".format(
-                                author_name, contributor_name
-                            )
-                        )
-                        return True
+        return contributor_index
 
-        logger.debug("author not found in the github repository: {}".format(repo_id))
+    def __get_contributor_index_cache_filepath(self, repo_id):
+        return self.__github_cache_mgr.get_misc_cache_filepath(repo_id, "contributor_index")
 
-        return False
+    def __put_contributor_index(self, repo_id, contributor_index):
+        # write the index at once after fetching all of the contributors
+        self.__github_cache_mgr.dump_json(
+            self.__get_contributor_index_cache_filepath(repo_id), contributor_index.dumps()
+        )
 
-    def __register_starred_status(self, pypi_pkg_name, repo_info, depth):
+        with self.__contributor_index_lock:
+            self.__contributor_index_map[repo_id] = contributor_index
+
+    def __register_starred_status(self, pypi_pkg_name, repo_info, depth, source=None):
         repo_id = repo_info.repo_id
         logger.debug("found a GitHub repository: {}".format(repo_id))
 
+        if source and self.__repo_mapping_db is not None:
+            self.__repo_mapping_db.put(make_repo_mapping(pypi_pkg_name, repo_id, source))
+
         starred_info = GitHubStarredInfo(
             pypi_pkg_name=pypi_pkg_name,
             github_repo_id=repo_id,
             star_status=StarStatus.STARRED
-            if repo_id in self.__starred_repo_id_list
+            if self.__is_starred(repo_id)
             else StarStatus.NOT_STARRED,
-            is_owned=self.__github_user.login == repo_info.owner_name,
+            is_owned=self.__github_user_login == repo_info.owner_name,
             url=repo_info.url,
         )
 
         cache_filepath = self.__pypi_cache_mgr.get_pkg_cache_filepath(pypi_pkg_name, "starred_info")
         logger.debug("write starred_info cache: {}".format(cache_filepath))
-        with cache_filepath.open(mode="w") as f:
-            json.dump(starred_info.asdict(), f, indent=4)
+        self.__pypi_cache_mgr.dump_json(cache_filepath, starred_info.asdict(), indent=4)
 
         return starred_info
@@ -1,9 +1,13 @@
 import os
+import threading
 
+import retryrequests
 from github import Github
 
 from ._config import app_config_mgr
+from ._const import Default
 from ._logger import logger
+from ._ratelimit import RateLimitScheduler, detect_rate_limit_bucket
 
 
 def extract_github_api_token(options):
@@ -35,5 +39,88 @@ def extract_github_api_token(options):
     return token
 
 
-def create_github_client(options):
-    return Github(extract_github_api_token(options), per_page=100)
+class ThreadLocalGithubClient:
+    """
+    Delegate to a ``Github`` instance per thread.
+    A ``Github`` instance is not thread-safe since it shares an HTTP connection object
+    between requests.
+    """
+
+    def __init__(self, token, scheduler=None):
+        self.__token = token
+        self.__scheduler = scheduler if scheduler is not None else RateLimitScheduler()
+        self.__local = threading.local()
+
+    def __getattr__(self, name):
+        return getattr(self.__get_client(), name)
+
+    def call(self, bucket, func, *args, **kwargs):
+        """
+        Call ``func`` that sends requests with ``PyGithub`` under the rate limit of ``bucket``.
+        """
+
+        result = self.__scheduler.run(bucket, func, *args, **kwargs)
+
+        # the rate limit of the last response of the client of the current thread
+        client = self.__get_client()
+        remaining, _limit = client.rate_limiting
+        self.__scheduler.update(bucket, remaining, client.rate_limiting_resettime)
+
+        return result
+
+    def __get_client(self):
+        client = getattr(self.__local, "client", None)
+
+        if client is None:
+            client = Github(self.__token, per_page=100)
+            self.__local.client = client
+
+        return client
+
+
+def create_github_client(options, scheduler=None):
+    return ThreadLocalGithubClient(extract_github_api_token(options), scheduler)
+
+
+class GitHubRestClient:
+    """
+    Send requests to the GitHub REST API directly with a keep-alive session.
+    Used for the requests that ``PyGithub`` does not support, such as conditional requests.
+    """
+
+    def __init__(self, token, base_url=Default.GITHUB_API_URL, scheduler=None):
+        self.__base_url = base_url.rstrip("/")
+        self.__scheduler = scheduler if scheduler is not None else RateLimitScheduler()
+        self.__session = retryrequests.make_requests_session()
+        self.__session.headers["Accept"] = "application/vnd.github.v3+json"
+
+        if token:
+            self.__session.headers["Authorization"] = "token {}".format(token)
+
+    def request(self, method, path, **kwargs):
+        """
+        :raises RateLimitExhausted:
+            If the rate limit of the API exhausted and the reset is too far.
+        """
+
+        bucket = detect_rate_limit_bucket(path)
+
+        while True:
+            self.__scheduler.acquire(bucket)
+            r = self.__session.request(method, self.__base_url + path, **kwargs)
+            self.__scheduler.update_from_headers(bucket, r.headers)
+
+            if (
+                r.status_code in (403, 429)
+                and r.headers.get("X-RateLimit-Remaining") == "0"
+                and self.__scheduler.get_wait_seconds(bucket) > 0
+                and self.__scheduler.can_wait(bucket)
+            ):
+                # primary rate limit exceeded: retry after the reset
+                continue
+
+            return r
+
+
+def create_github_rest_client(options, scheduler=None):
+    return GitHubRestClient(extract_github_api_token(options), scheduler=scheduler)
@@ -0,0 +1,139 @@
+import threading
+from collections import namedtuple
+
+import msgfy
+from requests.exceptions import RequestException
+
+from ._logger import logger
+
+
+RepoResolution = namedtuple(
+    "RepoResolution", "repo_id exists name_with_owner owner_login viewer_has_starred"
+)
+
+
+class GraphQLError(Exception):
+    pass
+
+
+class GitHubRepoResolver:
+    """
+    Resolve existence, canonical name, owner and star status of GitHub repositories
+    with batched GraphQL queries: up to ``batch_size`` repositories are aliased into a query.
+    """
+
+    def __init__(self, rest_client, batch_size=100):
+        self.__rest_client = rest_client
+        self.__batch_size = batch_size
+        self.__resolution_map = {}
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __to_key(repo_id):
+        return repo_id.casefold()
+
+    def get(self, repo_id):
+        """
+        Return the resolved result of a repository if it is already resolved,
+        otherwise ``None``.
+        """
+
+        with self.__lock:
+            return self.__resolution_map.get(self.__to_key(repo_id))
+
+    def resolve(self, repo_ids):
+        """
+        Return a mapping of repository ids to |RepoResolution|.
+        Repositories that already resolved are not queried again.
+
+        :raises GraphQLError: If failed to execute a query.
+        """
+
+        unresolved_repo_ids = []
+        unresolved_keys = set()
+
+        with self.__lock:
+            for repo_id in repo_ids:
+                key = self.__to_key(repo_id)
+                if key in self.__resolution_map or key in unresolved_keys:
+                    continue
+
+                unresolved_repo_ids.append(repo_id)
+                unresolved_keys.add(key)
+
+        for i in range(0, len(unresolved_repo_ids), self.__batch_size):
+            resolutions = self.__query(unresolved_repo_ids[i : i + self.__batch_size])
+
+            with self.__lock:
+                for resolution in resolutions:
+                    self.__resolution_map[self.__to_key(resolution.repo_id)] = resolution
+
+        with self.__lock:
+            return {
+                repo_id: self.__resolution_map[self.__to_key(repo_id)]
+                for repo_id in repo_ids
+                if self.__to_key(repo_id) in self.__resolution_map
+            }
+
+    def __query(self, repo_ids):
+        variable_defs = []
+        fields = []
+        variables = {}
+
+        for i, repo_id in enumerate(repo_ids):
+            owner, _, name = repo_id.partition("/")
+            variable_defs.append("$o{i}: String!, $n{i}: String!".format(i=i))
+            fields.append(
+                "r{i}: repository(owner: $o{i}, name: $n{i}) "
+                "{{ nameWithOwner owner {{ login }} viewerHasStarred }}".format(i=i)
+            )
+            variables["o{}".format(i)] = owner
+            variables["n{}".format(i)] = name
+
+        query = "query({}) {{ {} }}".format(", ".join(variable_defs), " ".join(fields))
+        logger.debug("resolve GitHub repositories with GraphQL: {}".format(len(repo_ids)))
+
+        try:
+            r = self.__rest_client.request(
+                "POST", "/graphql", json={"query": query, "variables": variables}
+            )
+        except RequestException as e:
+            raise GraphQLError(msgfy.to_error_message(e))
+
+        if r.status_code != 200:
+            raise GraphQLError("GraphQL request failed: status={}".format(r.status_code))
+
+        result = r.json()
+        for error in result.get("errors") or []:
+            if error.get("type") != "NOT_FOUND":
+                raise GraphQLError("GraphQL query failed: {}".format(error.get("message")))
+
+        data = result.get("data") or {}
+        resolutions = []
+
+        for i, repo_id in enumerate(repo_ids):
+            repo = data.get("r{}".format(i))
+
+            if repo is None:
+                resolutions.append(
+                    RepoResolution(
+                        repo_id=repo_id,
+                        exists=False,
+                        name_with_owner=None,
+                        owner_login=None,
+                        viewer_has_starred=None,
+                    )
+                )
+                continue
+
+            resolutions.append(
+                RepoResolution(
+                    repo_id=repo_id,
+                    exists=True,
+                    name_with_owner=repo["nameWithOwner"],
+                    owner_login=repo["owner"]["login"],
+                    viewer_has_starred=repo["viewerHasStarred"],
+                )
+            )
+
+        return resolutions
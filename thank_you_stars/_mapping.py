@@ -0,0 +1,314 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from path import Path
+
+from ._cache import CacheTime
+from ._candidate import CandidateRank
+from ._const import PACKAGE_NAME, Default
+from ._logger import logger
+from ._verifier import VerificationStage
+
+
+RepoMapping = namedtuple("RepoMapping", "pypi_pkg_name repo_id confidence source updated_at")
+
+_SCHEMA_VERSION = 1
+_REPO_ID_REGEXP = re.compile(r"^[a-zA-Z0-9][a-zA-Z0-9-]*/[a-zA-Z0-9-_.]+$")
+
+
+class MappingSource:
+    """
+    How a package was mapped to a repository.
+    """
+
+    METADATA_NAME_MATCH = "metadata_name_match"
+    METADATA = "metadata"
+    DESCRIPTION_NAME_MATCH = "description_name_match"
+    SEARCH_LOCAL = "search:" + VerificationStage.LOCAL
+    SEARCH_ORGANIZATION = "search:" + VerificationStage.ORGANIZATION
+    SEARCH_CONTRIBUTOR = "search:" + VerificationStage.CONTRIBUTOR
+    SEARCH_CODE_SEARCH = "search:" + VerificationStage.CODE_SEARCH
+    STARRED_INFO = "starred_info"
+
+
+_CONFIDENCE_MAP = {
+    MappingSource.METADATA_NAME_MATCH: 1.0,
+    MappingSource.METADATA: 0.9,
+    MappingSource.SEARCH_LOCAL: 0.9,
+    MappingSource.DESCRIPTION_NAME_MATCH: 0.8,
+    MappingSource.SEARCH_CONTRIBUTOR: 0.8,
+    MappingSource.SEARCH_ORGANIZATION: 0.7,
+    MappingSource.SEARCH_CODE_SEARCH: 0.7,
+}
+
+_CANDIDATE_SOURCE_MAP = {
+    CandidateRank.METADATA_NAME_MATCH: MappingSource.METADATA_NAME_MATCH,
+    CandidateRank.METADATA: MappingSource.METADATA,
+    CandidateRank.DESCRIPTION_NAME_MATCH: MappingSource.DESCRIPTION_NAME_MATCH,
+}
+
+
+def get_candidate_source(rank):
+    return _CANDIDATE_SOURCE_MAP[rank]
+
+
+def get_search_source(stage):
+    return "search:" + stage
+
+
+def make_repo_mapping(pypi_pkg_name, repo_id, source, updated_at=None, confidence=None):
+    return RepoMapping(
+        pypi_pkg_name=pypi_pkg_name.lower(),
+        repo_id=repo_id,
+        confidence=_CONFIDENCE_MAP.get(source, 0.5) if confidence is None else confidence,
+        source=source,
+        updated_at=time.time() if updated_at is None else updated_at,
+    )
+
+
+def make_mapping_lifetime(cache_configs=None):
+    """
+    Make the lifetime of mappings from the ``mapping`` entry of the cache configs.
+
+    :raises ValueError: If the configurations are invalid.
+    """
+
+    configs = (cache_configs or {}).get("mapping") or {}
+
+    try:
+        lifetime = CacheTime(
+            days=float(configs.get("lifetime_days", Default.REPO_MAPPING_LIFETIME_DAYS))
+        )
+    except (TypeError, ValueError) as e:
+        raise ValueError("invalid mapping lifetime: {}".format(e))
+
+    if lifetime.seconds < 0:
+        raise ValueError("mapping lifetime must be greater or equal to zero")
+
+    return lifetime
+
+
+def validate_repo_mapping(mapping):
+    """
+    :raises ValueError:
+        If the repository id of the mapping is not ``owner/name``, or the timestamp is
+        not a number.
+    """
+
+    if not isinstance(mapping.repo_id, str) or not _REPO_ID_REGEXP.search(mapping.repo_id):
+        raise ValueError(
+            "invalid repository id of {}: {!r}".format(mapping.pypi_pkg_name, mapping.repo_id)
+        )
+    if not isinstance(mapping.updated_at, (int, float)):
+        raise ValueError(
+            "invalid timestamp of {}: {!r}".format(mapping.pypi_pkg_name, mapping.updated_at)
+        )
+
+
+def _is_preferred(mapping, other, expires_before=None):
+    """
+    Return ``True`` if ``mapping`` should replace ``other``: higher confidence wins,
+    and the newer wins for the same confidence. An expired ``other`` is replaced by
+    a newer mapping regardless of the confidence, so that stale mappings are refreshed
+    by new discoveries.
+    """
+
+    if other is None:
+        return True
+
+    if (
+        expires_before is not None
+        and other.updated_at < expires_before
+        and mapping.updated_at > other.updated_at
+    ):
+        return True
+
+    return (mapping.confidence, mapping.updated_at) > (other.confidence, other.updated_at)
+
+
+def get_default_mapping_db_path():
+    return (
+        Path("~/.cache/{:s}".format(PACKAGE_NAME))
+        .expand()
+        .normpath()
+        .joinpath(Default.REPO_MAPPING_DB_FILENAME)
+    )
+
+
+class RepoMappingDB:
+    """
+    Mappings of PyPI packages to GitHub repositories. The mappings are independent of
+    GitHub users, and can be shared between users and machines with :py:meth:`export`
+    and :py:meth:`merge_file`.
+    """
+
+    def __init__(self, db_path, lifetime=None, not_before=None):
+        """
+        :param CacheTime lifetime:
+            Lifetime of mappings. Expired mappings are not looked up. Mappings never expire
+            if ``None``.
+        :param float not_before:
+            Do not look up mappings that updated before the timestamp, e.g. the start time
+            of a run without caches. Mappings are still recorded.
+        """
+
+        self.__lifetime = lifetime
+        self.__not_before = not_before
+        self.__lock = threading.Lock()
+
+        Path(db_path).parent.makedirs_p()
+        self.__connection = sqlite3.connect(
+            str(db_path), isolation_level=None, check_same_thread=False
+        )
+
+        with self.__lock:
+            user_version = self.__connection.execute("PRAGMA user_version").fetchone()[0]
+            if user_version not in (0, _SCHEMA_VERSION):
+                raise ValueError(
+                    "unsupported mapping database schema version: {}".format(user_version)
+                )
+
+            self.__connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS mapping (
+                    pypi_pkg_name TEXT NOT NULL PRIMARY KEY,
+                    repo_id TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    source TEXT NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+            self.__connection.execute("PRAGMA user_version={:d}".format(_SCHEMA_VERSION))
+
+    def __len__(self):
+        with self.__lock:
+            return self.__connection.execute("SELECT COUNT(*) FROM mapping").fetchone()[0]
+
+    def get(self, pypi_pkg_name):
+        """
+        :return: |RepoMapping| of a package. ``None`` if not found or expired.
+        """
+
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT * FROM mapping WHERE pypi_pkg_name=?", (pypi_pkg_name.lower(),)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        mapping = RepoMapping(*row)
+        try:
+            validate_repo_mapping(mapping)
+        except ValueError as e:
+            logger.debug("skip an invalid repository mapping: {}".format(e))
+            return None
+
+        if mapping.updated_at < max(self.__get_expires_before() or 0, self.__not_before or 0):
+            logger.debug("skip an expired repository mapping: {}".format(mapping))
+            return None
+
+        return mapping
+
+    def __get_expires_before(self):
+        if self.__lifetime is None:
+            return None
+
+        return time.time() - self.__lifetime.seconds
+
+    def put(self, mapping):
+        """
+        Add a mapping if it is preferred to the existing mapping of the package.
+
+        :return: ``True`` if the mapping is added.
+        """
+
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT * FROM mapping WHERE pypi_pkg_name=?", (mapping.pypi_pkg_name,)
+            ).fetchone()
+
+            if not _is_preferred(
+                mapping, RepoMapping(*row) if row else None, self.__get_expires_before()
+            ):
+                return False
+
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO mapping VALUES (?, ?, ?, ?, ?)", tuple(mapping)
+            )
+
+        logger.debug("update repository mapping: {}".format(mapping))
+
+        return True
+
+    def merge(self, mappings):
+        """
+        :return: Number of added mappings.
+        :raises ValueError: If any of the mappings is invalid. No mapping is added then.
+        """
+
+        mappings = list(mappings)
+        for mapping in mappings:
+            validate_repo_mapping(mapping)
+
+        return sum(self.put(mapping) for mapping in mappings)
+
+    def iter_mappings(self):
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT * FROM mapping ORDER BY pypi_pkg_name"
+            ).fetchall()
+
+        return (RepoMapping(*row) for row in rows)
+
+    def export(self, filepath):
+        """
+        Write the mappings to a JSON file.
+
+        :return: Number of exported mappings.
+        """
+
+        mappings = [list(mapping) for mapping in self.iter_mappings()]
+
+        with open(filepath, "w", encoding="utf8") as f:
+            json.dump(
+                {
+                    "schema_version": _SCHEMA_VERSION,
+                    "fields": RepoMapping._fields,
+                    "mappings": mappings,
+                },
+                f,
+                separators=(",", ":"),
+            )
+
+        return len(mappings)
+
+    def merge_file(self, filepath):
+        """
+        Merge mappings of a JSON file that written by :py:meth:`export`.
+
+        :return: Number of added mappings.
+        :raises ValueError: If the file is not a mapping file of the supported schema.
+        """
+
+        with open(filepath, encoding="utf8") as f:
+            data = json.load(f)
+
+        if not isinstance(data, dict) or data.get("schema_version") != _SCHEMA_VERSION:
+            raise ValueError("unsupported mapping file: {}".format(filepath))
+
+        fields = data.get("fields", RepoMapping._fields)
+
+        try:
+            mappings = [
+                make_repo_mapping(**dict(zip(fields, values))) for values in data["mappings"]
+            ]
+        except (AttributeError, KeyError, TypeError) as e:
+            raise ValueError("invalid mapping file: {}: {}".format(filepath, e))
+
+        return self.merge(mappings)
@@ -0,0 +1,111 @@
+import re
+from collections import namedtuple
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+
+MatchResult = namedtuple("MatchResult", "name ratio")
+
+_NORMALIZE_CACHE_SIZE = 4096
+_PEP503_SEPARATOR_REGEXP = re.compile(r"[-_.]+")
+_WHITESPACE_REGEXP = re.compile(r"\s+")
+_PKG_NAME_PREFIXES = ("python-", "py-", "py")
+_PKG_NAME_SUFFIXES = ("-python", "-py", "py")
+
+
+@lru_cache(maxsize=_NORMALIZE_CACHE_SIZE)
+def normalize_pkg_name(name):
+    """
+    Normalize a package/repository name: PEP 503 normalization, then strip
+    ``python-``/``py`` prefixes and suffixes.
+    """
+
+    name = _PEP503_SEPARATOR_REGEXP.sub("-", name).lower()
+
+    for prefix in _PKG_NAME_PREFIXES:
+        if name.startswith(prefix) and len(name) > len(prefix):
+            name = name[len(prefix) :]
+            break
+
+    for suffix in _PKG_NAME_SUFFIXES:
+        if name.endswith(suffix) and len(name) > len(suffix):
+            name = name[: -len(suffix)]
+            break
+
+    return name
+
+
+@lru_cache(maxsize=_NORMALIZE_CACHE_SIZE)
+def normalize_person_name(name):
+    return _WHITESPACE_REGEXP.sub(" ", name).strip().casefold()
+
+
+class NameMatcher:
+    """
+    Fuzzy name matcher: names are normalized once (cached) and compared with
+    ``difflib.SequenceMatcher``. Candidates that can not reach the threshold are
+    rejected by the length bound and the cheaper upper bounds of the ratio first.
+    """
+
+    def __init__(self, threshold=0.6, normalizer=normalize_pkg_name):
+        self.__threshold = threshold
+        self.__normalizer = normalizer
+
+    @property
+    def threshold(self):
+        return self.__threshold
+
+    def ratio(self, a, b):
+        if not a or not b:
+            return 0
+
+        return SequenceMatcher(a=self.__normalizer(a), b=self.__normalizer(b)).ratio()
+
+    def is_match(self, a, b):
+        return self.best_match(a, [b]) is not None
+
+    def best_match(self, name, candidates):
+        """
+        Return |MatchResult| of the most similar candidate to ``name`` if the ratio of the
+        candidate is greater or equal to the threshold, otherwise ``None``.
+        """
+
+        if not name:
+            return None
+
+        normalized_name = self.__normalizer(name)
+        name_len = len(normalized_name)
+        best_result = None
+
+        # SequenceMatcher caches detailed information about the second sequence
+        matcher = SequenceMatcher()
+        matcher.set_seq2(normalized_name)
+
+        for candidate in candidates:
+            if not candidate:
+                continue
+
+            normalized_candidate = self.__normalizer(candidate)
+            total_len = name_len + len(normalized_candidate)
+            if total_len == 0:
+                continue
+
+            # upper bound of the ratio from the lengths of sequences
+            if 2.0 * min(name_len, len(normalized_candidate)) / total_len < self.__threshold:
+                continue
+
+            matcher.set_seq1(normalized_candidate)
+
+            if matcher.real_quick_ratio() < self.__threshold:
+                continue
+            if matcher.quick_ratio() < self.__threshold:
+                continue
+
+            ratio = matcher.ratio()
+            if ratio < self.__threshold:
+                continue
+
+            if best_result is None or ratio > best_result.ratio:
+                best_result = MatchResult(name=candidate, ratio=ratio)
+
+        return best_result
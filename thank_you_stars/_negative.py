@@ -0,0 +1,210 @@
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+from path import Path
+
+from ._cache import hour_to_sec
+from ._const import PACKAGE_NAME
+from ._logger import logger
+
+
+NegativeStats = namedtuple("NegativeStats", "hits misses size")
+
+_SCHEMA_VERSION = 1
+
+
+class NegativeKind:
+    PACKAGE = "package"
+    REPO = "repo"
+
+
+class NegativeReason:
+    """
+    Why a lookup failed.
+    """
+
+    #: a GitHub repository does not exist (404)
+    NOT_FOUND = "not_found"
+
+    #: no repository matched a package
+    NO_MATCH = "no_match"
+
+    #: a lookup aborted by the API rate limit
+    RATE_LIMITED = "rate_limited"
+
+
+DEFAULT_NEGATIVE_TTL_MAP = {
+    NegativeReason.NOT_FOUND: hour_to_sec(24) * 30,
+    NegativeReason.NO_MATCH: hour_to_sec(24) * 7,
+    NegativeReason.RATE_LIMITED: hour_to_sec(1),
+}
+
+
+def make_negative_ttl_map(cache_configs=None):
+    """
+    Make TTL seconds of each reason from the ``negative`` entry of the cache configs:
+    a mapping of reasons to days.
+
+    :raises ValueError: If the configurations are invalid.
+    """
+
+    ttl_map = dict(DEFAULT_NEGATIVE_TTL_MAP)
+
+    for reason, days in ((cache_configs or {}).get("negative") or {}).items():
+        if reason not in ttl_map:
+            raise ValueError("unknown negative cache reason: {}".format(reason))
+
+        try:
+            ttl_map[reason] = hour_to_sec(24) * float(days)
+        except (TypeError, ValueError) as e:
+            raise ValueError("invalid negative cache TTL of {}: {}".format(reason, e))
+
+    return ttl_map
+
+
+def get_negative_index_filepath(user_name):
+    return (
+        Path("~/.cache/{package}/{user}".format(package=PACKAGE_NAME, user=user_name))
+        .expand()
+        .normpath()
+        .joinpath("negative_index.json")
+    )
+
+
+class NegativeIndex:
+    """
+    In-memory index of negative results with the reasons: the whole index is loaded at once
+    so that lookups need no I/O. Each entry expires after the TTL of the reason.
+    Updates are written to the file by :py:meth:`save`.
+    """
+
+    @property
+    def stats(self):
+        with self.__lock:
+            return NegativeStats(hits=self.__hits, misses=self.__misses, size=len(self.__entries))
+
+    def __init__(self, filepath=None, ttl_map=None, clock=time.time):
+        self.__filepath = filepath
+        self.__ttl_map = ttl_map if ttl_map is not None else dict(DEFAULT_NEGATIVE_TTL_MAP)
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__entries = {}
+        self.__updated_keys = set()
+        self.__hits = 0
+        self.__misses = 0
+
+        if filepath:
+            self.__entries = self.__load()
+
+    @staticmethod
+    def __make_key(kind, name):
+        return "{}:{}".format(kind, name.lower())
+
+    def get(self, kind, name):
+        """
+        :return: Reason of the negative result. ``None`` if not found or expired.
+        """
+
+        return self.__lookup(kind, name, count=True)
+
+    def __contains__(self, kind_name):
+        """
+        Same as :py:meth:`get` without counting to the stats.
+        """
+
+        return self.__lookup(*kind_name, count=False) is not None
+
+    def get_expires_at(self, kind, name):
+        """
+        Same as :py:meth:`get` without counting to the stats.
+
+        :return: Expiry timestamp of the negative result. ``None`` if not found or expired.
+        """
+
+        entry = self.__lookup_entry(kind, name)
+
+        return entry["expires_at"] if entry else None
+
+    def __lookup_entry(self, kind, name):
+        key = self.__make_key(kind, name)
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry["expires_at"] <= self.__clock():
+                return None
+
+            return entry
+
+    def __lookup(self, kind, name, count):
+        entry = self.__lookup_entry(kind, name)
+
+        if count:
+            with self.__lock:
+                if entry is None:
+                    self.__misses += 1
+                else:
+                    self.__hits += 1
+
+        return entry["reason"] if entry else None
+
+    def add(self, kind, name, reason, expires_at=None):
+        """
+        :param float expires_at: Override the expiry of the TTL of the reason.
+        """
+
+        if expires_at is None:
+            expires_at = self.__clock() + self.__ttl_map[reason]
+
+        key = self.__make_key(kind, name)
+        logger.debug("add a negative result: {}, reason={}".format(key, reason))
+
+        with self.__lock:
+            self.__entries[key] = {"reason": reason, "expires_at": expires_at}
+            self.__updated_keys.add(key)
+
+    def __load(self):
+        try:
+            with open(self.__filepath, encoding="utf8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug("negative index not loaded: {}".format(e))
+            return {}
+
+        if not isinstance(data, dict) or data.get("schema_version") != _SCHEMA_VERSION:
+            return {}
+
+        now = self.__clock()
+
+        return {key: entry for key, entry in data["entries"].items() if entry["expires_at"] > now}
+
+    def save(self):
+        """
+        Write the updated entries to the file, merged with the entries in the file that
+        written by other processes in the meantime.
+        """
+
+        if not self.__filepath:
+            return
+
+        with self.__lock:
+            if not self.__updated_keys:
+                return
+
+            entries = self.__load()
+            entries.update({key: self.__entries[key] for key in self.__updated_keys})
+            self.__updated_keys.clear()
+
+        Path(self.__filepath).parent.makedirs_p()
+        temp_filepath = "{}.{}.tmp".format(self.__filepath, os.getpid())
+        with open(temp_filepath, "w", encoding="utf8") as f:
+            json.dump(
+                {"schema_version": _SCHEMA_VERSION, "entries": entries}, f, separators=(",", ":")
+            )
+
+        os.replace(temp_filepath, self.__filepath)
+        logger.debug(
+            "write negative index: path={}, entries={}".format(self.__filepath, len(entries))
+        )
@@ -1,31 +1,295 @@
+import enum
 import re
 import sys
+from collections import OrderedDict, deque, namedtuple
 
 from subprocrunner import CalledProcessError, SubprocessRunner
 
 from ._logger import logger
 
 
+try:
+    from importlib import metadata as importlib_metadata
+except ImportError:
+    try:
+        import importlib_metadata
+    except ImportError:
+        importlib_metadata = None
+
+try:
+    from packaging.requirements import InvalidRequirement, Requirement
+except ImportError:
+    InvalidRequirement = Requirement = None
+
+
+@enum.unique
+class PipShowBackend(enum.Enum):
+    METADATA = "metadata"
+    SUBPROCESS = "subprocess"
+
+
+class PipShowError(Exception):
+    def __init__(self, *args, **kwargs):
+        self.returncode = kwargs.pop("returncode", 1)
+
+        super().__init__(*args, **kwargs)
+
+
+InstalledPackages = namedtuple("InstalledPackages", "pip_show_map depth_map")
+
+_REQUIREMENT_NAME_REGEXP = re.compile(r"^\s*(?P<name>[a-zA-Z0-9][a-zA-Z0-9-_.]*)")
+
+
+def extract_requirement_name(requirement):
+    """
+    Return the name of a ``Requires-Dist`` requirement if it is required without extras
+    (same as ``pip show``), otherwise ``None``.
+    """
+
+    if Requirement is not None:
+        try:
+            req = Requirement(requirement)
+        except InvalidRequirement:
+            return None
+
+        if req.marker and not req.marker.evaluate({"extra": ""}):
+            return None
+
+        return req.name
+
+    # fallback when packaging is not installed: markers other than extras are regarded
+    # as satisfied since those could not evaluate.
+    marker = requirement.partition(";")[2]
+    if re.search(r"\bextra\s*==", marker):
+        return None
+
+    match = _REQUIREMENT_NAME_REGEXP.search(requirement)
+    if not match:
+        return None
+
+    return match.group("name")
+
+
+def _fetch_by_subprocess(package_name):
+    proc_runner = SubprocessRunner(["pip", "show", package_name])
+
+    try:
+        proc_runner.run(check=True)
+    except CalledProcessError as e:
+        raise PipShowError(package_name, returncode=e.returncode)
+
+    return proc_runner.stdout
+
+
+def _canonicalize_name(name):
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _make_pip_show_content(dist, metadata):
+    """
+    :return: Pair of ``pip show`` formatted content and required package names.
+    """
+
+    # Requires-Dist of the metadata that already read: dist.requires reads the file again
+    requirements = metadata.get_all("Requires-Dist")
+    if requirements is None:
+        requirements = dist.requires or []
+
+    requires = sorted(
+        {
+            name
+            for name in (extract_requirement_name(requirement) for requirement in requirements)
+            if name
+        },
+        key=str.lower,
+    )
+
+    # same format as the output of 'pip show' for the fields that used by the extraction
+    content = "\n".join(
+        [
+            "Name: {}".format(metadata.get("Name", "")),
+            "Version: {}".format(metadata.get("Version", "")),
+            "Summary: {}".format(metadata.get("Summary", "")),
+            "Home-page: {}".format(metadata.get("Home-page", "")),
+            "Author: {}".format(metadata.get("Author", "")),
+            "Author-email: {}".format(metadata.get("Author-email", "")),
+            "License: {}".format(metadata.get("License", "")),
+            "Requires: {}".format(", ".join(requires)),
+        ]
+        + ["Project-URL: {}".format(url) for url in metadata.get_all("Project-URL") or []]
+    )
+
+    return (content, requires)
+
+
+def _fetch_by_metadata(package_name):
+    try:
+        dist = importlib_metadata.distribution(package_name)
+    except importlib_metadata.PackageNotFoundError:
+        raise PipShowError(package_name)
+
+    return _make_pip_show_content(dist, dist.metadata)[0]
+
+
+def compute_depth_map(require_map):
+    """
+    Compute the depth of each package of a requirement graph: the length of the shortest
+    path from root packages that no other package requires.
+    Packages only reachable from dependency cycles are regarded as roots.
+
+    :param dict require_map: Mapping of package names to the names of required packages.
+    """
+
+    required = {
+        require_name
+        for name, require_names in require_map.items()
+        for require_name in require_names
+        if require_name != name
+    }
+    queue = deque((name, 0) for name in sorted(require_map) if name not in required)
+    depth_map = {}
+
+    while True:
+        while queue:
+            name, depth = queue.popleft()
+            if name in depth_map:
+                continue
+
+            depth_map[name] = depth
+            queue.extend(
+                (require_name, depth + 1)
+                for require_name in require_map.get(name, [])
+                if require_name not in depth_map
+            )
+
+        unreached_names = sorted(set(require_map) - set(depth_map))
+        if not unreached_names:
+            break
+
+        queue.append((unreached_names[0], 0))
+
+    return depth_map
+
+
+def load_installed_packages():
+    """
+    Read metadata of all of the installed distributions in one pass and build the requirement
+    graph of them in memory.
+
+    :return: |InstalledPackages|: ``pip show`` formatted contents and depths of the packages.
+    """
+
+    if importlib_metadata is None:
+        raise RuntimeError("importlib.metadata or importlib_metadata package is required")
+
+    pip_show_map = OrderedDict()
+    requires_map = {}
+    name_map = {}
+
+    for dist in importlib_metadata.distributions():
+        metadata = dist.metadata
+        name = metadata.get("Name")
+        if not name:
+            continue
+
+        key = name.lower()
+        if key in pip_show_map:
+            # shadowed by a distribution that precedes in sys.path
+            continue
+
+        pip_show_map[key], requires_map[key] = _make_pip_show_content(dist, metadata)
+        name_map[_canonicalize_name(name)] = key
+
+    require_map = {
+        key: [
+            name_map[_canonicalize_name(require_name)]
+            for require_name in requires
+            if _canonicalize_name(require_name) in name_map
+        ]
+        for key, requires in requires_map.items()
+    }
+
+    logger.debug("loaded installed distributions: {}".format(len(pip_show_map)))
+
+    return InstalledPackages(pip_show_map=pip_show_map, depth_map=compute_depth_map(require_map))
+
+
 class PipShow:
     _AUTHOR_REGEXP = re.compile("^Author: (?P<author>.+)", re.MULTILINE)
 
     cache_mgr = None
+    backend = PipShowBackend.METADATA
+    __preloaded_map = {}
+    __is_exclusive = False
 
     @classmethod
-    def execute(cls, package_name):
-        cache_file_path = cls.cache_mgr.get_pkg_cache_filepath(package_name, "pip_show")
+    def preload(cls, pip_show_map, exclusive=False):
+        """
+        Register ``pip show`` formatted contents that already read, e.g. by
+        :py:func:`load_installed_packages`. Preloaded contents take precedence over caches.
 
-        if cls.cache_mgr.is_cache_available(cache_file_path):
-            logger.debug("load pip show cache from {}".format(cache_file_path))
+        :param bool exclusive:
+            Regard packages that not preloaded as not installed,
+            without reading caches or executing ``pip``.
+        """
+
+        cls.__preloaded_map = dict(pip_show_map)
+        cls.__is_exclusive = exclusive
 
-            with cache_file_path.open() as f:
-                return PipShow(f.read())
+    @classmethod
+    def fetch(cls, package_name, backend=None):
+        """
+        Fetch installed package information as the same format as ``pip show``
+        without using caches.
+        """
+
+        if backend is None:
+            backend = cls.backend
+
+        if backend == PipShowBackend.METADATA and importlib_metadata is not None:
+            return _fetch_by_metadata(package_name)
+
+        return _fetch_by_subprocess(package_name)
+
+    @classmethod
+    def refresh(cls, package_name):
+        """
+        Fetch installed package information and update the cache.
 
-        proc_runner = SubprocessRunner(["pip", "show", package_name])
+        :return: |PipShow|. ``None`` if the package is not installed.
+        """
 
         try:
-            proc_runner.run(check=True)
-        except CalledProcessError as e:
+            pip_show = cls.fetch(package_name)
+        except PipShowError:
+            logger.debug("failed to fetch '{}' package info".format(package_name))
+            return None
+
+        cls.cache_mgr.write_text(
+            cls.cache_mgr.get_pkg_cache_filepath(package_name, "pip_show"), pip_show
+        )
+
+        return PipShow(pip_show)
+
+    @classmethod
+    def find(cls, package_name):
+        """
+        Same as :py:meth:`execute` except for packages that are not installed.
+
+        :return: |PipShow|. ``None`` if the package is not installed.
+        """
+
+        try:
+            return cls.__load(package_name)
+        except PipShowError:
+            logger.debug("package not installed: {}".format(package_name))
+            return None
+
+    @classmethod
+    def execute(cls, package_name):
+        try:
+            return cls.__load(package_name)
+        except PipShowError as e:
             logger.error(
                 "failed to fetch '{}' package info: require an installed PyPI package name".format(
                     package_name
@@ -33,11 +297,26 @@ class PipShow:
             )
             sys.exit(e.returncode)
 
-        logger.debug("write pip show cache to {}".format(cache_file_path))
+    @classmethod
+    def __load(cls, package_name):
+        pip_show = cls.__preloaded_map.get(package_name.lower())
+        if pip_show is not None:
+            return PipShow(pip_show)
+        if cls.__is_exclusive:
+            raise PipShowError(package_name)
+
+        cache_file_path = cls.cache_mgr.get_pkg_cache_filepath(package_name, "pip_show")
 
-        pip_show = proc_runner.stdout
-        with cache_file_path.open(mode="w") as f:
-            f.write(pip_show)
+        if cls.cache_mgr.is_cache_available(cache_file_path, allow_stale=True):
+            logger.debug("load pip show cache from {}".format(cache_file_path))
+            cls.cache_mgr.revalidate(cache_file_path, lambda: cls.refresh(package_name))
+
+            return PipShow(cls.cache_mgr.read_text(cache_file_path))
+
+        pip_show = cls.fetch(package_name)
+
+        logger.debug("write pip show cache to {}".format(cache_file_path))
+        cls.cache_mgr.write_text(cache_file_path, pip_show)
 
         return PipShow(pip_show)
 
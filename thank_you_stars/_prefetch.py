@@ -0,0 +1,124 @@
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from tqdm import tqdm
+
+from ._cache import CacheType
+from ._const import Default
+from ._logger import logger
+from ._negative import NegativeKind
+from ._pip_show import PipShow
+
+
+PrefetchStats = namedtuple("PrefetchStats", "packages refreshed")
+
+_CACHE_ENTRIES = (
+    (CacheType.PIP, "pip_show"),
+    (CacheType.PYPI, "pypi_desc"),
+    (CacheType.PYPI, "starred_info"),
+)
+
+
+class CachePrefetcher:
+    """
+    Refresh cache entries of packages in bulk ahead of time: ``pip show`` results,
+    PyPI information and starred information of packages that missing in the caches or
+    expire within ``expire_within_seconds`` are refreshed, from the closest to the expiry.
+    Packages without starred information are up to date while they are in ``negative_index``.
+    """
+
+    def __init__(
+        self,
+        extractor,
+        cache_mgr_map,
+        expire_within_seconds,
+        max_workers=Default.MAX_WORKERS,
+        clock=time.time,
+        negative_index=None,
+    ):
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than zero")
+
+        self.__extractor = extractor
+        self.__cache_mgr_map = cache_mgr_map
+        self.__expire_within_seconds = expire_within_seconds
+        self.__max_workers = max_workers
+        self.__clock = clock
+        self.__negative_index = negative_index
+
+    def get_expires_at(self, pypi_pkg_name):
+        """
+        Return the earliest expiry timestamp of the cache entries of a package:
+        ``0`` if any of the entries is missing.
+        """
+
+        expires_at_list = []
+
+        for cache_type, filename in _CACHE_ENTRIES:
+            cache_mgr = self.__cache_mgr_map[cache_type]
+            expires_at = cache_mgr.get_expires_at(
+                cache_mgr.get_pkg_cache_filepath(pypi_pkg_name, filename)
+            )
+            if expires_at is None and filename == "starred_info":
+                # packages without repositories have negative results instead
+                expires_at = self.__get_negative_expires_at(pypi_pkg_name)
+            if expires_at is None:
+                return 0
+
+            expires_at_list.append(expires_at)
+
+        return min(expires_at_list)
+
+    def __get_negative_expires_at(self, pypi_pkg_name):
+        if self.__negative_index is None:
+            return None
+
+        return self.__negative_index.get_expires_at(NegativeKind.PACKAGE, pypi_pkg_name)
+
+    def list_refresh_targets(self, pypi_pkg_names):
+        """
+        Return packages to refresh, sorted by the expiry of the caches.
+        """
+
+        deadline = self.__clock() + self.__expire_within_seconds
+        expires_at_map = {
+            pypi_pkg_name: self.get_expires_at(pypi_pkg_name) for pypi_pkg_name in pypi_pkg_names
+        }
+
+        return sorted(
+            [
+                pypi_pkg_name
+                for pypi_pkg_name, expires_at in expires_at_map.items()
+                if expires_at <= deadline
+            ],
+            key=lambda pypi_pkg_name: (expires_at_map[pypi_pkg_name], pypi_pkg_name),
+        )
+
+    def prefetch(self, pypi_pkg_names):
+        """
+        :return: |PrefetchStats|
+        """
+
+        pypi_pkg_names = list(pypi_pkg_names)
+        refresh_targets = self.list_refresh_targets(pypi_pkg_names)
+        logger.debug(
+            "refresh caches of {}/{} packages".format(len(refresh_targets), len(pypi_pkg_names))
+        )
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            for _ in tqdm(
+                executor.map(self.__refresh, refresh_targets),
+                desc="Prefetch",
+                total=len(refresh_targets),
+            ):
+                pass
+
+        return PrefetchStats(packages=len(pypi_pkg_names), refreshed=len(refresh_targets))
+
+    def __refresh(self, pypi_pkg_name):
+        if PipShow.refresh(pypi_pkg_name) is None:
+            return
+
+        self.__extractor.pypi_client.fetch_info(pypi_pkg_name, revalidate=True)
+        self.__extractor.extract_starred_info(pypi_pkg_name, use_cache=False)
@@ -1,5 +1,4 @@
 import pydoc
-from operator import itemgetter
 
 import subprocrunner
 from pytablewriter import MarkdownTableWriter
@@ -34,23 +33,27 @@ def pager(text):
         pydoc.pager(text)
 
 
-def print_starred_info(starred_info_set, repo_depth_map, verbosity):
-    records = []
-    for info in sorted(starred_info_set):
-        record = [
-            info.pypi_pkg_name,
-            info.github_repo_id,
-            _star_status_map[info.star_status],
-            info.is_owned
-            if info.star_status in [StarStatus.STARRED, StarStatus.NOT_STARRED]
-            else _NA,
-            repo_depth_map[info.pypi_pkg_name.lower()],
-            info.url,
-        ]
-        records.append(record)
+def _to_record(info, repo_depth_map, target_map):
+    record = [
+        info.pypi_pkg_name,
+        info.github_repo_id,
+        _star_status_map[info.star_status],
+        info.is_owned if info.star_status in [StarStatus.STARRED, StarStatus.NOT_STARRED] else _NA,
+        repo_depth_map[info.pypi_pkg_name.lower()],
+        info.url,
+    ]
 
+    if target_map is not None:
+        record.insert(1, ", ".join(target_map.get(info.pypi_pkg_name.lower(), [])))
+
+    return record
+
+
+def _make_writer(verbosity, target_map):
     writer = MarkdownTableWriter()
     writer.headers = ["Package", "Repository", "Starred", "Owner"]
+    if target_map is not None:
+        writer.headers.insert(1, "Targets")
     if verbosity is not None:
         if verbosity >= 1:
             writer.headers += ["Depth"]
@@ -58,9 +61,46 @@ def print_starred_info(starred_info_set, repo_depth_map, verbosity):
         if verbosity >= 2:
             writer.headers += ["URL"]
 
-    writer.value_matrix = sorted(records, key=itemgetter(4, 0))  # sorted by depth
     writer.margin = 1
     writer.register_trans_func(bool_to_checkmark)
     writer.set_style("Starred", Style(align="center"))
     writer.set_style("Owner", Style(align="center"))
+
+    return writer
+
+
+def print_starred_info(starred_info_set, repo_depth_map, verbosity, target_map=None):
+    """
+    :param dict target_map:
+        Mapping of package names to targets that require the package.
+        Add the ``Targets`` column if specified.
+    """
+
+    # sorted by depth
+    starred_infos = sorted(
+        starred_info_set,
+        key=lambda info: (repo_depth_map[info.pypi_pkg_name.lower()], info.pypi_pkg_name),
+    )
+
+    writer = _make_writer(verbosity, target_map)
+    writer.value_matrix = [_to_record(info, repo_depth_map, target_map) for info in starred_infos]
     pager(writer.dumps())
+
+
+def print_starred_info_stream(
+    starred_info_iter, repo_depth_map, verbosity, target_map=None, stream=None
+):
+    """
+    Write a row for each of the starred information as soon as it is produced,
+    in the order of the iterator.
+    """
+
+    writer = _make_writer(verbosity, target_map)
+    if stream is not None:
+        writer.stream = stream
+
+    writer.iteration_length = -1
+    writer.value_matrix = (
+        [_to_record(info, repo_depth_map, target_map)] for info in starred_info_iter
+    )
+    writer.write_table_iter()
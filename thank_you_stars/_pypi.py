@@ -0,0 +1,126 @@
+from collections import OrderedDict
+
+import retryrequests
+
+from ._const import GITHUB_REPO_URL_REGEXP, Default
+from ._logger import logger
+
+
+_SCHEMA_VERSION = 1
+
+
+def project_pypi_info(pypi_info):
+    """
+    Project the ``info`` object of the PyPI JSON API to a compact record:
+    only the fields that used to find GitHub repositories are kept, and the description
+    is reduced to GitHub repository URLs found in it.
+    """
+
+    github_repo_urls = OrderedDict()
+    for match in GITHUB_REPO_URL_REGEXP.finditer(pypi_info.get("description") or ""):
+        github_repo_urls[match.group(0)] = None
+
+    return {
+        "schema_version": _SCHEMA_VERSION,
+        "name": pypi_info.get("name"),
+        "author_email": pypi_info.get("author_email"),
+        "home_page": pypi_info.get("home_page"),
+        "project_urls": pypi_info.get("project_urls") or {},
+        "github_repo_urls": list(github_repo_urls),
+    }
+
+
+def _is_projected(record):
+    return record.get("schema_version") == _SCHEMA_VERSION
+
+
+class PyPIClient:
+    """
+    Fetch package information from the PyPI JSON API with a keep-alive session.
+    Expired caches are revalidated with conditional requests.
+    """
+
+    def __init__(self, cache_mgr, base_url=Default.PYPI_URL):
+        self.__cache_mgr = cache_mgr
+        self.__base_url = base_url.rstrip("/")
+        self.__session = retryrequests.make_requests_session()
+
+    def fetch_info(self, pypi_pkg_name, revalidate=False):
+        """
+        :param bool revalidate:
+            Revalidate the cache with a conditional request even if the cache is fresh.
+        """
+
+        cache_filepath = self.__cache_mgr.get_pkg_cache_filepath(pypi_pkg_name, "pypi_desc")
+
+        if not revalidate and self.__cache_mgr.is_cache_available(cache_filepath, allow_stale=True):
+            logger.debug("load PyPI info cache: {}".format(cache_filepath))
+            self.__cache_mgr.revalidate(
+                cache_filepath, lambda: self.fetch_info(pypi_pkg_name, revalidate=True)
+            )
+
+            cache_data = self.__cache_mgr.load_json(cache_filepath)
+            if cache_data:
+                if _is_projected(cache_data):
+                    return cache_data
+
+                # upgrade a cache that stores the whole info object:
+                # the upgraded cache expires at the same time as the original one
+                logger.debug("upgrade PyPI info cache: {}".format(cache_filepath))
+                pypi_info = project_pypi_info(cache_data)
+                self.__cache_mgr.dump_json(cache_filepath, pypi_info, keep_mtime=True)
+
+                return pypi_info
+
+        validators_filepath = self.__cache_mgr.get_pkg_cache_filepath(
+            pypi_pkg_name, "pypi_desc_validators"
+        )
+        stale_data = self.__load_stale_json(cache_filepath)
+        validators = self.__load_stale_json(validators_filepath) if stale_data else None
+        headers = {}
+
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        r = self.__session.get("{}/{}/json".format(self.__base_url, pypi_pkg_name), headers=headers)
+
+        if r.status_code == 304:
+            logger.debug("PyPI info not modified: {}".format(pypi_pkg_name))
+            pypi_info = stale_data if _is_projected(stale_data) else project_pypi_info(stale_data)
+        elif r.status_code == 200:
+            pypi_info = project_pypi_info(r.json().get("info") or {})
+            validators = {
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+            }
+        else:
+            return None
+
+        logger.debug("write PyPI info cache: {}".format(cache_filepath))
+        self.__cache_mgr.dump_json(cache_filepath, pypi_info)
+        self.__cache_mgr.dump_json(validators_filepath, validators)
+
+        return pypi_info
+
+    def load_cached_info(self, pypi_pkg_name):
+        """
+        Return the cached package information regardless of the expiration,
+        without network access. ``None`` if not cached.
+        """
+
+        cache_data = self.__load_stale_json(
+            self.__cache_mgr.get_pkg_cache_filepath(pypi_pkg_name, "pypi_desc")
+        )
+        if not cache_data:
+            return None
+
+        return cache_data if _is_projected(cache_data) else project_pypi_info(cache_data)
+
+    def __load_stale_json(self, cache_filepath):
+        try:
+            return self.__cache_mgr.load_json(cache_filepath)
+        except OSError:
+            return None
@@ -0,0 +1,188 @@
+import threading
+import time
+
+from github.GithubException import RateLimitExceededException
+
+from ._const import Default
+from ._logger import logger
+
+
+class RateLimitBucket:
+    """
+    Rate limit resources of the GitHub API: each of them has an independent budget.
+    """
+
+    CORE = "core"
+    SEARCH = "search"
+    CODE_SEARCH = "code_search"
+    GRAPHQL = "graphql"
+
+
+class RateLimitExhausted(RateLimitExceededException):
+    """
+    Raised when the budget of a bucket is exhausted and waiting for the reset
+    costs more than the limit of the scheduler.
+    """
+
+    def __init__(self, bucket, reset_at):
+        super().__init__(
+            403,
+            {
+                "message": "API rate limit exhausted: bucket={}, reset_at={}".format(
+                    bucket, reset_at
+                )
+            },
+            None,
+        )
+        self.bucket = bucket
+        self.reset_at = reset_at
+
+
+def detect_rate_limit_bucket(path):
+    """
+    Detect the rate limit bucket of a GitHub REST API path.
+    """
+
+    if path.startswith("/graphql"):
+        return RateLimitBucket.GRAPHQL
+    if path.startswith("/search/code"):
+        return RateLimitBucket.CODE_SEARCH
+    if path.startswith("/search/"):
+        return RateLimitBucket.SEARCH
+
+    return RateLimitBucket.CORE
+
+
+class _BucketState:
+    def __init__(self):
+        self.remaining = None
+        self.reset_at = None
+
+
+class RateLimitScheduler:
+    """
+    Track the budgets of rate limit buckets from response headers, and throttle requests:
+    a request to an exhausted bucket waits until the reset if the wait is shorter than
+    ``max_wait_seconds``, otherwise |RateLimitExhausted| raised.
+    """
+
+    def __init__(
+        self, max_wait_seconds=Default.RATE_LIMIT_MAX_WAIT_SECONDS, clock=time.time, margin=1.0
+    ):
+        self.__max_wait_seconds = max_wait_seconds
+        self.__clock = clock
+        self.__margin = margin
+        self.__state_map = {}
+        self.__cond = threading.Condition()
+
+    def __get_state(self, bucket):
+        state = self.__state_map.get(bucket)
+        if state is None:
+            state = _BucketState()
+            self.__state_map[bucket] = state
+
+        return state
+
+    def get_wait_seconds(self, bucket):
+        """
+        Return seconds to wait before the next request to ``bucket``:
+        ``0`` if the bucket has budget.
+        """
+
+        with self.__cond:
+            return self.__get_wait_seconds(self.__get_state(bucket))
+
+    def __get_wait_seconds(self, state):
+        if state.remaining is None or state.remaining > 0 or state.reset_at is None:
+            return 0
+
+        return max(0, state.reset_at - self.__clock() + self.__margin)
+
+    def can_wait(self, bucket):
+        return self.get_wait_seconds(bucket) <= self.__max_wait_seconds
+
+    def acquire(self, bucket):
+        """
+        Reserve a request of ``bucket``. Block until the reset of the bucket if the budget is
+        exhausted.
+
+        :raises RateLimitExhausted: If the wait is longer than ``max_wait_seconds``.
+        """
+
+        with self.__cond:
+            state = self.__get_state(bucket)
+
+            while True:
+                wait_seconds = self.__get_wait_seconds(state)
+                if wait_seconds <= 0:
+                    break
+
+                if wait_seconds > self.__max_wait_seconds:
+                    raise RateLimitExhausted(bucket, state.reset_at)
+
+                logger.info(
+                    "rate limit exhausted, wait {:.0f} seconds for the reset: bucket={}".format(
+                        wait_seconds, bucket
+                    )
+                )
+                self.__cond.wait(wait_seconds)
+
+                if self.__get_wait_seconds(state) <= 0:
+                    # budget of the bucket is unknown until the next response after the reset
+                    state.remaining = None
+
+            if state.remaining is not None:
+                state.remaining -= 1
+
+    def update(self, bucket, remaining, reset_at):
+        with self.__cond:
+            state = self.__get_state(bucket)
+            state.remaining = remaining
+            state.reset_at = reset_at
+
+            self.__cond.notify_all()
+
+    def update_from_headers(self, bucket, headers):
+        """
+        Update the budget of a bucket from ``X-RateLimit-*`` response headers.
+        ``X-RateLimit-Resource`` header takes precedence over ``bucket`` if exists.
+        """
+
+        if not headers:
+            return
+
+        headers = {key.lower(): value for key, value in headers.items()}
+
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+            reset_at = float(headers["x-ratelimit-reset"])
+        except (KeyError, TypeError, ValueError):
+            return
+
+        self.update(headers.get("x-ratelimit-resource", bucket), remaining, reset_at)
+
+    def run(self, bucket, func, *args, **kwargs):
+        """
+        Call ``func`` that sends requests to ``bucket`` under the rate limit.
+        The call is retried after the reset if the rate limit exceeded and the wait is
+        cheap enough.
+        """
+
+        while True:
+            self.acquire(bucket)
+
+            try:
+                return func(*args, **kwargs)
+            except RateLimitExhausted:
+                raise
+            except RateLimitExceededException as e:
+                self.update_from_headers(bucket, e.headers)
+
+                with self.__cond:
+                    state = self.__get_state(bucket)
+                    state.remaining = 0
+                    wait_seconds = self.__get_wait_seconds(state)
+
+                if wait_seconds <= 0 or wait_seconds > self.__max_wait_seconds:
+                    # the reset time is unknown, or not worth to wait
+                    raise
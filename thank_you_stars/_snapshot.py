@@ -0,0 +1,284 @@
+import json
+import time
+from collections import deque, namedtuple
+from operator import itemgetter
+
+from ._const import StarStatus
+from ._extractor import GitHubStarredInfo
+from ._mapping import MappingSource, RepoMapping, make_repo_mapping
+from ._pip_show import PipShow
+
+
+_SCHEMA_VERSION = 1
+
+_User = namedtuple("_User", "login")
+
+
+def _make_pip_show_map(pypi_pkg_names):
+    pip_show_map = {}
+
+    for pypi_pkg_name in sorted({pypi_pkg_name.lower() for pypi_pkg_name in pypi_pkg_names}):
+        pip_show = PipShow.find(pypi_pkg_name)
+        if pip_show is not None:
+            pip_show_map[pypi_pkg_name] = pip_show.content
+
+    return pip_show_map
+
+
+def traverse_preloaded_packages(pypi_pkg_name_queue, max_depth):
+    """
+    Return depths of packages and their dependencies with preloaded ``pip show`` results only,
+    as the same as :py:meth:`GithubStarredInfoExtractor.list_pypi_packages`.
+    Packages without the results are included without their dependencies.
+
+    :return:
+        Pair of the depth map and the names of packages that could not traverse
+        without ``pip show`` results.
+    """
+
+    depth_map = {}
+    missing_pkg_names = []
+    queue = deque(sorted(pypi_pkg_name_queue, key=itemgetter(1)))
+
+    while queue:
+        pypi_pkg_name, depth = queue.popleft()
+        if pypi_pkg_name in depth_map:
+            continue
+
+        depth_map[pypi_pkg_name] = depth
+        if depth >= max_depth:
+            continue
+
+        pip_show = PipShow.find(pypi_pkg_name)
+        if pip_show is None:
+            missing_pkg_names.append(pypi_pkg_name)
+            continue
+
+        for require_package in pip_show.extract_requires():
+            queue.append((require_package.lower(), depth + 1))
+
+    return (depth_map, missing_pkg_names)
+
+
+class OfflineGithubClient:
+    """
+    GitHub client for the offline mode: the user is known from a snapshot,
+    and any of GitHub API calls is an error.
+    """
+
+    def __init__(self, user_name):
+        self.__user = _User(login=user_name)
+
+    def get_user(self):
+        return self.__user
+
+    def call(self, bucket, func, *args):
+        raise RuntimeError("GitHub API is not available in the offline mode")
+
+
+class Snapshot:
+    """
+    Bundle of the information that required to answer ``--check`` without network access:
+    starred repositories of a user, package to repository mappings,
+    ``pip show`` results and PyPI information of packages.
+    """
+
+    @property
+    def user_name(self):
+        return self.__user_name
+
+    @property
+    def created_at(self):
+        return self.__created_at
+
+    @property
+    def starred_repo_ids(self):
+        return self.__starred_repo_ids
+
+    @property
+    def repo_mappings(self):
+        return list(self.__repo_mapping_map.values())
+
+    @property
+    def pip_show_map(self):
+        return self.__pip_show_map
+
+    @property
+    def pypi_info_map(self):
+        return self.__pypi_info_map
+
+    def __init__(
+        self,
+        user_name,
+        created_at,
+        starred_repo_ids,
+        repo_mappings,
+        not_found_pkg_names,
+        pip_show_map,
+        pypi_info_map,
+    ):
+        self.__user_name = user_name
+        self.__created_at = created_at
+        self.__starred_repo_ids = list(starred_repo_ids)
+        self.__repo_mapping_map = {mapping.pypi_pkg_name: mapping for mapping in repo_mappings}
+        self.__not_found_pkg_names = set(not_found_pkg_names)
+        self.__pip_show_map = dict(pip_show_map)
+        self.__pypi_info_map = dict(pypi_info_map)
+
+    @classmethod
+    def build(
+        cls,
+        user_name,
+        starred_infos,
+        starred_repo_index,
+        repo_mapping_db=None,
+        pypi_client=None,
+        pip_pkg_names=None,
+    ):
+        """
+        Build a snapshot from the results of an execution.
+
+        :param pip_pkg_names:
+            Packages to bundle ``pip show`` results: all of the packages of the dependency graph,
+            so that the graph can be traversed offline.
+            Defaults to the packages of ``starred_infos``.
+        """
+
+        repo_mappings = []
+        not_found_pkg_names = []
+
+        for info in starred_infos:
+            pypi_pkg_name = info.pypi_pkg_name.lower()
+
+            if info.star_status == StarStatus.NOT_FOUND:
+                not_found_pkg_names.append(pypi_pkg_name)
+                continue
+            if info.star_status not in (StarStatus.STARRED, StarStatus.NOT_STARRED):
+                continue
+
+            mapping = repo_mapping_db.get(pypi_pkg_name) if repo_mapping_db else None
+            if mapping is None or mapping.repo_id != info.github_repo_id:
+                mapping = make_repo_mapping(
+                    pypi_pkg_name, info.github_repo_id, MappingSource.STARRED_INFO
+                )
+
+            repo_mappings.append(mapping)
+
+        pypi_pkg_names = sorted(
+            [mapping.pypi_pkg_name for mapping in repo_mappings] + not_found_pkg_names
+        )
+        if pip_pkg_names is None:
+            pip_pkg_names = [info.pypi_pkg_name for info in starred_infos]
+
+        pypi_info_map = {}
+        if pypi_client is not None:
+            for pypi_pkg_name in pypi_pkg_names:
+                pypi_info = pypi_client.load_cached_info(pypi_pkg_name)
+                if pypi_info:
+                    pypi_info_map[pypi_pkg_name] = pypi_info
+
+        return cls(
+            user_name=user_name,
+            created_at=time.time(),
+            starred_repo_ids=sorted(starred_repo_index),
+            repo_mappings=repo_mappings,
+            not_found_pkg_names=not_found_pkg_names,
+            pip_show_map=_make_pip_show_map(pip_pkg_names),
+            pypi_info_map=pypi_info_map,
+        )
+
+    def dump(self, filepath):
+        with open(filepath, "w", encoding="utf8") as f:
+            json.dump(
+                {
+                    "schema_version": _SCHEMA_VERSION,
+                    "user_name": self.__user_name,
+                    "created_at": self.__created_at,
+                    "starred_repo_ids": self.__starred_repo_ids,
+                    "mapping_fields": RepoMapping._fields,
+                    "repo_mappings": [list(mapping) for mapping in self.repo_mappings],
+                    "not_found": sorted(self.__not_found_pkg_names),
+                    "pip_show": self.__pip_show_map,
+                    "pypi_info": self.__pypi_info_map,
+                },
+                f,
+                separators=(",", ":"),
+            )
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        :raises ValueError: If the file is not a snapshot of the supported schema.
+        """
+
+        with open(filepath, encoding="utf8") as f:
+            data = json.load(f)
+
+        if not isinstance(data, dict) or data.get("schema_version") != _SCHEMA_VERSION:
+            raise ValueError("unsupported snapshot file: {}".format(filepath))
+
+        fields = data["mapping_fields"]
+
+        return cls(
+            user_name=data["user_name"],
+            created_at=data["created_at"],
+            starred_repo_ids=data["starred_repo_ids"],
+            repo_mappings=[
+                RepoMapping(**dict(zip(fields, values))) for values in data["repo_mappings"]
+            ],
+            not_found_pkg_names=data["not_found"],
+            pip_show_map=data["pip_show"],
+            pypi_info_map=data["pypi_info"],
+        )
+
+    def get_starred_info(self, pypi_pkg_name, starred_repo_index, lifetime_seconds, now=None):
+        """
+        :return:
+            Pair of |GitHubStarredInfo| and the stale status of the entry:
+            ``None`` if up to date, ``"stale"`` if older than ``lifetime_seconds``,
+            ``"missing"`` if the package is not in the snapshot.
+        """
+
+        if now is None:
+            now = time.time()
+
+        mapping = self.__repo_mapping_map.get(pypi_pkg_name.lower())
+
+        if mapping is None:
+            if pypi_pkg_name.lower() in self.__not_found_pkg_names:
+                info = GitHubStarredInfo(
+                    pypi_pkg_name=pypi_pkg_name,
+                    github_repo_id="[Repository not found]",
+                    star_status=StarStatus.NOT_FOUND,
+                    is_owned=None,
+                    url=None,
+                )
+                updated_at = self.__created_at
+            else:
+                return (
+                    GitHubStarredInfo(
+                        pypi_pkg_name=pypi_pkg_name,
+                        github_repo_id="[Not in the snapshot]",
+                        star_status=StarStatus.NOT_AVAILABLE,
+                        is_owned=None,
+                        url=None,
+                    ),
+                    "missing",
+                )
+        else:
+            repo_id = mapping.repo_id
+            info = GitHubStarredInfo(
+                pypi_pkg_name=pypi_pkg_name,
+                github_repo_id=repo_id,
+                star_status=StarStatus.STARRED
+                if repo_id in starred_repo_index
+                else StarStatus.NOT_STARRED,
+                is_owned=repo_id.split("/", 1)[0] == self.__user_name,
+                url="https://github.com/{}".format(repo_id),
+            )
+            updated_at = min(mapping.updated_at, self.__created_at)
+
+        if now - updated_at > lifetime_seconds:
+            return (info, "stale")
+
+        return (info, None)
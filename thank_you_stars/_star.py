@@ -0,0 +1,129 @@
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import quote
+
+import msgfy
+from requests.exceptions import RequestException
+
+from ._const import Default
+from ._logger import logger
+from ._ratelimit import RateLimitExhausted
+
+
+StarResult = namedtuple("StarResult", "repo_id is_success message")
+
+NOT_FOUND_MESSAGE = (
+    "repository not found, or the personal access token may not has public_repo scope"
+)
+
+
+def make_star_path(repo_id):
+    owner, _, name = repo_id.partition("/")
+
+    return "/user/starred/{}/{}".format(quote(owner, safe=""), quote(name, safe=""))
+
+
+def get_retry_wait_seconds(status_code, headers, text, retry_count, backoff_factor):
+    """
+    Return seconds to wait before retrying a starring request that failed,
+    ``None`` if the request is not worth to retry.
+    """
+
+    if status_code not in (403, 429):
+        return None
+
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+    if headers.get("X-RateLimit-Remaining") == "0":
+        # primary rate limit: not worth to wait until reset
+        return None
+
+    if "secondary rate limit" in text.lower():
+        return backoff_factor * (2**retry_count)
+
+    return None
+
+
+class StarringEngine:
+    """
+    Star GitHub repositories concurrently with ``PUT /user/starred/{owner}/{repo}``.
+    Requests that hit secondary rate limits are retried with backoff.
+    """
+
+    def __init__(
+        self, rest_client, max_workers=Default.MAX_WORKERS, max_retries=5, backoff_factor=2.0
+    ):
+        self.__rest_client = rest_client
+        self.__max_workers = max_workers
+        self.__max_retries = max_retries
+        self.__backoff_factor = backoff_factor
+
+    def star(self, repo_ids):
+        """
+        Return |StarResult| for each of the repositories in the same order as ``repo_ids``.
+        """
+
+        if not repo_ids:
+            return []
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            return list(executor.map(self.__star, repo_ids))
+
+    def star_iter(self, repo_ids):
+        """
+        Star repositories while ``repo_ids`` is being produced,
+        and yield |StarResult| in the order of completion.
+        """
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            futures = set()
+
+            for repo_id in repo_ids:
+                futures.add(executor.submit(self.__star, repo_id))
+
+                done_futures = {future for future in futures if future.done()}
+                futures -= done_futures
+                for future in done_futures:
+                    yield future.result()
+
+            for future in as_completed(futures):
+                yield future.result()
+
+    def __star(self, repo_id):
+        path = make_star_path(repo_id)
+
+        retry_count = 0
+
+        while True:
+            try:
+                r = self.__rest_client.request("PUT", path, headers={"Content-Length": "0"})
+            except (RequestException, RateLimitExhausted) as e:
+                return StarResult(repo_id, False, msgfy.to_error_message(e))
+
+            if r.status_code == 204:
+                return StarResult(repo_id, True, "starred")
+
+            if r.status_code == 404:
+                return StarResult(repo_id, False, NOT_FOUND_MESSAGE)
+
+            wait_seconds = get_retry_wait_seconds(
+                r.status_code, r.headers, r.text, retry_count, self.__backoff_factor
+            )
+            if wait_seconds is None or retry_count >= self.__max_retries:
+                return StarResult(
+                    repo_id, False, "status={}: {}".format(r.status_code, r.text.strip())
+                )
+
+            logger.debug(
+                "secondary rate limit exceeded, retry after {:.1f} seconds: {}".format(
+                    wait_seconds, repo_id
+                )
+            )
+            time.sleep(wait_seconds)
+            retry_count += 1
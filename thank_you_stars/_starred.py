@@ -1,31 +1,358 @@
-from ._common import get_github_repo_id
+import mmap
+import time
+from datetime import datetime, timezone
+
+from ._const import Default
 from ._logger import logger
 
 
-def fetch_starred_repo_list(github_client, cache_mgr):
-    github_user = github_client.get_user()
-    cache_filepath = cache_mgr.get_misc_cache_filepath(github_user.login, "starred")
+_CACHE_FILENAME = "starred_repos"
+_INDEX_CACHE_FILENAME = "starred_index"
+_SCHEMA_VERSION = 1
+_PER_PAGE = 100
+_COUNT_CHUNK_SIZE = 64 * 1024
+_FULL_SYNC_INTERVAL_SECONDS = Default.STARRED_FULL_SYNC_DAYS * 24 * (60**2)
+
+
+class StarredRepoIndex:
+    """
+    Set of starred repository ids. Repository ids are compared case-insensitively
+    since GitHub owner/repository names are case-insensitive.
+    """
+
+    @staticmethod
+    def normalize(repo_id):
+        return repo_id.casefold()
+
+    def __init__(self, repo_ids=()):
+        self.__repo_ids = {self.normalize(repo_id) for repo_id in repo_ids}
+
+    def __contains__(self, repo_id):
+        return self.normalize(repo_id) in self.__repo_ids
+
+    def __iter__(self):
+        return iter(self.__repo_ids)
+
+    def __len__(self):
+        return len(self.__repo_ids)
+
+    def add(self, repo_id):
+        self.__repo_ids.add(self.normalize(repo_id))
+
+    def dumps(self):
+        """
+        Serialize to the compact form: normalized repository ids that sorted by
+        UTF-8 byte order, one per line.
+        """
+
+        return "".join(
+            "{}\n".format(repo_id)
+            for repo_id in sorted(self, key=lambda repo_id: repo_id.encode("utf8"))
+        )
+
+    @classmethod
+    def loads(cls, text):
+        index = cls()
+        index.__repo_ids = set(text.splitlines())
+
+        return index
+
+    @classmethod
+    def load(cls, cache_mgr, cache_filepath):
+        local_filepath = cache_mgr.get_local_filepath(cache_filepath)
+
+        if local_filepath is not None and local_filepath.size >= Default.MMAP_THRESHOLD_BYTES:
+            logger.debug("memory-map starred repositories index: {}".format(local_filepath))
+            return MappedStarredRepoIndex(local_filepath)
+
+        return cls.loads(cache_mgr.read_text(cache_filepath))
+
+
+class MappedStarredRepoIndex:
+    """
+    Starred repositories index that looks up the memory-mapped compact form with binary
+    search, without loading all of the repository ids.
+    """
+
+    @property
+    def closed(self):
+        return self.__mmap is None
+
+    def __init__(self, filepath):
+        self.__filepath = filepath
+        self.__mmap = None
+        self.__added_repo_ids = set()
+
+        self.__open()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __open(self):
+        with open(self.__filepath, "rb") as f:
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """
+        Release the memory map: a memory-mapped file can not be replaced on Windows.
+        """
+
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+
+    def reload(self):
+        """
+        Map the file again after the file is rewritten with the result of :py:meth:`dumps`,
+        which includes the added repository ids.
+        """
+
+        self.close()
+        self.__open()
+        self.__added_repo_ids = set()
+
+    def __contains__(self, repo_id):
+        repo_id = StarredRepoIndex.normalize(repo_id)
+
+        if repo_id in self.__added_repo_ids:
+            return True
+
+        key = repo_id.encode("utf8")
+        lo, hi = 0, len(self.__mmap)
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            begin = self.__mmap.rfind(b"\n", 0, mid) + 1
+            end = self.__mmap.find(b"\n", begin)
+            if end < 0:
+                end = len(self.__mmap)
+
+            line = self.__mmap[begin:end]
+            if line == key:
+                return True
+
+            if line < key:
+                lo = end + 1
+            else:
+                hi = begin
+
+        return False
+
+    def __iter__(self):
+        self.__mmap.seek(0)
+
+        for line in iter(self.__mmap.readline, b""):
+            yield line.rstrip(b"\n").decode("utf8")
+
+        for repo_id in self.__added_repo_ids:
+            yield repo_id
+
+    def __len__(self):
+        # count lines by chunks not to copy the whole file
+        line_count = sum(
+            self.__mmap[offset : offset + _COUNT_CHUNK_SIZE].count(b"\n")
+            for offset in range(0, len(self.__mmap), _COUNT_CHUNK_SIZE)
+        )
+
+        return line_count + len(self.__added_repo_ids)
+
+    def add(self, repo_id):
+        if repo_id not in self:
+            self.__added_repo_ids.add(StarredRepoIndex.normalize(repo_id))
+
+    def dumps(self):
+        return StarredRepoIndex(self).dumps()
+
+
+def _load_starred_record(cache_mgr, cache_filepath):
+    try:
+        record = cache_mgr.load_json(cache_filepath)
+    except OSError:
+        return None
+
+    if not isinstance(record, dict) or record.get("schema_version") != _SCHEMA_VERSION:
+        return None
+
+    return record
 
-    if cache_mgr.is_cache_available(cache_filepath):
+
+def _fetch_starred_page(rest_client, page, etag=None):
+    headers = {"Accept": "application/vnd.github.v3.star+json"}
+    if etag:
+        headers["If-None-Match"] = etag
+
+    r = rest_client.request(
+        "GET",
+        "/user/starred",
+        params={"sort": "created", "direction": "desc", "per_page": _PER_PAGE, "page": page},
+        headers=headers,
+    )
+    if r.status_code != 304:
+        r.raise_for_status()
+
+    return r
+
+
+def _sync_starred_record(rest_client, record):
+    """
+    Fetch starred repositories newest first, until reaching a repository that already
+    recorded. Repositories unstarred outside of the tool are removed only by a full sync,
+    which happens when no recorded repository found in the fetched pages, or when
+    the last full sync is older than ``Default.STARRED_FULL_SYNC_DAYS``.
+    """
+
+    synced_at = record.get("synced_at") if record else None
+    is_full_sync = synced_at is None or time.time() - synced_at >= _FULL_SYNC_INTERVAL_SECONDS
+    if is_full_sync and record:
+        # unstarring an older repository does not change the first page,
+        # so the first page is fetched without the validator either
+        logger.debug("full sync of starred repositories: last full sync={}".format(synced_at))
+        record = None
+
+    etag = record.get("etag") if record else None
+    r = _fetch_starred_page(rest_client, page=1, etag=etag)
+
+    if r.status_code == 304:
+        logger.debug("starred repositories not modified: etag={}".format(etag))
+        return record
+
+    known_repos = set()
+    if record:
+        known_repos = {
+            (repo["repo_id"], repo["starred_at"]) for repo in record["repos"] if not repo["local"]
+        }
+
+    fetched_repos = []
+    is_overlapped = False
+    page = 1
+    etag = r.headers.get("ETag")
+
+    while True:
+        for item in r.json():
+            repo = {
+                "repo_id": item["repo"]["full_name"],
+                "starred_at": item["starred_at"],
+                "local": False,
+            }
+
+            if (repo["repo_id"], repo["starred_at"]) in known_repos:
+                is_overlapped = True
+                break
+
+            fetched_repos.append(repo)
+
+        if is_overlapped or "next" not in r.links:
+            break
+
+        page += 1
+        r = _fetch_starred_page(rest_client, page=page)
+
+    logger.debug(
+        "fetched starred repositories: pages={}, repos={}, incremental={}".format(
+            page, len(fetched_repos), is_overlapped
+        )
+    )
+
+    repos = fetched_repos
+    if is_overlapped:
+        fetched_repo_ids = {repo["repo_id"] for repo in fetched_repos}
+        repos += [
+            repo
+            for repo in record["repos"]
+            if repo["repo_id"] not in fetched_repo_ids and not repo["local"]
+        ]
+    else:
+        synced_at = time.time()
+
+    return {"schema_version": _SCHEMA_VERSION, "etag": etag, "synced_at": synced_at, "repos": repos}
+
+
+def fetch_starred_repo_list(rest_client, user_name, cache_mgr):
+    cache_filepath = cache_mgr.get_misc_cache_filepath(user_name, _CACHE_FILENAME)
+    record = _load_starred_record(cache_mgr, cache_filepath)
+
+    if record and cache_mgr.is_cache_available(cache_filepath):
         logger.debug(
-            "load starred repositories cache: user={}, path={}".format(
-                github_user.login, cache_filepath
-            )
+            "load starred repositories cache: user={}, path={}".format(user_name, cache_filepath)
         )
-        with cache_filepath.open() as f:
-            return [line.strip() for line in f]
+        return [repo["repo_id"] for repo in record["repos"]]
+
+    record = _sync_starred_record(rest_client, record)
 
     logger.debug(
-        "write starred repositories cache: user={}, path={}".format(
-            github_user.login, cache_filepath
+        "write starred repositories cache: user={}, path={}".format(user_name, cache_filepath)
+    )
+    cache_mgr.dump_json(cache_filepath, record)
+
+    return [repo["repo_id"] for repo in record["repos"]]
+
+
+def fetch_starred_repo_index(rest_client, user_name, cache_mgr):
+    cache_filepath = cache_mgr.get_misc_cache_filepath(user_name, _CACHE_FILENAME)
+    index_cache_filepath = cache_mgr.get_misc_cache_filepath(user_name, _INDEX_CACHE_FILENAME)
+
+    if cache_mgr.is_cache_available(cache_filepath) and cache_mgr.is_cache_available(
+        index_cache_filepath
+    ):
+        logger.debug(
+            "load starred repositories index cache: user={}, path={}".format(
+                user_name, index_cache_filepath
+            )
         )
+        return StarredRepoIndex.load(cache_mgr, index_cache_filepath)
+
+    index = StarredRepoIndex(fetch_starred_repo_list(rest_client, user_name, cache_mgr))
+    cache_mgr.write_text(index_cache_filepath, index.dumps())
+
+    return index
+
+
+def add_starred_repos(cache_mgr, user_name, repo_ids, index=None):
+    """
+    Record repositories that starred by the tool to the starred repositories cache
+    and the index, instead of discarding the cache.
+    """
+
+    cache_filepath = cache_mgr.get_misc_cache_filepath(user_name, _CACHE_FILENAME)
+    record = _load_starred_record(cache_mgr, cache_filepath)
+
+    if index is not None:
+        for repo_id in repo_ids:
+            index.add(repo_id)
+
+    if not record:
+        cache_mgr.remove_misc_cache(user_name, _INDEX_CACHE_FILENAME)
+        return
+
+    starred_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    record["repos"] = [
+        {"repo_id": repo_id, "starred_at": starred_at, "local": True} for repo_id in repo_ids
+    ] + record["repos"]
+
+    logger.debug(
+        "add starred repositories to the cache: user={}, repos={}".format(user_name, repo_ids)
     )
-    starred_repo_list = []
-    with cache_filepath.open(mode="w") as f:
-        for repo in github_user.get_starred():
-            repo_id = get_github_repo_id(repo)
+    cache_mgr.dump_json(cache_filepath, record)
+
+    if index is not None:
+        _write_index(
+            cache_mgr, cache_mgr.get_misc_cache_filepath(user_name, _INDEX_CACHE_FILENAME), index
+        )
+
+
+def _write_index(cache_mgr, cache_filepath, index):
+    text = index.dumps()
 
-            f.write("{}\n".format(repo_id))
-            starred_repo_list.append(repo_id)
+    if not isinstance(index, MappedStarredRepoIndex):
+        cache_mgr.write_text(cache_filepath, text)
+        return
 
-    return starred_repo_list
+    # release the memory map before replacing the mapped file
+    index.close()
+    try:
+        cache_mgr.write_text(cache_filepath, text)
+    finally:
+        index.reload()
@@ -0,0 +1,500 @@
+import heapq
+import json
+import os.path
+import re
+import sys
+from collections import OrderedDict, deque, namedtuple
+
+from subprocrunner import SubprocessRunner
+
+from ._logger import logger
+from ._pip_show import PipShow, compute_depth_map, extract_requirement_name
+
+
+try:
+    from packaging.markers import (
+        InvalidMarker,
+        Marker,
+        UndefinedComparison,
+        UndefinedEnvironmentName,
+    )
+except ImportError:
+    InvalidMarker = Marker = UndefinedComparison = UndefinedEnvironmentName = None
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+
+Target = namedtuple("Target", "label pypi_pkg_names depth_map")
+# depths of packages: ``None`` if every package of the target is a root package
+Target.__new__.__defaults__ = (None,)
+
+_LOCK_FILENAMES = ("poetry.lock", "pdm.lock", "uv.lock", "Pipfile.lock")
+_REQUIREMENT_OPTION_REGEXP = re.compile(r"^(-r|--requirement|-c|--constraint)(\s+|=)(?P<path>.+)$")
+
+
+def _normalize_name(name):
+    return name.strip().lower()
+
+
+def _is_marker_satisfied(marker):
+    """
+    Evaluate an environment marker with the running environment.
+    Markers that could not evaluate are regarded as satisfied.
+    """
+
+    if not marker or Marker is None:
+        return True
+
+    try:
+        return Marker(marker).evaluate({"extra": ""})
+    except (InvalidMarker, UndefinedComparison, UndefinedEnvironmentName) as e:
+        logger.debug("failed to evaluate a marker: {}: {}".format(marker, e))
+        return True
+
+
+def _is_spec_satisfied(spec):
+    """
+    Return ``True`` if a dependency specification of a TOML file is required for
+    the running environment: a version string, a table that may have ``markers`` and
+    ``optional`` keys, or a list of the tables.
+    """
+
+    if isinstance(spec, list):
+        return any(_is_spec_satisfied(item) for item in spec)
+
+    if not isinstance(spec, dict):
+        return True
+
+    if spec.get("optional"):
+        return False
+
+    return _is_marker_satisfied(spec.get("markers") or spec.get("marker"))
+
+
+def _iter_dependency_specs(package):
+    """
+    Yield pairs of a dependency name and the specification of a ``[[package]]`` table of
+    a lock file: ``poetry.lock`` has a table of dependencies, ``uv.lock`` has a list.
+    """
+
+    dependencies = package.get("dependencies") or []
+
+    if isinstance(dependencies, dict):
+        yield from dependencies.items()
+        return
+
+    for dependency in dependencies:
+        if isinstance(dependency, dict) and dependency.get("name"):
+            yield (dependency["name"], dependency)
+
+
+def _load_toml(filepath):
+    if tomllib is None:
+        raise ValueError("tomli package is required to read {}: pip install tomli".format(filepath))
+
+    with open(filepath, "rb") as f:
+        return tomllib.load(f)
+
+
+def parse_requirements_file(filepath, _visited=None):
+    """
+    Return package names in a pip requirements file. Nested ``-r`` files are followed.
+    Editable/URL requirements and options are ignored.
+    """
+
+    visited = _visited if _visited is not None else set()
+    filepath = os.path.abspath(filepath)
+    if filepath in visited:
+        return []
+    visited.add(filepath)
+
+    pypi_pkg_names = []
+
+    with open(filepath, encoding="utf8") as f:
+        for line in f:
+            line = line.split(" #", 1)[0].strip()
+            if not line or line.startswith("#"):
+                continue
+
+            match = _REQUIREMENT_OPTION_REGEXP.search(line)
+            if match:
+                if match.group(1) in ("-r", "--requirement"):
+                    pypi_pkg_names.extend(
+                        parse_requirements_file(
+                            os.path.join(os.path.dirname(filepath), match.group("path").strip()),
+                            visited,
+                        )
+                    )
+                continue
+
+            if line.startswith("-"):
+                logger.debug("skip a requirement option: {}".format(line))
+                continue
+
+            pypi_pkg_name = extract_requirement_name(line)
+            if pypi_pkg_name:
+                pypi_pkg_names.append(_normalize_name(pypi_pkg_name))
+
+    return pypi_pkg_names
+
+
+def parse_pyproject_file(filepath):
+    """
+    Return dependencies of a ``pyproject.toml``: ``[project]`` dependencies (PEP 621) or
+    ``[tool.poetry.dependencies]``.
+    """
+
+    data = _load_toml(filepath)
+    pypi_pkg_names = []
+
+    for requirement in data.get("project", {}).get("dependencies", []):
+        pypi_pkg_name = extract_requirement_name(requirement)
+        if pypi_pkg_name:
+            pypi_pkg_names.append(_normalize_name(pypi_pkg_name))
+
+    poetry_deps = data.get("tool", {}).get("poetry", {}).get("dependencies", {})
+    pypi_pkg_names.extend(
+        _normalize_name(name)
+        for name, spec in poetry_deps.items()
+        if name != "python" and _is_spec_satisfied(spec)
+    )
+
+    return pypi_pkg_names
+
+
+def _is_uv_project(package):
+    # the project itself and workspace members of uv.lock are sourced from local directories
+    source = package.get("source") or {}
+
+    return isinstance(source, dict) and ("editable" in source or "virtual" in source)
+
+
+def _load_lock_packages(filepath):
+    """
+    :return:
+        Tuple of locked package names, a mapping of the names to the names of
+        their locked dependencies, and names of the projects in the lock file.
+        The mapping is ``None`` for ``Pipfile.lock`` that has no dependency edges.
+        Packages are excluded if the environment markers of the package, or of every
+        dependency to the package, are not satisfied by the running environment.
+    """
+
+    if os.path.basename(filepath) == "Pipfile.lock":
+        with open(filepath, encoding="utf8") as f:
+            data = json.load(f)
+
+        pypi_pkg_names = [
+            _normalize_name(name)
+            for section in ("default", "develop")
+            for name, spec in data.get(section, {}).items()
+            if _is_spec_satisfied(spec)
+        ]
+
+        return (pypi_pkg_names, None, [])
+
+    packages = _load_toml(filepath).get("package", [])
+    required_map = {}
+    for package in packages:
+        for name, spec in _iter_dependency_specs(package):
+            name = _normalize_name(name)
+            required_map[name] = required_map.get(name, False) or _is_spec_satisfied(spec)
+
+    require_map = OrderedDict()
+    project_names = []
+    for package in packages:
+        name = _normalize_name(package["name"])
+        if not _is_marker_satisfied(package.get("markers") or package.get("marker")):
+            continue
+        if not required_map.get(name, True):
+            continue
+
+        require_map[name] = [
+            _normalize_name(require_name)
+            for require_name, spec in _iter_dependency_specs(package)
+            if _is_spec_satisfied(spec)
+        ]
+        if _is_uv_project(package):
+            project_names.append(name)
+
+    for name, require_names in require_map.items():
+        require_map[name] = [
+            require_name for require_name in require_names if require_name in require_map
+        ]
+
+    return (list(require_map), require_map, project_names)
+
+
+def _load_direct_dependencies(filepath):
+    """
+    Return names of the direct dependencies of the project of a lock file:
+    read from ``Pipfile`` or ``pyproject.toml`` next to the lock file.
+    ``None`` if the project file does not exist.
+    """
+
+    dirpath = os.path.dirname(os.path.abspath(filepath))
+
+    if os.path.basename(filepath) == "Pipfile.lock":
+        pipfile_path = os.path.join(dirpath, "Pipfile")
+        if not os.path.isfile(pipfile_path) or tomllib is None:
+            # Pipfile.lock itself is readable without TOML parsers
+            return None
+
+        data = _load_toml(pipfile_path)
+
+        return [
+            _normalize_name(name)
+            for section in ("packages", "dev-packages")
+            for name in data.get(section, {})
+        ]
+
+    pyproject_path = os.path.join(dirpath, "pyproject.toml")
+    if not os.path.isfile(pyproject_path):
+        return None
+
+    return parse_pyproject_file(pyproject_path) or None
+
+
+def _compute_lock_depth_map(require_map, root_names):
+    depth_map = OrderedDict()
+    queue = deque((name, 0) for name in root_names if name in require_map)
+
+    while queue:
+        name, depth = queue.popleft()
+        if name in depth_map:
+            continue
+
+        depth_map[name] = depth
+        queue.extend(
+            (require_name, depth + 1)
+            for require_name in require_map.get(name, [])
+            if require_name in require_map and require_name not in depth_map
+        )
+
+    # packages that not reachable from the direct dependencies, e.g. dependency groups
+    # that not listed in the project file, are traversed from their own roots
+    unreached_map = {
+        name: [
+            require_name
+            for require_name in require_names
+            if require_name in require_map and require_name not in depth_map
+        ]
+        for name, require_names in require_map.items()
+        if name not in depth_map
+    }
+    depth_map.update(compute_depth_map(unreached_map))
+
+    return depth_map
+
+
+def parse_lock_depth_map(filepath):
+    """
+    Return a mapping of locked package names of a lock file to their depths:
+    the direct dependencies of the project are the roots, and the depths of the others are
+    the shortest paths along the dependency edges of the lock file
+    (``poetry.lock``, ``pdm.lock`` and ``uv.lock``).
+    The project itself and workspace members in ``uv.lock`` are replaced with
+    their dependencies. Packages that no other package requires are the roots if
+    the project file is not found.
+
+    ``Pipfile.lock`` has no dependency edges: the mapping consists of the direct
+    dependencies in ``Pipfile``, and their dependencies are left to the traversal of
+    installed packages. ``None`` if ``Pipfile`` is not found: every locked package is
+    regarded as a root then.
+    """
+
+    pypi_pkg_names, require_map, project_names = _load_lock_packages(filepath)
+
+    if project_names:
+        root_names = [
+            require_name
+            for project_name in project_names
+            for require_name in require_map[project_name]
+            if require_name not in project_names
+        ]
+        for project_name in project_names:
+            del require_map[project_name]
+    else:
+        root_names = _load_direct_dependencies(filepath)
+
+    if require_map is None:
+        if root_names is None:
+            return None
+
+        return OrderedDict((name, 0) for name in root_names if name in set(pypi_pkg_names))
+
+    if root_names is None:
+        return compute_depth_map(require_map)
+
+    return _compute_lock_depth_map(require_map, root_names)
+
+
+def parse_lock_file(filepath):
+    """
+    Return locked package names of ``Pipfile.lock`` or TOML lock files that have
+    ``[[package]]`` tables (``poetry.lock``, ``pdm.lock`` and ``uv.lock``).
+    Packages are excluded if the environment markers of the package, or of every
+    dependency to the package, are not satisfied by the running environment.
+    The names include transitive dependencies: depths of them are
+    returned by :py:func:`parse_lock_depth_map`.
+    """
+
+    pypi_pkg_names, _require_map, _project_names = _load_lock_packages(filepath)
+
+    return pypi_pkg_names
+
+
+def _extract_project_name(dirpath):
+    pyproject_path = os.path.join(dirpath, "pyproject.toml")
+    if os.path.isfile(pyproject_path):
+        data = _load_toml(pyproject_path)
+        name = data.get("project", {}).get("name") or data.get("tool", {}).get("poetry", {}).get(
+            "name"
+        )
+        if name:
+            return _normalize_name(name)
+
+    if os.path.isfile(os.path.join(dirpath, "setup.py")):
+        # setup.py may read files relative to the current directory
+        cwd = os.getcwd()
+        os.chdir(dirpath)
+        try:
+            runner = SubprocessRunner([sys.executable, "setup.py", "--name"])
+            if runner.run() == 0:
+                return _normalize_name(runner.stdout)
+        finally:
+            os.chdir(cwd)
+
+    raise ValueError("no package found: {}".format(dirpath))
+
+
+def _is_project_dir(value):
+    return os.path.isdir(value) and any(
+        os.path.isfile(os.path.join(value, filename)) for filename in ("setup.py", "pyproject.toml")
+    )
+
+
+def load_target(value):
+    """
+    Load a target: a PyPI package name, a path to a package source directory,
+    a requirements file, a ``pyproject.toml`` or a lock file.
+
+    :raises ValueError: If no package found in the target.
+    """
+
+    if _is_project_dir(value):
+        return Target(label=value, pypi_pkg_names=[_extract_project_name(value)])
+
+    if os.path.isfile(value):
+        filename = os.path.basename(value)
+
+        depth_map = None
+        if filename == "pyproject.toml":
+            pypi_pkg_names = parse_pyproject_file(value)
+        elif filename in _LOCK_FILENAMES:
+            depth_map = parse_lock_depth_map(value)
+            if depth_map is None:
+                pypi_pkg_names = parse_lock_file(value)
+            else:
+                pypi_pkg_names = sorted(depth_map, key=depth_map.get)
+        else:
+            pypi_pkg_names = parse_requirements_file(value)
+
+        if not pypi_pkg_names:
+            raise ValueError("no package found: {}".format(value))
+
+        return Target(
+            label=value,
+            pypi_pkg_names=list(OrderedDict.fromkeys(pypi_pkg_names)),
+            depth_map=depth_map,
+        )
+
+    return Target(label=value, pypi_pkg_names=[_normalize_name(value)])
+
+
+def exclude_uninstalled_packages(targets):
+    """
+    Exclude packages that are not installed from targets: lock files and dependency tables
+    may list packages for other platforms or optional groups.
+    Targets that have no installed package are excluded.
+    """
+
+    installed_targets = []
+
+    for target in targets:
+        pypi_pkg_names = []
+
+        for pypi_pkg_name in target.pypi_pkg_names:
+            if PipShow.find(pypi_pkg_name) is None:
+                logger.warning(
+                    "skip a package that not installed: {} ({})".format(pypi_pkg_name, target.label)
+                )
+                continue
+
+            pypi_pkg_names.append(pypi_pkg_name)
+
+        if pypi_pkg_names:
+            installed_targets.append(
+                Target(
+                    label=target.label,
+                    pypi_pkg_names=pypi_pkg_names,
+                    depth_map=target.depth_map,
+                )
+            )
+
+    return installed_targets
+
+
+def iter_root_packages(target):
+    """
+    Yield pairs of a package name of a target and the depth of the package:
+    packages of lock files have the depths in the dependency graphs of the lock files,
+    and the other packages are at depth zero.
+    """
+
+    for pypi_pkg_name in target.pypi_pkg_names:
+        if target.depth_map is None:
+            yield (pypi_pkg_name, 0)
+        else:
+            yield (pypi_pkg_name, target.depth_map.get(pypi_pkg_name, 0))
+
+
+def attribute_targets(targets, max_depth):
+    """
+    Return a mapping of package names to labels of targets that depend on the package
+    within ``max_depth``. Dependencies are read from the cached ``pip show`` results.
+    """
+
+    target_map = {}
+
+    for target in targets:
+        depth_map = {}
+        # lock files may have packages deeper than dependencies found by the traversal:
+        # pop the shallowest package first
+        queue = [(depth, pypi_pkg_name) for pypi_pkg_name, depth in iter_root_packages(target)]
+        heapq.heapify(queue)
+
+        while queue:
+            depth, pypi_pkg_name = heapq.heappop(queue)
+            if pypi_pkg_name in depth_map or depth > max_depth:
+                continue
+
+            depth_map[pypi_pkg_name] = depth
+            target_map.setdefault(pypi_pkg_name, []).append(target.label)
+
+            if depth >= max_depth:
+                continue
+
+            pip_show = PipShow.find(pypi_pkg_name)
+            if pip_show is None:
+                continue
+
+            for require_package in pip_show.extract_requires():
+                heapq.heappush(queue, (depth + 1, require_package.lower()))
+
+    return target_map
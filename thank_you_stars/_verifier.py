@@ -0,0 +1,152 @@
+import re
+import threading
+from collections import namedtuple
+from urllib.parse import quote
+
+import msgfy
+from requests.exceptions import RequestException
+
+from ._logger import logger
+
+
+VerificationStats = namedtuple(
+    "VerificationStats", "packages verified stage_counts api_request_counts"
+)
+
+_METADATA_FILENAMES = ("setup.py", "setup.cfg", "pyproject.toml", "PKG-INFO")
+_SCHEMA_VERSION = 1
+
+
+class VerificationStage:
+    LOCAL = "local"
+    ORGANIZATION = "organization"
+    CONTRIBUTOR = "contributor"
+    CODE_SEARCH = "code_search"
+
+
+class ApiRequestType:
+    CONTENTS = "contents"
+    CODE_SEARCH = "code_search"
+    CONTRIBUTORS = "contributors"
+    REPO_SEARCH = "repo_search"
+    USERS = "users"
+
+
+def make_literal_regexp(value):
+    return re.compile(re.escape(value), re.IGNORECASE)
+
+
+class VerificationCounter:
+    """
+    Count verified packages by stage and GitHub API requests spent for verification.
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__packages = 0
+        self.__stage_counts = {}
+        self.__api_request_counts = {}
+
+    def add_package(self, stage=None):
+        with self.__lock:
+            self.__packages += 1
+            if stage:
+                self.__stage_counts[stage] = self.__stage_counts.get(stage, 0) + 1
+
+    def add_api_request(self, request_type, count=1):
+        with self.__lock:
+            self.__api_request_counts[request_type] = (
+                self.__api_request_counts.get(request_type, 0) + count
+            )
+
+    @property
+    def stats(self):
+        with self.__lock:
+            return VerificationStats(
+                packages=self.__packages,
+                verified=sum(self.__stage_counts.values()),
+                stage_counts=dict(self.__stage_counts),
+                api_request_counts=dict(self.__api_request_counts),
+            )
+
+
+class RepoMetadataVerifier:
+    """
+    Verify the authors of a GitHub repository with packaging metadata files
+    (``setup.py``, ``setup.cfg``, ``pyproject.toml`` and ``PKG-INFO``) at the root of
+    the repository. The files are fetched with the raw media type of the contents API
+    and cached, then author metadata is matched locally as literals.
+    """
+
+    def __init__(self, rest_client, cache_mgr, counter=None):
+        self.__rest_client = rest_client
+        self.__cache_mgr = cache_mgr
+        self.__counter = counter if counter is not None else VerificationCounter()
+
+    def fetch_metadata_files(self, repo_id):
+        """
+        :return: Mapping of filenames to the contents of existing metadata files.
+        """
+
+        cache_filepath = self.__cache_mgr.get_misc_cache_filepath(repo_id, "metadata_files")
+
+        if self.__cache_mgr.is_cache_available(cache_filepath):
+            cache_data = self.__cache_mgr.load_json(cache_filepath)
+            if cache_data and cache_data.get("schema_version") == _SCHEMA_VERSION:
+                logger.debug("load metadata files cache: {}".format(cache_filepath))
+                return cache_data["files"]
+
+        owner, _, name = repo_id.partition("/")
+        files = {}
+
+        for filename in _METADATA_FILENAMES:
+            path = "/repos/{}/{}/contents/{}".format(
+                quote(owner, safe=""), quote(name, safe=""), filename
+            )
+            self.__counter.add_api_request(ApiRequestType.CONTENTS)
+
+            try:
+                r = self.__rest_client.request(
+                    "GET", path, headers={"Accept": "application/vnd.github.v3.raw"}
+                )
+            except RequestException as e:
+                logger.debug("failed to fetch {}: {}".format(path, msgfy.to_debug_message(e)))
+                # do not cache incomplete results
+                return files
+
+            if r.status_code == 200:
+                files[filename] = r.text
+            elif r.status_code != 404:
+                logger.debug("failed to fetch {}: status={}".format(path, r.status_code))
+                return files
+
+        logger.debug("write metadata files cache: {}".format(cache_filepath))
+        self.__cache_mgr.dump_json(
+            cache_filepath, {"schema_version": _SCHEMA_VERSION, "files": files}
+        )
+
+        return files
+
+    def verify(self, repo_id, search_values):
+        """
+        :return:
+            ``True`` if all of the ``search_values`` found in the metadata files,
+            ``False`` if not, ``None`` if the repository has no metadata files.
+        """
+
+        files = self.fetch_metadata_files(repo_id)
+        if not files:
+            return None
+
+        for search_value in search_values:
+            if not search_value:
+                return False
+
+            search_regexp = make_literal_regexp(search_value)
+            if not any(search_regexp.search(content) for content in files.values()):
+                logger.debug(
+                    "metadata files do not include '{}': repo={}".format(search_value, repo_id)
+                )
+                return False
+
+        return True